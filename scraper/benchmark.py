@@ -0,0 +1,298 @@
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import platform
+import tempfile
+import subprocess
+import contextlib
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from mock_magento import MockCatalog, MockMagentoServer
+
+# Scrapers under test, and the mock category each one crawls
+SCRAPERS = {
+    "jj": "mens/kameez-shalwar",
+    "jj_women": "womens/stitched",
+    "sanasafinaz": "pk/ready-to-wear",
+    "khaadi": "ready-to-wear",
+    "dynamic": "mens/unstitched",
+    "dynamic_api": "womens/un-stitched",
+}
+
+# (store, category) definition each scraper runs with; the others use the
+# stock Magento selectors DynamicScraper picks for an unknown host
+STORE_DEFINITIONS = {
+    "jj": ("junaidjamshed", "kameez_shalwar"),
+    "jj_women": ("junaidjamshed", "women_stitched"),
+    "sanasafinaz": ("sanasafinaz", "ready-to-wear"),
+    "khaadi": ("khaadi", "ready-to-wear"),
+}
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low, high = int(rank), min(int(rank) + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def build_scraper(name, url, workers):
+    """The scraper for name, pointed at url on the mock storefront"""
+    from dynamic_scraper import DynamicScraper
+    from stores import get_store, dataset_name
+
+    if name in STORE_DEFINITIONS:
+        store, category = STORE_DEFINITIONS[name]
+        store = get_store(store)
+        scraper = DynamicScraper(
+            url,
+            store=store,
+            dataset=dataset_name(store, category),
+            workers=workers,
+        )
+    else:
+        scraper = DynamicScraper(url, workers=workers)
+    if name == "dynamic_api":
+        return scraper, scraper.scrape_products_api
+    return scraper, scraper.scrape_products
+
+
+def instrument(scraper):
+    """Time each product from dispatch to product_done, and each image download
+
+    Catalog API runs don't dispatch products, so they are measured by their
+    image downloads instead. Returns the dict the timings are collected in.
+    """
+    timings = {"product": [], "image": []}
+    started = {}
+    dispatch, done = scraper.dispatch_product, scraper.product_done
+
+    def timed_dispatch(handler, url, *job):
+        started.setdefault(url, time.perf_counter())
+        dispatch(handler, url, *job)
+
+    def timed_done(url):
+        done(url)
+        if url in started:
+            timings["product"].append(time.perf_counter() - started.pop(url))
+
+    scraper.dispatch_product = timed_dispatch
+    scraper.product_done = timed_done
+
+    download = scraper.downloader.download
+
+    def timed_download(img_url, folder_path, idx):
+        start = time.perf_counter()
+        try:
+            return download(img_url, folder_path, idx)
+        finally:
+            timings["image"].append(time.perf_counter() - start)
+
+    scraper.downloader.download = timed_download
+    return timings
+
+
+def count_products(root="fashion_dataset"):
+    count = 0
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        count += "metadata.json" in filenames
+    return count
+
+
+def run_scraper(name, url, workers, workdir):
+    """Run one scraper to completion in workdir; runs in its own process
+
+    A fresh process per scraper keeps peak RSS per scraper and stops one
+    run's blob store or cache from warming the next.
+    """
+    os.chdir(workdir)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    with open("scraper.log", "w") as log, contextlib.redirect_stdout(log):
+        scraper, run = build_scraper(name, url, workers)
+        timings = instrument(scraper)
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+    latencies = timings["product"] or timings["image"]
+    return {
+        "seconds": elapsed,
+        "products": count_products(),
+        "images": len(timings["image"]),
+        "latency_source": "product" if timings["product"] else "image",
+        "p50_ms": percentile([s * 1000 for s in latencies], 50),
+        "p95_ms": percentile([s * 1000 for s in latencies], 95),
+        # ru_maxrss is in KB on Linux and bytes on macOS
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        / (1024 * 1024 if sys.platform == "darwin" else 1024),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except OSError:
+        return None
+
+
+def run_benchmark(
+    names=None,
+    products=120,
+    images=3,
+    page_size=36,
+    latency=0.02,
+    jitter=0.0,
+    workers=1,
+    image_size=(768, 1024),
+):
+    """Benchmark each scraper against a local mock storefront
+
+    Returns a result dict with the configuration and, per scraper,
+    products/sec, bytes/sec, p50/p95 latency in ms, peak RSS and the
+    requests the mock server saw.
+    """
+    names = names or list(SCRAPERS)
+    catalog = MockCatalog(
+        [SCRAPERS[name] for name in names], products, images, page_size, image_size
+    )
+    server = MockMagentoServer(catalog, latency=latency, jitter=jitter).start()
+    results = {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "config": {
+            "products": products,
+            "images": images,
+            "page_size": page_size,
+            "latency_ms": latency * 1000,
+            "jitter_ms": jitter * 1000,
+            "workers": workers,
+            "image_size": list(image_size),
+        },
+        "scrapers": {},
+    }
+    try:
+        for name in names:
+            with tempfile.TemporaryDirectory(prefix=f"bench-{name}-") as workdir:
+                server.stats.reset()
+                with ProcessPoolExecutor(
+                    max_workers=1, mp_context=multiprocessing.get_context("spawn")
+                ) as executor:
+                    result = executor.submit(
+                        run_scraper,
+                        name,
+                        server.category_url(SCRAPERS[name]),
+                        workers,
+                        workdir,
+                    ).result()
+                served = server.stats.reset()
+            seconds = result["seconds"]
+            result.update(
+                products_per_sec=result["products"] / seconds,
+                bytes=served["bytes"],
+                bytes_per_sec=served["bytes"] / seconds,
+                requests=served["requests"],
+            )
+            results["scrapers"][name] = result
+            print(format_result(name, result))
+    finally:
+        server.stop()
+    return results
+
+
+def format_result(name, result):
+    return (
+        f"{name:<12} {result['products']:>5} products in {result['seconds']:6.2f}s  "
+        f"{result['products_per_sec']:7.1f}/s  "
+        f"{result['bytes_per_sec'] / 1024 / 1024:6.2f} MB/s  "
+        f"p50 {result['p50_ms'] or 0:7.1f}ms  p95 {result['p95_ms'] or 0:7.1f}ms  "
+        f"RSS {result['peak_rss_mb']:6.1f} MB"
+    )
+
+
+def compare(results, baseline):
+    """Print the change in throughput and tail latency against a saved run"""
+    print(f"\nCompared with {baseline.get('revision')} ({baseline.get('started_at')}):")
+    for name, result in results["scrapers"].items():
+        before = baseline.get("scrapers", {}).get(name)
+        if not before:
+            continue
+        changes = []
+        for key, label in (
+            ("products_per_sec", "products/s"),
+            ("p95_ms", "p95"),
+            ("peak_rss_mb", "RSS"),
+        ):
+            if before.get(key) and result.get(key) is not None:
+                delta = (result[key] - before[key]) / before[key] * 100
+                changes.append(f"{label} {delta:+.1f}%")
+        print(f"  {name:<12} " + "  ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the scrapers against a local mock Magento storefront"
+    )
+    parser.add_argument(
+        "--scraper",
+        action="append",
+        choices=list(SCRAPERS),
+        help="scraper to run (repeatable; default: all)",
+    )
+    parser.add_argument("--products", type=int, default=120)
+    parser.add_argument("--images", type=int, default=3, help="images per product")
+    parser.add_argument("--page-size", type=int, default=36)
+    parser.add_argument(
+        "--latency", type=float, default=20, help="added delay per response in ms"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0, help="extra random delay up to this in ms"
+    )
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--image-size", default="768x1024", help="served image size, WIDTHxHEIGHT"
+    )
+    parser.add_argument("--out-dir", default="benchmarks")
+    parser.add_argument(
+        "--compare", metavar="RESULT.json", help="earlier result to compare against"
+    )
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.image_size.lower().split("x"))
+    results = run_benchmark(
+        args.scraper,
+        products=args.products,
+        images=args.images,
+        page_size=args.page_size,
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        workers=args.workers,
+        image_size=(width, height),
+    )
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    path = os.path.join(
+        args.out_dir, f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    with open(path, "w") as f:
+        json.dump(results, f, indent=4)
+    print(f"\nSaved results to {path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import os
+import re
+import json
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime
+
+# image_<position><extension>, as the downloader names gallery images
+IMAGE_FILE = re.compile(r"^image_(\d+)\.\w+$")
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BlobStore:
+    """Content-addressed image store shared by every run under fashion_dataset
+
+    Each distinct image is stored once under objects/<ab>/<sha256><ext> and
+    hardlinked into product folders, so unchanged products cost no extra
+    disk between runs. An index maps source URLs to blobs so images that
+    were already fetched are linked without downloading them again. Where
+    hardlinks aren't possible the folder's blobs.json records the blob
+    instead.
+    """
+
+    MANIFEST = "blobs.json"
+
+    def __init__(self, root=os.path.join("fashion_dataset", ".blobs")):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(
+            os.path.join(root, "index.sqlite"), timeout=30, check_same_thread=False
+        )
+        self.db.execute("""CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                extension TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT
+            )""")
+        columns = [row[1] for row in self.db.execute("PRAGMA table_info(urls)")]
+        for column in ("etag", "last_modified"):
+            if column not in columns:
+                self.db.execute(f"ALTER TABLE urls ADD COLUMN {column} TEXT")
+        self.db.commit()
+
+    def blob_path(self, digest, extension):
+        return os.path.join(self.objects_dir, digest[:2], digest + extension)
+
+    def lookup(self, url):
+        """Return (sha256, extension) for a URL already in the store, or None"""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT sha256, extension FROM urls WHERE url = ?", (url,)
+            ).fetchone()
+        if row and os.path.exists(self.blob_path(*row)):
+            return row
+        return None
+
+    def validators(self, url):
+        """ETag / Last-Modified the URL was served with when it was stored"""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT etag, last_modified FROM urls WHERE url = ?", (url,)
+            ).fetchone()
+        return {"etag": row[0], "last_modified": row[1]} if row else None
+
+    def forget(self, digest):
+        """Drop a bad blob so its URLs are downloaded again; returns the URLs
+
+        Product folders that already link the blob keep their copy until
+        they are verified themselves.
+        """
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT url, extension FROM urls WHERE sha256 = ?", (digest,)
+            ).fetchall()
+            self.db.execute("DELETE FROM urls WHERE sha256 = ?", (digest,))
+            self.db.commit()
+        for extension in {extension for _, extension in rows}:
+            try:
+                os.remove(self.blob_path(digest, extension))
+            except OSError:
+                pass
+        return [url for url, _ in rows]
+
+    def add(self, tmp_path, digest, extension, url, validators=None):
+        """Move a fully written temp file into the store and index its URL"""
+        path = self.blob_path(digest, extension)
+        size = os.path.getsize(tmp_path)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.chmod(tmp_path, 0o444)
+            os.replace(tmp_path, path)
+
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO urls VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    digest,
+                    extension,
+                    size,
+                    datetime.now().isoformat(),
+                    (validators or {}).get("etag"),
+                    (validators or {}).get("last_modified"),
+                ),
+            )
+            self.db.commit()
+        return path
+
+    def link(self, digest, extension, folder_path, filename):
+        """Place a blob in a product folder as filename"""
+        blob = self.blob_path(digest, extension)
+        target = os.path.join(folder_path, filename)
+        if os.path.exists(target):
+            os.remove(target)
+        try:
+            os.link(blob, target)
+        except OSError:
+            self.add_manifest_entry(folder_path, filename, blob, digest)
+
+    def add_manifest_entry(self, folder_path, filename, blob, digest):
+        manifest_path = os.path.join(folder_path, self.MANIFEST)
+        with self.lock:
+            manifest = {}
+            if os.path.exists(manifest_path):
+                with open(manifest_path, encoding="utf-8") as f:
+                    manifest = json.load(f)
+            manifest[filename] = {
+                "sha256": digest,
+                "blob": os.path.relpath(blob, folder_path),
+            }
+            with open(manifest_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=4)
+
+    @staticmethod
+    def resolve(folder_path, filename):
+        """Path to read filename from, following blobs.json if needed
+
+        Needs no open store, so readers of product folders can call it as
+        BlobStore.resolve(folder_path, filename).
+        """
+        path = os.path.join(folder_path, filename)
+        if os.path.exists(path):
+            return path
+        manifest_path = os.path.join(folder_path, BlobStore.MANIFEST)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                entry = json.load(f).get(filename)
+            if entry:
+                return os.path.normpath(os.path.join(folder_path, entry["blob"]))
+        return None
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,84 @@
+from selenium import webdriver
+
+# Analytics, ads and chat widgets that Magento storefronts pull in; none of
+# them affect the product DOM we read. Patterns use CDP's * wildcard syntax.
+DEFAULT_BLOCKED_URLS = [
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*googleadservices.com*",
+    "*doubleclick.net*",
+    "*connect.facebook.net*",
+    "*facebook.com/tr*",
+    "*analytics.tiktok.com*",
+    "*sc-static.net*",
+    "*hotjar.com*",
+    "*clarity.ms*",
+    "*criteo.com*",
+    "*tawk.to*",
+    "*zendesk.com*",
+    "*klaviyo.com*",
+    "*.woff",
+    "*.woff2",
+    "*.ttf",
+    "*.mp4",
+    "*.webm",
+]
+
+
+class BrowserProfile:
+    """Shared Chrome configuration for every crawling browser
+
+    Headless with images off by default: scrapers read image URLs from the
+    DOM and download them separately, so the browser never needs the bytes.
+    """
+
+    def __init__(
+        self,
+        headless=True,
+        block_images=True,
+        blocked_urls=None,
+        user_agent=None,
+        stealth=False,
+        window_size="1920,1080",
+    ):
+        self.headless = headless
+        self.block_images = block_images
+        self.blocked_urls = (
+            DEFAULT_BLOCKED_URLS if blocked_urls is None else list(blocked_urls)
+        )
+        self.user_agent = user_agent
+        self.stealth = stealth
+        self.window_size = window_size
+
+    def chrome_options(self):
+        options = webdriver.ChromeOptions()
+        if self.headless:
+            options.add_argument("--headless=new")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument(f"--window-size={self.window_size}")
+        if self.block_images:
+            options.add_argument("--blink-settings=imagesEnabled=false")
+            options.add_experimental_option(
+                "prefs", {"profile.managed_default_content_settings.images": 2}
+            )
+        if self.stealth:
+            options.add_argument("--disable-notifications")
+            options.add_argument("--disable-blink-features=AutomationControlled")
+            options.add_experimental_option("excludeSwitches", ["enable-automation"])
+            options.add_experimental_option("useAutomationExtension", False)
+        return options
+
+    def create_driver(self):
+        driver = webdriver.Chrome(options=self.chrome_options())
+        if self.blocked_urls:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd(
+                "Network.setBlockedURLs", {"urls": self.blocked_urls}
+            )
+        if self.user_agent:
+            driver.execute_cdp_cmd(
+                "Network.setUserAgentOverride", {"userAgent": self.user_agent}
+            )
+        return driver
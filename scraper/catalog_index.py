@@ -0,0 +1,364 @@
+import os
+import re
+import json
+import sqlite3
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from blob_store import IMAGE_FILE, BlobStore, file_sha256
+from stores import store_datasets, read_run
+
+# Top-level fashion_dataset folders written by the old per-store scrapers, as
+# (store, section). Registered stores are looked up in stores.py; anything
+# else is a storefront domain from DynamicScraper.
+DATASET_DIRS = {
+    "junaidjamshed": ("junaidjamshed", None),
+    "junaidjamshed_unstitched": ("junaidjamshed", "unstitched"),
+    "kameez_shalwar": ("junaidjamshed", "kameez_shalwar"),
+    "unstitched": ("junaidjamshed", "unstitched"),
+    "women_stitched": ("junaidjamshed", "women_stitched"),
+    "women_unstitched": ("junaidjamshed", "women_unstitched"),
+    "stitched_women": ("junaidjamshed", "women_stitched"),
+    "unstitched_women": ("junaidjamshed", "women_unstitched"),
+    "sanasafinaz": ("sanasafinaz", None),
+}
+
+RUN_FORMAT = "%Y%m%d_%H%M%S"
+
+
+def parse_price(text):
+    """Whole rupees from a displayed price such as "PKR 4,990", or None"""
+    if not text:
+        return None
+    match = re.search(r"\d[\d,]*(?:\.\d+)?", str(text))
+    if not match:
+        return None
+    return int(float(match.group(0).replace(",", "")))
+
+
+def store_for(dataset):
+    """(store, section) for a top-level dataset folder"""
+    if dataset in DATASET_DIRS:
+        return DATASET_DIRS[dataset]
+    registered = store_datasets().get(dataset)
+    if registered:
+        return registered
+    host = dataset.split(":")[0].lower()
+    parts = [p for p in host.split(".") if p not in ("www", "pk")]
+    return (parts[0] if parts else host), None
+
+
+def run_time(run):
+    try:
+        return datetime.strptime(run, RUN_FORMAT).isoformat()
+    except (TypeError, ValueError):
+        return None
+
+
+class CatalogIndex:
+    """SQLite catalog of every product folder under fashion_dataset
+
+    update() walks <dataset>/<run>/<product>/ (and the older run-less
+    <dataset>/<product>/ layout) but only re-reads product folders whose
+    mtime changed since the last update, so refreshing after a crawl costs
+    a stat per folder. Queries then run against the index instead of the
+    metadata.json files.
+
+    A product's section is its store's category when the dataset folder is
+    per category, else the category recorded in its run's run.json, so
+    stores that write every category into one folder still get a latest
+    run per category.
+    """
+
+    def __init__(self, root="fashion_dataset", db_path=None):
+        self.root = root
+        self.db = sqlite3.connect(
+            db_path or os.path.join(root, "catalog.sqlite"), check_same_thread=False
+        )
+        self.db.row_factory = sqlite3.Row
+        self.run_categories = {}
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS products (
+                folder TEXT PRIMARY KEY,
+                dataset TEXT NOT NULL,
+                store TEXT NOT NULL,
+                section TEXT,
+                run TEXT,
+                run_at TEXT,
+                name TEXT,
+                url TEXT,
+                sku TEXT,
+                price TEXT,
+                price_pkr INTEGER,
+                old_price_pkr INTEGER,
+                image_count INTEGER NOT NULL,
+                metadata TEXT NOT NULL,
+                mtime REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS images (
+                folder TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                filename TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                PRIMARY KEY (folder, filename)
+            );
+            CREATE INDEX IF NOT EXISTS products_store
+                ON products (store, section, price_pkr);
+            CREATE INDEX IF NOT EXISTS products_latest
+                ON products (dataset, section, run);
+            """)
+        self.db.commit()
+
+    def product_folders(self):
+        """Yield (dataset, run, folder path) for every product folder on disk"""
+        for dataset in os.scandir(self.root):
+            # .blobs and .http_cache hold store internals, not products
+            if not dataset.is_dir() or dataset.name.startswith("."):
+                continue
+            for entry in os.scandir(dataset.path):
+                if not entry.is_dir():
+                    continue
+                if os.path.exists(os.path.join(entry.path, "metadata.json")):
+                    yield dataset.name, None, entry.path
+                    continue
+                for product in os.scandir(entry.path):
+                    if product.is_dir():
+                        yield dataset.name, entry.name, product.path
+
+    @staticmethod
+    def folder_mtime(path):
+        metadata = os.path.join(path, "metadata.json")
+        mtime = os.stat(path).st_mtime
+        if os.path.exists(metadata):
+            mtime = max(mtime, os.stat(metadata).st_mtime)
+        return mtime
+
+    def update(self):
+        """Index new and changed product folders; drop ones that are gone
+
+        Returns a dict of counts for added, updated, unchanged and removed.
+        """
+        known = dict(self.db.execute("SELECT folder, mtime FROM products"))
+        counts = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+        seen = set()
+
+        for dataset, run, path in self.product_folders():
+            folder = os.path.relpath(path, self.root)
+            seen.add(folder)
+            mtime = self.folder_mtime(path)
+            if known.get(folder) == mtime:
+                counts["unchanged"] += 1
+                continue
+            if self.index_product(dataset, run, folder, path, mtime):
+                counts["updated" if folder in known else "added"] += 1
+
+        for folder in set(known) - seen:
+            self.remove(folder)
+            counts["removed"] += 1
+        self.db.commit()
+        return counts
+
+    def index_product(self, dataset, run, folder, path, mtime):
+        try:
+            with open(os.path.join(path, "metadata.json"), encoding="utf-8") as f:
+                metadata = json.load(f)
+        except (OSError, ValueError):
+            # Still downloading, or not a product folder
+            return False
+
+        # Images that couldn't be hardlinked live in the blob store, listed
+        # in the folder's blobs.json
+        images = []
+        for name in metadata.get("images") or sorted(os.listdir(path)):
+            if not isinstance(name, str) or not IMAGE_FILE.match(name):
+                continue
+            source = BlobStore.resolve(path, name)
+            if source and os.path.isfile(source):
+                images.append((name, source))
+        store, section = store_for(dataset)
+        if section is None and run:
+            section = self.run_category(os.path.dirname(path))
+        price = metadata.get("price") or metadata.get("special_price")
+
+        self.remove(folder)
+        self.db.execute(
+            "INSERT INTO products VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                folder,
+                dataset,
+                store,
+                section,
+                run,
+                run_time(run),
+                metadata.get("name"),
+                metadata.get("url"),
+                metadata.get("sku") or metadata.get("product_id"),
+                price,
+                parse_price(price),
+                parse_price(metadata.get("old_price")),
+                len(images),
+                json.dumps(metadata, ensure_ascii=False),
+                mtime,
+            ),
+        )
+        self.db.executemany(
+            "INSERT INTO images VALUES (?, ?, ?, ?, ?)",
+            [
+                (
+                    folder,
+                    int(IMAGE_FILE.match(name).group(1)),
+                    name,
+                    os.path.getsize(source),
+                    file_sha256(source),
+                )
+                for name, source in images
+            ],
+        )
+        return True
+
+    def image_path(self, folder, filename):
+        """Path to read a catalogued image from, following blobs.json if needed"""
+        return BlobStore.resolve(os.path.join(self.root, folder), filename)
+
+    def missing_images(self, table, function, workers=None):
+        """Apply function to every distinct image not yet in table
+
+        table is keyed on sha256, one row per image content, so an image
+        linked by many runs is processed once. function gets the image path
+        (None if it is gone) and runs on a spawned process pool; it should
+        return None for unreadable images, which callers store as NULL so
+        they aren't retried each run. Returns [(sha256, result)].
+        """
+        self.update()
+        rows = self.db.execute(
+            f"""SELECT i.sha256, MIN(i.folder), MIN(i.filename) FROM images AS i
+            LEFT JOIN {table} AS t ON t.sha256 = i.sha256
+            WHERE t.sha256 IS NULL GROUP BY i.sha256"""
+        ).fetchall()
+        if not rows:
+            return []
+
+        paths = [self.image_path(folder, filename) for _, folder, filename in rows]
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            results = list(executor.map(function, paths, chunksize=64))
+        return [(row[0], result) for row, result in zip(rows, results)]
+
+    def run_category(self, run_dir):
+        if run_dir not in self.run_categories:
+            self.run_categories[run_dir] = read_run(run_dir).get("category")
+        return self.run_categories[run_dir]
+
+    def remove(self, folder):
+        self.db.execute("DELETE FROM images WHERE folder = ?", (folder,))
+        self.db.execute("DELETE FROM products WHERE folder = ?", (folder,))
+
+    def where(
+        self,
+        store=None,
+        section=None,
+        name=None,
+        min_price=None,
+        max_price=None,
+        latest=True,
+    ):
+        clauses, params = [], []
+        if store:
+            clauses.append("store = ?")
+            params.append(store)
+        if section:
+            clauses.append("section = ?")
+            params.append(section)
+        if name:
+            clauses.append("name LIKE ?")
+            params.append(f"%{name}%")
+        if min_price is not None:
+            clauses.append("price_pkr >= ?")
+            params.append(min_price)
+        if max_price is not None:
+            clauses.append("price_pkr <= ?")
+            params.append(max_price)
+        if latest:
+            # Each run is a full snapshot of its section, so only the newest
+            # run of each section counts
+            clauses.append(
+                "(run IS NULL OR run = (SELECT MAX(run) FROM products AS p"
+                " WHERE p.dataset = products.dataset"
+                " AND p.section IS products.section))"
+            )
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def count(self, **filters):
+        """Number of products matching the filters taken by products()"""
+        where, params = self.where(**filters)
+        return self.db.execute(
+            f"SELECT COUNT(*) FROM products{where}", params
+        ).fetchone()[0]
+
+    def products(self, limit=None, **filters):
+        """Products as dicts, filtered by store, section, name substring,
+        min_price / max_price in PKR, and latest run only (the default)
+        """
+        where, params = self.where(**filters)
+        sql = f"SELECT * FROM products{where} ORDER BY store, price_pkr"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        rows = self.db.execute(sql, params).fetchall()
+        return [
+            {key: row[key] for key in row.keys() if key != "metadata"} for row in rows
+        ]
+
+    def images(self, folder):
+        """Image rows for one product folder, in gallery order"""
+        rows = self.db.execute(
+            "SELECT * FROM images WHERE folder = ? ORDER BY position", (folder,)
+        )
+        return [dict(row) for row in rows]
+
+    def close(self):
+        self.db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Update and query the catalog index of fashion_dataset"
+    )
+    parser.add_argument("--root", default="fashion_dataset")
+    parser.add_argument("--store")
+    parser.add_argument("--section")
+    parser.add_argument("--name", help="substring of the product name")
+    parser.add_argument("--min-price", type=int)
+    parser.add_argument("--max-price", type=int)
+    parser.add_argument(
+        "--all-runs", action="store_true", help="include products from older runs"
+    )
+    parser.add_argument("--list", type=int, default=0, help="print up to N products")
+    args = parser.parse_args()
+
+    index = CatalogIndex(args.root)
+    counts = index.update()
+    print(
+        f"Indexed: {counts['added']} added, {counts['updated']} updated, "
+        f"{counts['unchanged']} unchanged, {counts['removed']} removed"
+    )
+    filters = {
+        "store": args.store,
+        "section": args.section,
+        "name": args.name,
+        "min_price": args.min_price,
+        "max_price": args.max_price,
+        "latest": not args.all_runs,
+    }
+    print(f"Matching products: {index.count(**filters)}")
+    for product in index.products(limit=args.list, **filters) if args.list else []:
+        print(
+            f"  {product['price'] or 'N/A':>12}  {product['name']}  ({product['folder']})"
+        )
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
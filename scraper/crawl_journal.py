@@ -0,0 +1,132 @@
+import os
+import json
+import hashlib
+import threading
+
+
+def journal_path(dataset_root, base_url):
+    """Journal file of the crawl of base_url inside its dataset folder
+
+    Categories of a store can share one dataset folder, so each category URL
+    keeps a journal of its own and starting one never discards another's.
+    """
+    digest = hashlib.sha1(base_url.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(dataset_root, f"journal-{digest}.jsonl")
+
+
+class CrawlJournal:
+    """Append-only record of a crawl's progress, so a crashed run can resume
+
+    Every event is written as one JSON line and fsynced before the crawl
+    moves on: the run folder and the URL it crawls, each listing page as it
+    is started, each product as it is dispatched and again once its
+    metadata and images are on disk. Replaying the file gives the last
+    listing page, the completed product URLs and the products still in
+    flight when the run stopped.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.dataset_dir = None
+        self.base_url = None
+        self.page = 1
+        self.page_url = None
+        self.completed = set()
+        self.in_flight = {}
+        self.finished = False
+        self.file = None
+        # Bytes up to the end of the last complete event
+        self.size = 0
+        if os.path.exists(path):
+            self.replay()
+
+    def replay(self):
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = json.loads(line) if line.endswith("\n") else None
+                except ValueError:
+                    event = None
+                if event is None:
+                    # A torn final line from a crash mid-write
+                    break
+                self.size += len(line.encode("utf-8"))
+                kind = event["event"]
+                if kind == "run":
+                    self.dataset_dir = event["dataset_dir"]
+                    self.base_url = event.get("base_url")
+                elif kind == "page":
+                    self.page, self.page_url = event["page"], event["url"]
+                elif kind == "started":
+                    self.in_flight[event["url"]] = event["job"]
+                elif kind == "completed":
+                    self.in_flight.pop(event["url"], None)
+                    self.completed.add(event["url"])
+                elif kind == "finished":
+                    self.finished = True
+
+    def resumable(self, base_url):
+        """True if the journal holds an unfinished run that crawled base_url"""
+        return (
+            self.dataset_dir is not None
+            and self.base_url == base_url
+            and not self.finished
+            and os.path.isdir(self.dataset_dir)
+        )
+
+    def start(self, dataset_dir, page_url):
+        """Begin a fresh run, discarding any previous journal"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.file = open(self.path, "w", encoding="utf-8")
+        self.dataset_dir = dataset_dir
+        self.base_url = page_url
+        self.page, self.page_url = 1, page_url
+        self.completed, self.in_flight = set(), {}
+        self.finished = False
+        self.write(event="run", dataset_dir=dataset_dir, base_url=page_url)
+
+    def reopen(self):
+        """Continue appending to the journal of the run being resumed"""
+        self.file = open(self.path, "a", encoding="utf-8")
+        # Cut any torn line, or the next event would be appended to it
+        self.file.truncate(self.size)
+        print(
+            f"Resuming {self.dataset_dir} at page {self.page}: "
+            f"{len(self.completed)} products done, {len(self.in_flight)} in flight"
+        )
+
+    def write(self, **event):
+        with self.lock:
+            self.file.write(json.dumps(event, ensure_ascii=False) + "\n")
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    def listing(self, page, url):
+        self.page, self.page_url = page, url
+        self.write(event="page", page=page, url=url)
+
+    def should_scrape(self, url):
+        """False for products already done or already dispatched this run"""
+        with self.lock:
+            return url not in self.completed and url not in self.in_flight
+
+    def started(self, url, *job):
+        with self.lock:
+            self.in_flight[url] = list(job)
+        self.write(event="started", url=url, job=list(job))
+
+    def mark_completed(self, url):
+        with self.lock:
+            self.in_flight.pop(url, None)
+            self.completed.add(url)
+        self.write(event="completed", url=url)
+
+    def finish(self):
+        self.finished = True
+        self.write(event="finished")
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
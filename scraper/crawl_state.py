@@ -0,0 +1,176 @@
+import os
+import json
+import shutil
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime
+
+METADATA = "metadata.json"
+
+
+def conditional_headers(validators):
+    """If-None-Match / If-Modified-Since headers for a URL's saved validators"""
+    headers = {}
+    if validators and validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators and validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+def response_validators(response):
+    return {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+
+
+class CrawlState:
+    """What the last runs saw for a store, for incremental re-crawls
+
+    Products are keyed on a stable identity (SKU or product URL) and store
+    a hash of their extracted fields plus the folder they were written to.
+    HTTP validators (ETag / Last-Modified) are kept per URL so unchanged
+    pages can be answered with 304 Not Modified.
+    """
+
+    def __init__(self, store_dir):
+        os.makedirs(store_dir, exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(
+            os.path.join(store_dir, "crawl_state.sqlite"),
+            timeout=30,
+            check_same_thread=False,
+        )
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS products (
+                product_key TEXT PRIMARY KEY,
+                url TEXT,
+                fields_hash TEXT NOT NULL,
+                product_dir TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS validators (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT
+            );
+            """)
+        self.db.commit()
+        self.stats = {"new": 0, "changed": 0, "unchanged": 0}
+
+    @staticmethod
+    def fields_hash(fields):
+        """Stable hash of a product's extracted fields"""
+        encoded = json.dumps(fields, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def validators(self, url):
+        with self.lock:
+            row = self.db.execute(
+                "SELECT etag, last_modified FROM validators WHERE url = ?", (url,)
+            ).fetchone()
+        return {"etag": row[0], "last_modified": row[1]} if row else None
+
+    def save_validators(self, url, validators):
+        if not validators or not any(validators.values()):
+            return
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO validators VALUES (?, ?, ?)",
+                (url, validators.get("etag"), validators.get("last_modified")),
+            )
+            self.db.commit()
+
+    def previous(self, product_key):
+        """Return (fields_hash, product_dir) from the last run, or None"""
+        with self.lock:
+            return self.db.execute(
+                "SELECT fields_hash, product_dir FROM products WHERE product_key = ?",
+                (product_key,),
+            ).fetchone()
+
+    def is_unchanged(self, product_key, fields_hash):
+        previous = self.previous(product_key)
+        return previous is not None and previous[0] == fields_hash
+
+    def carry_over(self, product_key, product_dir, **fields):
+        """Link the last run's files for an unchanged product into product_dir
+
+        metadata.json is written afresh rather than linked, with fields (the
+        product id and timestamp of this run) replacing the old values; a
+        field given as None is dropped. Returns False when there is nothing
+        usable to carry over, in which case the product should be scraped in
+        full.
+        """
+        previous = self.previous(product_key)
+        if previous is None or not os.path.isdir(previous[1]):
+            return False
+
+        source_dir = previous[1]
+        if os.path.abspath(source_dir) != os.path.abspath(product_dir):
+            try:
+                with open(os.path.join(source_dir, METADATA), encoding="utf-8") as f:
+                    metadata = json.load(f)
+            except (OSError, ValueError):
+                return False
+
+            os.makedirs(product_dir, exist_ok=True)
+            for filename in os.listdir(source_dir):
+                source = os.path.join(source_dir, filename)
+                target = os.path.join(product_dir, filename)
+                if (
+                    filename == METADATA
+                    or not os.path.isfile(source)
+                    or os.path.exists(target)
+                ):
+                    continue
+                try:
+                    os.link(source, target)
+                except OSError:
+                    shutil.copy2(source, target)
+
+            metadata.update(fields)
+            metadata = {k: v for k, v in metadata.items() if v is not None}
+            with open(os.path.join(product_dir, METADATA), "w", encoding="utf-8") as f:
+                json.dump(metadata, f, ensure_ascii=False, indent=4)
+
+        self.record(product_key, None, previous[0], product_dir, counted="unchanged")
+        return True
+
+    def record(self, product_key, url, fields_hash, product_dir, counted=None):
+        """Remember a product written (or carried over) by this run"""
+        with self.lock:
+            if counted is None:
+                exists = self.db.execute(
+                    "SELECT 1 FROM products WHERE product_key = ?", (product_key,)
+                ).fetchone()
+                counted = "changed" if exists else "new"
+            self.stats[counted] += 1
+            self.db.execute(
+                """INSERT INTO products VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(product_key) DO UPDATE SET
+                    url = COALESCE(excluded.url, url),
+                    fields_hash = excluded.fields_hash,
+                    product_dir = excluded.product_dir,
+                    updated_at = excluded.updated_at""",
+                (
+                    product_key,
+                    url,
+                    fields_hash,
+                    product_dir,
+                    datetime.now().isoformat(),
+                ),
+            )
+            self.db.commit()
+
+    def report(self):
+        print(
+            f"\nIncremental crawl: {self.stats['new']} new, "
+            f"{self.stats['changed']} changed, {self.stats['unchanged']} unchanged"
+        )
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,146 @@
+import os
+import argparse
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageOps
+from blob_store import IMAGE_FILE, BlobStore
+
+# The try-on frontend expects 768x1024 portraits (lib/constants.ts); the
+# thumbnails back catalog grid views
+DEFAULT_VARIANTS = [
+    {"width": 768, "height": 1024, "format": "webp", "quality": 85},
+    {"width": 768, "height": 1024, "format": "avif", "quality": 60},
+    {"width": 256, "height": 342, "format": "webp", "quality": 80},
+]
+
+DERIVATIVES_DIR = "derivatives"
+
+
+def derivative_name(filename, variant):
+    stem = os.path.splitext(filename)[0]
+    return f"{stem}.{variant['width']}x{variant['height']}.{variant['format']}"
+
+
+def make_derivatives(source, filename, out_dir, variants):
+    """Write every variant of source that is missing or older than it
+
+    Runs in a worker process. The source is decoded once, only if some
+    variant needs it, and each variant is scaled to fit its box without
+    upscaling. Returns (generated, skipped) counts.
+    """
+    source_mtime = os.path.getmtime(source)
+    todo = []
+    for variant in variants:
+        target = os.path.join(out_dir, derivative_name(filename, variant))
+        if not os.path.exists(target) or os.path.getmtime(target) < source_mtime:
+            todo.append((variant, target))
+    if not todo:
+        return 0, len(variants)
+
+    os.makedirs(out_dir, exist_ok=True)
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+        for variant, target in todo:
+            resized = image.copy()
+            resized.thumbnail((variant["width"], variant["height"]), Image.LANCZOS)
+            tmp_path = f"{target}.part"
+            resized.save(
+                tmp_path, variant["format"].upper(), quality=variant["quality"]
+            )
+            os.replace(tmp_path, target)
+    return len(todo), len(variants) - len(todo)
+
+
+class DerivativeGenerator:
+    """Resize scraped images into web variants on a process pool
+
+    Decoding and resizing are CPU-bound, so they run in separate processes
+    rather than on the download threads. Variants are written to a
+    derivatives/ folder inside each product folder as
+    image_N.<width>x<height>.<format>, and are skipped when already newer
+    than their source.
+    """
+
+    def __init__(self, variants=None, workers=None):
+        self.variants = variants or DEFAULT_VARIANTS
+        # Spawned workers don't inherit the crawler's threads and browsers
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        self.lock = threading.Lock()
+        self.stats = {"generated": 0, "skipped": 0, "failed": 0}
+
+    def submit(self, folder, filename):
+        """Queue the variants of one image; safe to call from download threads"""
+        source = BlobStore.resolve(folder, filename)
+        if source is None:
+            return None
+        future = self.executor.submit(
+            make_derivatives,
+            source,
+            filename,
+            os.path.join(folder, DERIVATIVES_DIR),
+            self.variants,
+        )
+        future.add_done_callback(lambda f: self.record(f, folder, filename))
+        return future
+
+    def record(self, future, folder, filename):
+        with self.lock:
+            if future.exception():
+                self.stats["failed"] += 1
+                print(
+                    f"Error making derivatives of {os.path.join(folder, filename)}: "
+                    f"{future.exception()}"
+                )
+                return
+            generated, skipped = future.result()
+            self.stats["generated"] += generated
+            self.stats["skipped"] += skipped
+
+    def submit_folder(self, path):
+        """Queue every image in the product folders at or under path"""
+        futures = []
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames[:] = [
+                d for d in dirnames if not d.startswith(".") and d != DERIVATIVES_DIR
+            ]
+            if "metadata.json" not in filenames:
+                continue
+            for filename in sorted(filenames):
+                if IMAGE_FILE.match(filename):
+                    futures.append(self.submit(dirpath, filename))
+        return [future for future in futures if future is not None]
+
+    def report(self):
+        print(
+            f"\nDerivatives: {self.stats['generated']} written, "
+            f"{self.stats['skipped']} already current, {self.stats['failed']} failed"
+        )
+
+    def close(self):
+        """Wait for queued images and stop the worker processes"""
+        self.executor.shutdown(wait=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate resized WebP/AVIF variants of scraped images"
+    )
+    parser.add_argument(
+        "paths", nargs="*", default=["fashion_dataset"], help="run or dataset folders"
+    )
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPUs)")
+    args = parser.parse_args()
+
+    generator = DerivativeGenerator(workers=args.workers)
+    for path in args.paths:
+        generator.submit_folder(path)
+    generator.close()
+    generator.report()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+
+# Responses that mean the storefront wants us to slow down
+THROTTLE_STATUSES = (429, 503)
+
+
+def retry_after(response):
+    """Seconds a 429/503 response asks us to wait, or None"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class DomainState:
+    """One domain's concurrency limit, token bucket and queue of waiters"""
+
+    def __init__(self, limit, rate, burst):
+        self.limit = limit
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.refilled = time.monotonic()
+        self.in_flight = 0
+        self.waiting = deque()
+        self.last_served = 0.0
+        self.paused_until = 0.0
+        # Feedback for adaptive limits
+        self.latency = None
+        self.baseline = None
+        self.healthy = 0
+        self.cooldown_until = 0.0
+
+    def delay(self, now):
+        """Seconds until a request may start here (None: once one finishes)"""
+        if self.in_flight >= max(1, int(self.limit)):
+            return None
+        if now < self.paused_until:
+            return self.paused_until - now
+        if not self.rate:
+            return 0.0
+        self.tokens = min(self.burst, self.tokens + (now - self.refilled) * self.rate)
+        self.refilled = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+
+class DomainLimiter:
+    """Request caps shared by every crawl in a process
+
+    At most max_requests requests are in flight overall and, per domain, at
+    most per_domain connections at a time, with a token bucket of burst
+    tokens refilled at rate per second (None for no rate cap). When
+    requests wait, the next free slot goes to the domain served least
+    recently, so a store with a deep backlog of images can't starve another
+    store's page fetches; within a domain requests go first come, first
+    served.
+    """
+
+    def __init__(self, max_requests=16, per_domain=4, rate=None, burst=1):
+        self.max_requests = max_requests
+        self.per_domain = per_domain
+        self.rate = rate
+        self.burst = burst
+        self.cond = threading.Condition()
+        self.in_flight = 0
+        self.domains = {}
+
+    @staticmethod
+    def domain(url):
+        return urlparse(url).netloc.lower()
+
+    def state(self, domain):
+        if domain not in self.domains:
+            self.domains[domain] = self.new_state()
+        return self.domains[domain]
+
+    def new_state(self):
+        return DomainState(self.per_domain, self.rate, self.burst)
+
+    def turn(self, state, ticket, now):
+        """0 if ticket may start now, else seconds to wait (None: until woken)"""
+        if state.waiting[0] is not ticket or self.in_flight >= self.max_requests:
+            return None
+        delay = state.delay(now)
+        if delay is None or delay > 0:
+            return delay
+        # Fair share: defer to a ready domain that was served longer ago
+        for other in self.domains.values():
+            if (
+                other is not state
+                and other.waiting
+                and other.last_served < state.last_served
+                and other.delay(now) == 0
+            ):
+                return None
+        return 0
+
+    def acquire(self, url):
+        domain = self.domain(url)
+        ticket = object()
+        with self.cond:
+            state = self.state(domain)
+            state.waiting.append(ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = self.turn(state, ticket, now)
+                    if wait == 0:
+                        break
+                    self.cond.wait(wait)
+            finally:
+                state.waiting.remove(ticket)
+            self.in_flight += 1
+            state.in_flight += 1
+            if state.rate:
+                state.tokens -= 1
+            state.last_served = now
+            self.cond.notify_all()
+        return domain
+
+    def release(self, domain, status=None, latency=None, wait=None, failed=False):
+        """Free domain's slot
+
+        status and latency (seconds to the response headers) describe how
+        the request went, and failed marks one that got no response; slots
+        released with neither, such as browser navigations, give no feedback.
+        wait pauses the domain, for a Retry-After.
+        """
+        with self.cond:
+            self.in_flight -= 1
+            state = self.domains[domain]
+            state.in_flight -= 1
+            if wait:
+                state.paused_until = max(state.paused_until, time.monotonic() + wait)
+            if failed or status is not None:
+                self.feedback(state, status, latency)
+            self.cond.notify_all()
+
+    def feedback(self, state, status, latency):
+        """Fixed limits ignore how requests went"""
+
+    @contextmanager
+    def slot(self, url):
+        domain = self.acquire(url)
+        try:
+            yield
+        finally:
+            self.release(domain)
+
+    def report(self):
+        """Current limit, rate and smoothed latency for each domain"""
+        with self.cond:
+            return {
+                domain: {
+                    "limit": int(state.limit),
+                    "rate": round(state.rate, 2) if state.rate else None,
+                    "latency_ms": (
+                        round(state.latency * 1000, 1) if state.latency else None
+                    ),
+                }
+                for domain, state in self.domains.items()
+            }
+
+
+class AdaptiveLimiter(DomainLimiter):
+    """DomainLimiter that finds each domain's limits from its responses
+
+    Each domain starts at initial concurrent requests. After every window
+    of healthy responses (as many as the current limit, roughly one round
+    trip) the limit grows by one, up to per_domain, and so does the token
+    bucket's rate once one is set. A 429/503, a failed request or a latency
+    spike (smoothed latency over spike times the best seen lately) halves the
+    limit instead, and sets or halves the rate; after that, further
+    decreases wait a round trip so one burst of errors counts once.
+    rate, when given, stays the most the bucket may refill at.
+    """
+
+    def __init__(
+        self,
+        max_requests=32,
+        per_domain=16,
+        rate=None,
+        burst=4,
+        initial=4,
+        spike=3.0,
+        decrease=0.5,
+        rate_step=1.0,
+        min_rate=0.5,
+    ):
+        super().__init__(max_requests, per_domain, None, burst)
+        self.max_rate = rate
+        self.initial = initial
+        self.spike = spike
+        self.decrease = decrease
+        self.rate_step = rate_step
+        self.min_rate = min_rate
+
+    def new_state(self):
+        return DomainState(
+            min(self.initial, self.per_domain), self.max_rate, self.burst
+        )
+
+    def feedback(self, state, status, latency):
+        now = time.monotonic()
+        if latency is not None and status not in THROTTLE_STATUSES:
+            state.latency = (
+                latency
+                if state.latency is None
+                else 0.8 * state.latency + 0.2 * latency
+            )
+            # The best latency seen lately: it creeps up 2% a response, so a
+            # slow drift (a mix of pages and images) never reads as a spike
+            if state.baseline is None:
+                state.baseline = state.latency
+            state.baseline = min(state.latency, state.baseline * 1.02)
+
+        spiking = (
+            state.baseline is not None and state.latency > self.spike * state.baseline
+        )
+        if status is None or status in THROTTLE_STATUSES or spiking:
+            state.healthy = 0
+            if now < state.cooldown_until:
+                return
+            # Throughput at the current limit is about limit / latency, so
+            # a first decrease starts the bucket from half of that
+            current = state.rate or state.limit / (state.latency or 1.0)
+            state.rate = max(self.min_rate, current * self.decrease)
+            state.limit = max(1.0, state.limit * self.decrease)
+            state.cooldown_until = now + (state.latency or 1.0)
+            return
+
+        state.healthy += 1
+        if state.healthy >= int(state.limit):
+            state.healthy = 0
+            state.limit = min(self.per_domain, state.limit + 1)
+            if state.rate:
+                state.rate += self.rate_step
+                if self.max_rate:
+                    state.rate = min(state.rate, self.max_rate)
+
+
+class LimitedAdapter(HTTPAdapter):
+    """HTTPAdapter that takes a DomainLimiter slot for each request
+
+    A slot covers the whole body transfer, not just the headers: other
+    bodies are read before the slot is released, and streamed responses
+    hold theirs until closed. Each response's status and
+    latency are reported back to the limiter, and GETs answered 429/503 are
+    retried, up to retries times, once the limiter lets them through again
+    (after any Retry-After).
+    """
+
+    def __init__(self, limiter, retries=3, **kwargs):
+        self.limiter = limiter
+        self.retries = retries
+        super().__init__(**kwargs)
+
+    def send(self, request, stream=False, **kwargs):
+        for attempt in range(self.retries + 1):
+            domain = self.limiter.acquire(request.url)
+            # Session.send only sets response.elapsed once this returns
+            start = time.monotonic()
+            try:
+                response = super().send(request, stream=stream, **kwargs)
+            except Exception:
+                self.limiter.release(domain, failed=True)
+                raise
+
+            status = response.status_code
+            latency = time.monotonic() - start
+            throttled = status in THROTTLE_STATUSES
+            if throttled and request.method == "GET" and attempt < self.retries:
+                response.close()
+                self.limiter.release(domain, status, latency, retry_after(response))
+                continue
+            break
+
+        wait = retry_after(response) if throttled else None
+        if not stream:
+            # Session.send reads the body only after this returns
+            try:
+                response.content
+            except Exception:
+                self.limiter.release(domain, failed=True)
+                raise
+            self.limiter.release(domain, status, latency, wait)
+            return response
+
+        close = response.close
+        released = []
+
+        def close_and_release():
+            try:
+                close()
+            finally:
+                if not released:
+                    released.append(True)
+                    self.limiter.release(domain, status, latency, wait)
+
+        response.close = close_and_release
+        return response
@@ -0,0 +1,340 @@
+import json
+import time
+import argparse
+import numpy as np
+from PIL import Image, ImageOps
+from catalog_index import CatalogIndex
+
+SAMPLE_SIZE = 64
+PALETTE_SIZE = 5
+KMEANS_ITERATIONS = 12
+# CIE76 distance under which a pixel counts as the backdrop colour
+BACKGROUND_DISTANCE = 12.0
+
+# Names shoppers search by, for queries like "maroon"
+COLOR_NAMES = {
+    "black": "#000000",
+    "white": "#ffffff",
+    "off-white": "#f5f1e6",
+    "cream": "#fffdd0",
+    "beige": "#d8c8a8",
+    "grey": "#808080",
+    "gray": "#808080",
+    "silver": "#c0c0c0",
+    "red": "#c8102e",
+    "maroon": "#800000",
+    "burgundy": "#800020",
+    "rust": "#b7410e",
+    "orange": "#f28c28",
+    "peach": "#ffcba4",
+    "mustard": "#e1ad01",
+    "yellow": "#ffd700",
+    "gold": "#d4af37",
+    "olive": "#708238",
+    "green": "#228b22",
+    "mint": "#98d8b0",
+    "teal": "#008080",
+    "turquoise": "#40e0d0",
+    "sky blue": "#87ceeb",
+    "blue": "#1f4fbf",
+    "navy": "#000080",
+    "purple": "#6a0dad",
+    "lilac": "#c8a2c8",
+    "pink": "#ff8fab",
+    "magenta": "#d1006f",
+    "brown": "#6f4e37",
+    "khaki": "#c3b091",
+}
+
+
+def parse_color(text):
+    """RGB triple for a colour name, "#rrggbb" or "r,g,b" """
+    text = text.strip().lower()
+    text = COLOR_NAMES.get(text, text)
+    if text.startswith("#") and len(text) == 7:
+        return tuple(int(text[i : i + 2], 16) for i in (1, 3, 5))
+    parts = text.split(",")
+    if len(parts) == 3:
+        return tuple(int(part) for part in parts)
+    raise ValueError(f"unknown colour {text!r}")
+
+
+def rgb_to_lab(rgb):
+    """CIELAB (D65) for an (..., 3) array of 0-255 sRGB values"""
+    srgb = np.asarray(rgb, dtype=np.float64) / 255.0
+    linear = np.where(srgb > 0.04045, ((srgb + 0.055) / 1.055) ** 2.4, srgb / 12.92)
+    xyz = linear @ np.array(
+        [
+            [0.4124, 0.2126, 0.0193],
+            [0.3576, 0.7152, 0.1192],
+            [0.1805, 0.0722, 0.9505],
+        ]
+    )
+    xyz /= np.array([0.95047, 1.0, 1.08883])
+    f = np.where(xyz > 0.008856, np.cbrt(xyz), 7.787 * xyz + 16 / 116)
+    return np.stack(
+        [
+            116 * f[..., 1] - 16,
+            500 * (f[..., 0] - f[..., 1]),
+            200 * (f[..., 1] - f[..., 2]),
+        ],
+        axis=-1,
+    )
+
+
+def kmeans(points, k, iterations=KMEANS_ITERATIONS, seed=0):
+    """Lloyd's k-means over an (n, d) array; returns (centers, labels)
+
+    Seeded with k-means++ so results repeat between runs. Assignment is one
+    (n, k) distance matrix per iteration and the update a bincount per
+    dimension, so nothing loops over pixels in Python.
+    """
+    rng = np.random.default_rng(seed)
+    k = min(k, len(points))
+    centers = [points[rng.integers(len(points))]]
+    nearest = ((points - centers[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        if nearest.sum() == 0:
+            break
+        centers.append(points[rng.choice(len(points), p=nearest / nearest.sum())])
+        nearest = np.minimum(nearest, ((points - centers[-1]) ** 2).sum(axis=1))
+    centers = np.array(centers)
+
+    for _ in range(iterations):
+        distances = ((points[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        labels = distances.argmin(axis=1)
+        counts = np.bincount(labels, minlength=len(centers))
+        sums = np.stack(
+            [
+                np.bincount(labels, weights=points[:, d], minlength=len(centers))
+                for d in range(points.shape[1])
+            ],
+            axis=1,
+        )
+        # Empty clusters keep their previous center
+        updated = np.where(
+            counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], centers
+        )
+        if np.allclose(updated, centers):
+            break
+        centers = updated
+    return centers, labels
+
+
+def foreground_pixels(image):
+    """RGB pixels of a downsampled image without its backdrop
+
+    Transparent pixels are dropped, and so are pixels close to the median
+    colour of the image border, which for studio shots is the backdrop.
+    If that would leave almost nothing the whole image is used.
+    """
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail((SAMPLE_SIZE, SAMPLE_SIZE), Image.BILINEAR)
+    rgba = np.asarray(image.convert("RGBA"), dtype=np.float64)
+    rgb, opaque = rgba[..., :3], rgba[..., 3] > 127
+
+    border = np.concatenate([rgb[0], rgb[-1], rgb[:, 0], rgb[:, -1]])
+    background = rgb_to_lab(np.median(border, axis=0))
+    lab = rgb_to_lab(rgb)
+    keep = opaque & (np.linalg.norm(lab - background, axis=-1) > BACKGROUND_DISTANCE)
+    if keep.sum() < 0.05 * keep.size:
+        keep = opaque if opaque.any() else np.ones_like(opaque)
+    return rgb[keep], lab[keep]
+
+
+def palette(path, size=PALETTE_SIZE):
+    """Dominant colours of an image, largest share first
+
+    Returns a list of {"hex", "lab", "weight"} where weight is the share of
+    foreground pixels in that colour's cluster.
+    """
+    with Image.open(path) as image:
+        rgb, lab = foreground_pixels(image)
+    centers, labels = kmeans(lab, size)
+    counts = np.bincount(labels, minlength=len(centers))
+    colors = []
+    for cluster in np.argsort(counts)[::-1]:
+        if counts[cluster] == 0:
+            continue
+        mean_rgb = rgb[labels == cluster].mean(axis=0).round().astype(int)
+        colors.append(
+            {
+                "hex": "#{:02x}{:02x}{:02x}".format(*mean_rgb),
+                "lab": [round(float(v), 2) for v in centers[cluster]],
+                "weight": round(float(counts[cluster] / len(labels)), 4),
+            }
+        )
+    return colors
+
+
+def palette_or_none(path):
+    try:
+        return palette(path)
+    except Exception:
+        return None
+
+
+class ColorIndex:
+    """Dominant-colour palettes for every catalogued image, searchable by colour
+
+    Palettes are stored per image content (sha256) in the catalog database,
+    so each distinct image is clustered once however many runs link it.
+    """
+
+    def __init__(self, root="fashion_dataset", workers=None):
+        self.root = root
+        self.workers = workers
+        self.index = CatalogIndex(root)
+        self.index.db.executescript("""
+            CREATE TABLE IF NOT EXISTS image_palettes (
+                sha256 TEXT PRIMARY KEY,
+                palette TEXT
+            );
+            """)
+        self.matrix = None
+
+    def extract_missing(self):
+        """Cluster images not yet in image_palettes; returns how many were done"""
+        palettes = self.index.missing_images(
+            "image_palettes", palette_or_none, self.workers
+        )
+        if not palettes:
+            return 0
+        self.index.db.executemany(
+            "INSERT OR REPLACE INTO image_palettes VALUES (?, ?)",
+            [
+                (sha256, None if colors is None else json.dumps(colors))
+                for sha256, colors in palettes
+            ],
+        )
+        self.index.db.commit()
+        self.matrix = None
+        return len(palettes)
+
+    def load(self):
+        """Every palette colour as flat arrays: sha256 row, Lab and weight"""
+        rows = self.index.db.execute(
+            "SELECT sha256, palette FROM image_palettes WHERE palette IS NOT NULL"
+        ).fetchall()
+        digests, owners, labs, weights = [], [], [], []
+        for row, (sha256, colors) in enumerate(rows):
+            digests.append(sha256)
+            for color in json.loads(colors):
+                owners.append(row)
+                labs.append(color["lab"])
+                weights.append(color["weight"])
+        self.matrix = (
+            digests,
+            np.array(owners, dtype=np.int64),
+            np.array(labs, dtype=np.float32).reshape(-1, 3),
+            np.array(weights, dtype=np.float32),
+        )
+        return self.matrix
+
+    def nearest(self, color, limit=20, min_weight=0.2, store=None, latest=True):
+        """Products whose images have a dominant colour closest to color
+
+        color is anything parse_color() accepts. Only palette colours
+        covering at least min_weight of the garment count, so a thin trim
+        doesn't match. Returns dicts with the product folder, best image,
+        name, store and CIE76 distance, nearest first.
+        """
+        digests, owners, labs, weights = self.matrix or self.load()
+        if not digests:
+            return []
+        target = rgb_to_lab(parse_color(color)).astype(np.float32)
+        distances = np.linalg.norm(labs - target, axis=1)
+        distances[weights < min_weight] = np.inf
+
+        # Best matching palette colour per image
+        best = np.full(len(digests), np.inf, dtype=np.float32)
+        np.minimum.at(best, owners, distances)
+        order = np.argsort(best)
+        order = order[np.isfinite(best[order])]
+
+        where, params = self.index.where(store=store, latest=latest)
+        allowed = {
+            row[0]
+            for row in self.index.db.execute(
+                f"SELECT folder FROM products{where}", params
+            )
+        }
+        results, seen = [], set()
+        # Scan in distance order; stop once limit distinct products are found
+        for start in range(0, len(order), 256):
+            chunk = [digests[i] for i in order[start : start + 256]]
+            found = self.index.db.execute(
+                f"""SELECT i.sha256, i.folder, i.filename, p.name, p.store
+                FROM images AS i JOIN products AS p ON p.folder = i.folder
+                WHERE i.sha256 IN ({",".join("?" * len(chunk))})""",
+                chunk,
+            ).fetchall()
+            by_digest = {}
+            for sha256, folder, filename, name, product_store in found:
+                by_digest.setdefault(sha256, []).append(
+                    (folder, filename, name, product_store)
+                )
+            for i in order[start : start + 256]:
+                for folder, filename, name, product_store in sorted(
+                    by_digest.get(digests[i], [])
+                ):
+                    if folder in seen or folder not in allowed:
+                        continue
+                    seen.add(folder)
+                    results.append(
+                        {
+                            "folder": folder,
+                            "filename": filename,
+                            "name": name,
+                            "store": product_store,
+                            "distance": round(float(best[i]), 2),
+                        }
+                    )
+                    if len(results) >= limit:
+                        return results
+        return results
+
+    def close(self):
+        self.index.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Extract dominant colours of scraped images and search by colour"
+    )
+    parser.add_argument(
+        "color", nargs="?", help='colour name, "#rrggbb" or "r,g,b" to search for'
+    )
+    parser.add_argument("--root", default="fashion_dataset")
+    parser.add_argument("--store")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument(
+        "--min-weight",
+        type=float,
+        default=0.2,
+        help="smallest share of the garment a matching colour must cover",
+    )
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    colors = ColorIndex(args.root, args.workers)
+    start = time.monotonic()
+    extracted = colors.extract_missing()
+    print(f"Extracted {extracted} new palettes in {time.monotonic() - start:.1f}s")
+
+    if args.color:
+        start = time.monotonic()
+        results = colors.nearest(
+            args.color, args.limit, args.min_weight, store=args.store
+        )
+        print(f"Search took {(time.monotonic() - start) * 1000:.1f}ms")
+        for result in results:
+            print(
+                f"  {result['distance']:6.2f}  {result['name']}  "
+                f"({result['folder']}/{result['filename']})"
+            )
+    colors.close()
+
+
+if __name__ == "__main__":
+    main()
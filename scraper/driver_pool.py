@@ -0,0 +1,107 @@
+import queue
+import threading
+from selenium.common.exceptions import WebDriverException
+
+
+class DriverWorker:
+    """One pool slot; its browser is started on first use and recycled on failure"""
+
+    def __init__(self, worker_id, create_driver):
+        self.worker_id = worker_id
+        self.create_driver = create_driver
+        self.jobs_done = 0
+        self._driver = None
+
+    @property
+    def driver(self):
+        if self._driver is None:
+            print(f"Worker {self.worker_id}: starting browser")
+            self._driver = self.create_driver()
+        return self._driver
+
+    def recycle(self):
+        """Quit the browser; the next job that needs one gets a fresh instance"""
+        if self._driver is None:
+            return
+        try:
+            self._driver.quit()
+        except Exception as e:
+            print(f"Worker {self.worker_id}: error quitting browser: {e}")
+        self._driver = None
+
+
+class DriverPool:
+    """Run product jobs across N workers, each owning at most one browser
+
+    The listing crawl submits jobs as it finds products and only blocks when
+    the queue is full. A WebDriverException recycles the worker's browser
+    and the job is retried once; browsers are also recycled every
+    max_jobs_per_driver jobs to keep Chrome's memory growth in check.
+    """
+
+    def __init__(
+        self, create_driver, size=4, max_jobs_per_driver=100, retries=1, metrics=None
+    ):
+        self.size = size
+        self.metrics = metrics
+        self.max_jobs_per_driver = max_jobs_per_driver
+        self.retries = retries
+        self.workers = [DriverWorker(i, create_driver) for i in range(1, size + 1)]
+        self.jobs = queue.Queue(maxsize=size * 2)
+        self.threads = []
+
+    def start(self, handler):
+        """Start the workers; handler(worker, *job) processes one job"""
+        for worker in self.workers:
+            thread = threading.Thread(
+                target=self._run,
+                args=(worker, handler),
+                name=f"driver-worker-{worker.worker_id}",
+                daemon=True,
+            )
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    def submit(self, *job):
+        self.jobs.put(job)
+
+    def join(self):
+        """Wait for queued jobs to finish, then shut every browser down"""
+        for _ in self.threads:
+            self.jobs.put(None)
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+
+    def _run(self, worker, handler):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+
+            for attempt in range(self.retries + 1):
+                try:
+                    handler(worker, *job)
+                    break
+                except WebDriverException as e:
+                    print(f"Worker {worker.worker_id}: browser failed: {e.msg}")
+                    worker.recycle()
+                    if self.metrics:
+                        self.metrics.count(
+                            "job_retries" if attempt < self.retries else "job_failures"
+                        )
+                except Exception as e:
+                    print(f"Worker {worker.worker_id}: error processing job: {e}")
+                    if self.metrics:
+                        self.metrics.count("job_failures")
+                    break
+
+            worker.jobs_done += 1
+            if (
+                self.max_jobs_per_driver
+                and worker.jobs_done % self.max_jobs_per_driver == 0
+            ):
+                worker.recycle()
+
+        worker.recycle()
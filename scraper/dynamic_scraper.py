@@ -1,324 +1,179 @@
 import os
 import json
 import time
-import requests
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+import argparse
+from selenium.common.exceptions import WebDriverException
 from datetime import datetime
-from urllib.parse import urlparse
+from image_downloader import ImageDownloader, DEFAULT_HEADERS
+from image_verifier import ImageVerifier
+from blob_store import BlobStore
+from derivatives import DerivativeGenerator
+from html_fetcher import HtmlFetcher, DriverPage, NOT_MODIFIED
+from driver_pool import DriverPool
+from domain_limiter import AdaptiveLimiter
+from browser_profile import BrowserProfile
+from readiness import Readiness
+from crawl_state import CrawlState
+from response_cache import ResponseCache
+from crawl_journal import CrawlJournal, journal_path
+from shard_writer import write_shards
+from run_metrics import RunMetrics
+from run_profiler import profile_run
+from magento_api import MagentoCatalogClient
+from stores import (
+    STORES,
+    RUN_FILE,
+    get_store,
+    store_for_url,
+    category_url,
+    dataset_name,
+    cache_ttls,
+)
+from urllib.parse import urlparse, urlsplit, urlunsplit, parse_qsl, urlencode
 
 
-# Base Scraper for Reuse
-class BaseScraper:
-    def __init__(self):
-        options = webdriver.ChromeOptions()
-        options.add_argument("--disable-gpu")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--window-size=1920,1080")
-        self.driver = webdriver.Chrome(options=options)
-
-    def download_image(self, img_url, folder_path, idx):
-        try:
-            response = requests.get(img_url, stream=True, timeout=10)
-            if response.status_code == 200:
-                filename = f"image_{idx}.jpg"
-                filepath = os.path.join(folder_path, filename)
-                with open(filepath, "wb") as f:
-                    f.write(response.content)
-                print(f"Downloaded image {idx}")
-                return True
-        except Exception as e:
-            print(f"Error downloading image {idx}: {e}")
-        return False
-
-    def make_valid_filename(self, s):
-        return (
-            "".join(c if c.isalnum() or c in [" ", "-", "_"] else "" for c in s)
-            .strip()
-            .replace(" ", "_")
+class DynamicScraper:
+    """Crawl engine for any Magento storefront
+
+    What differs between stores (selectors, pagination, extra product
+    fields, dataset folder) comes from a store definition in stores.py;
+    without one the store is looked up by the URL's host, falling back to
+    stock Magento selectors.
+    """
+
+    def __init__(
+        self,
+        base_url,
+        store=None,
+        dataset=None,
+        category=None,
+        fast_path=True,
+        workers=1,
+        profile=None,
+        incremental=False,
+        cache=None,
+        resume=False,
+        derivatives=False,
+        verify=False,
+        prometheus=False,
+        limiter=None,
+    ):
+        self.base_url = base_url
+        self.domain = urlparse(base_url).netloc
+        self.store = store or store_for_url(base_url)
+        self.dataset = dataset or self.domain
+        self.category = category
+        self._driver = None
+        self.metrics = RunMetrics()
+        self.prometheus = prometheus
+        # Page fetches, API calls and image downloads share per-domain
+        # limits that adapt to how the storefront responds
+        self.limiter = limiter or AdaptiveLimiter()
+        blob_store = BlobStore()
+        # Images failing --verify are quarantined as the batch verifier does
+        self.verifier = ImageVerifier(blob_store=blob_store) if verify else None
+        self.downloader = ImageDownloader(
+            blob_store=blob_store,
+            revalidate=incremental,
+            derivatives=(DerivativeGenerator() if derivatives else None),
+            verify=verify,
+            quarantine=self.verifier,
+            metrics=self.metrics,
+            limiter=self.limiter,
         )
-
-    def quit_driver(self):
-        self.driver.quit()
-
-
-# Junaid Jamshed Men Scraper
-class JJScraper(BaseScraper):
-    def __init__(self, section):
-        super().__init__()
-        self.section = section
-        self.urls = {
-            "kameez_shalwar": "https://www.junaidjamshed.com/mens/kameez-shalwar.html",
-            "unstitched": "https://www.junaidjamshed.com/mens/unstitched.html",
-        }
-        self.url = self.urls[self.section]
-
-    def scrape(self):
-        self.driver.get(self.url)
-        dataset_dir = os.path.join(
-            "fashion_dataset", self.section, datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.cache = cache
+        self.fetcher = (
+            HtmlFetcher(self.downloader.session, cache=cache) if fast_path else None
         )
-        os.makedirs(dataset_dir, exist_ok=True)
-        print(f"Scraping {self.section}...")
-
-        page = 1
-        while True:
-            try:
-                products = WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_all_elements_located(
-                        (By.CSS_SELECTOR, "div.product-item-info")
-                    )
-                )
-                for idx, product in enumerate(products, 1):
-                    name = product.find_element(
-                        By.CSS_SELECTOR, "h2.product.name a"
-                    ).text.strip()
-                    product_url = product.find_element(
-                        By.CSS_SELECTOR, "h2.product.name a"
-                    ).get_attribute("href")
-                    print(f"Processing: {name}")
-                    self.scrape_product_details(product_url, dataset_dir, idx, name)
-                page += 1
-                next_page = self.driver.find_elements(
-                    By.CSS_SELECTOR, "li.pages-item-next a"
-                )
-                if next_page:
-                    self.driver.get(next_page[0].get_attribute("href"))
-                    time.sleep(2)
-                else:
-                    break
-            except:
-                break
-        self.quit_driver()
-
-    def scrape_product_details(self, url, base_dir, idx, name):
-        self.driver.execute_script("window.open('');")
-        self.driver.switch_to.window(self.driver.window_handles[-1])
-        self.driver.get(url)
-        folder = os.path.join(base_dir, f"{idx}_{self.make_valid_filename(name)}")
-        os.makedirs(folder, exist_ok=True)
-
-        image_elements = self.driver.find_elements(
-            By.CSS_SELECTOR, ".MagicToolboxSelectorsContainer a.mt-thumb-switcher"
+        self.workers = workers
+        self.pool = None
+        self.readiness = Readiness()
+        self.profile = profile or BrowserProfile(
+            user_agent=DEFAULT_HEADERS["User-Agent"], stealth=True
         )
-        for i, img in enumerate(image_elements, 1):
-            img_url = img.get_attribute("href")
-            self.download_image(img_url, folder, i)
-
-        with open(os.path.join(folder, "metadata.json"), "w") as f:
-            json.dump({"name": name, "url": url}, f, indent=4)
-
-        self.driver.close()
-        self.driver.switch_to.window(self.driver.window_handles[0])
-
+        # Incremental runs only re-scrape products that are new or changed
+        # since the last run; the rest are linked over from it
+        self.state = (
+            CrawlState(os.path.join("fashion_dataset", self.dataset))
+            if incremental
+            else None
+        )
+        self.resume = resume
+        self.journal = None
+        self.dataset_dir = None
 
-# Junaid Jamshed Women Scraper
-class JJWomenScraper(BaseScraper):
-    def __init__(self, section, url):
-        super().__init__()
-        self.section = section
-        self.url = url
+    def create_driver(self):
+        return self.metrics.instrument_driver(self.profile.create_driver())
 
-    def scrape(self):
-        self.driver.get(self.url)
-        dataset_dir = os.path.join(
-            "fashion_dataset", self.section, datetime.now().strftime("%Y%m%d_%H%M%S")
-        )
-        os.makedirs(dataset_dir, exist_ok=True)
-        print(f"Scraping {self.section}...")
+    @property
+    def driver(self):
+        """Chrome is started on first use; HTML-only runs never launch it"""
+        if self._driver is None:
+            self._driver = self.create_driver()
+        return self._driver
 
-        page = 1
+    def create_dataset_structure(self):
+        # Runs are named to the second, and each needs a folder of its own:
+        # two categories sharing a dataset folder can start within one
         while True:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            self.dataset_dir = os.path.join("fashion_dataset", self.dataset, timestamp)
             try:
-                products = WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_all_elements_located(
-                        (By.CSS_SELECTOR, "div.product-item-info")
-                    )
-                )
-                for idx, product in enumerate(products, 1):
-                    try:
-                        name = product.find_element(
-                            By.CSS_SELECTOR, "h2.product.name a"
-                        ).text.strip()
-                        product_url = product.find_element(
-                            By.CSS_SELECTOR, "h2.product.name a"
-                        ).get_attribute("href")
-                        print(f"Processing: {name}")
-
-                        # Create product directory
-                        product_id = f"product_{((page-1)*36)+idx}"
-                        product_name = self.make_valid_filename(name)
-                        product_dir = os.path.join(
-                            dataset_dir, f"{product_id}_{product_name}"
-                        )
-                        os.makedirs(product_dir, exist_ok=True)
-
-                        # Get product details and save
-                        self.scrape_product_details(product_url, product_dir, name)
-                    except Exception as e:
-                        print(f"Error processing product: {e}")
-                        continue
-
-                # Check for next page
-                next_page = self.driver.find_elements(
-                    By.CSS_SELECTOR, "li.pages-item-next a"
-                )
-                if next_page:
-                    self.driver.get(next_page[0].get_attribute("href"))
-                    page += 1
-                    time.sleep(2)
-                else:
-                    break
-            except Exception as e:
-                print(f"Error: {e}")
+                os.makedirs(self.dataset_dir)
                 break
+            except FileExistsError:
+                time.sleep(0.1)
+        run = {
+            "store": self.store["name"],
+            "category": self.category,
+            "base_url": self.base_url,
+        }
+        with open(os.path.join(self.dataset_dir, RUN_FILE), "w", encoding="utf-8") as f:
+            json.dump(run, f, ensure_ascii=False, indent=4)
+        return self.dataset_dir
 
-        self.quit_driver()
-
-    def scrape_product_details(self, url, product_dir, name):
-        """Scrape individual product details"""
-        self.driver.execute_script("window.open('');")
-        self.driver.switch_to.window(self.driver.window_handles[-1])
-        self.driver.get(url)
-        time.sleep(2)
-
-        try:
-            # Get images
-            image_elements = self.driver.find_elements(
-                By.CSS_SELECTOR, ".MagicToolboxSelectorsContainer .mt-thumb-switcher"
-            )
-
-            # Save metadata
-            metadata = {
-                "name": name,
-                "url": url,
-                "price": self.driver.find_element(
-                    By.CSS_SELECTOR, "span.price"
-                ).text.strip(),
-                "sku": self.driver.find_element(
-                    By.CSS_SELECTOR, "div.product.attribute.sku .value"
-                ).text.strip(),
-                "images": [],
-            }
-
-            # Try to get additional details if available
-            try:
-                metadata["description"] = self.driver.find_element(
-                    By.CSS_SELECTOR, "div.product.attribute.overview .value"
-                ).text.strip()
-            except:
-                pass
-
-            try:
-                metadata["fabric_details"] = self.driver.find_element(
-                    By.CSS_SELECTOR, "div.product.attribute.fabric_details .value"
-                ).text.strip()
-            except:
-                pass
-
-            # Download images
-            for idx, img in enumerate(image_elements, 1):
-                img_url = img.get_attribute("href")
-                if img_url and self.download_image(img_url, product_dir, idx):
-                    metadata["images"].append(f"image_{idx}.jpg")
-
-            # Save metadata
-            with open(
-                os.path.join(product_dir, "metadata.json"), "w", encoding="utf-8"
-            ) as f:
-                json.dump(metadata, f, ensure_ascii=False, indent=4)
-
-        except Exception as e:
-            print(f"Error getting product details: {e}")
-
-        self.driver.close()
-        self.driver.switch_to.window(self.driver.window_handles[0])
-
-
-# Sana Safinaz Scraper
-class SanaSafinazScraper(BaseScraper):
-    def __init__(self, category):
-        super().__init__()
-        self.base_url = "https://www.sanasafinaz.com/pk"
-        self.category_url = f"{self.base_url}/{category}.html"
-
-    def scrape(self):
-        dataset_dir = os.path.join(
-            "fashion_dataset", "sanasafinaz", datetime.now().strftime("%Y%m%d_%H%M%S")
-        )
-        os.makedirs(dataset_dir, exist_ok=True)
-        print(f"Scraping Sana Safinaz Category: {self.category_url}")
-
-        self.driver.get(self.category_url)
-        time.sleep(5)
-        products = self.driver.find_elements(By.CSS_SELECTOR, "div.product-item-info")
-        for idx, product in enumerate(products, 1):
-            product_name = product.find_element(
-                By.CSS_SELECTOR, "strong.product.name"
-            ).text.strip()
-            image_element = product.find_element(
-                By.CSS_SELECTOR, "img.product-image-photo"
-            )
-            img_url = image_element.get_attribute("src").split("?")[0]
-
-            folder = os.path.join(
-                dataset_dir, f"{idx}_{self.make_valid_filename(product_name)}"
-            )
-            os.makedirs(folder, exist_ok=True)
-            self.download_image(img_url, folder, 1)
-
-            with open(os.path.join(folder, "metadata.json"), "w") as f:
-                json.dump({"name": product_name, "url": img_url}, f, indent=4)
-
-        self.quit_driver()
-
+    def begin_run(self, handler):
+        """Open a run folder and its journal, resuming the last run if asked
 
-class DynamicScraper:
-    def __init__(self, base_url):
-        self.base_url = base_url
-        self.domain = urlparse(base_url).netloc
-
-        options = webdriver.ChromeOptions()
-        options.add_argument("--disable-gpu")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--window-size=1920,1080")
-        options.add_argument("--disable-notifications")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option("useAutomationExtension", False)
-        self.driver = webdriver.Chrome(options=options)
-        self.driver.execute_cdp_cmd(
-            "Network.setUserAgentOverride",
-            {
-                "userAgent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            },
+        On resume, products that were still in flight are dispatched to
+        handler again. Returns (dataset_dir, page, page_url) to continue the
+        listing crawl from.
+        """
+        self.journal = CrawlJournal(
+            journal_path(os.path.join("fashion_dataset", self.dataset), self.base_url)
         )
-
-    def create_dataset_structure(self):
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.dataset_dir = os.path.join("fashion_dataset", self.domain, timestamp)
-        os.makedirs(self.dataset_dir, exist_ok=True)
-        return self.dataset_dir
-
-    def download_image(self, img_url, folder_path, idx):
-        try:
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            }
-            response = requests.get(img_url, stream=True, timeout=10, headers=headers)
-            if response.status_code == 200:
-                filename = f"image_{idx}.jpg"
-                filepath = os.path.join(folder_path, filename)
-                with open(filepath, "wb") as f:
-                    f.write(response.content)
-                print(f"Downloaded image {idx}")
-                return True
-        except Exception as e:
-            print(f"Error downloading image {idx}: {e}")
-        return False
+        if self.resume and self.journal.resumable(self.base_url):
+            self.journal.reopen()
+            self.dataset_dir = self.journal.dataset_dir
+            for url, job in list(self.journal.in_flight.items()):
+                self.dispatch(handler, url, *job)
+            return self.dataset_dir, self.journal.page, self.journal.page_url
+
+        if self.resume:
+            print(f"No interrupted run of {self.base_url} to resume; starting anew")
+        dataset_dir = self.create_dataset_structure()
+        self.journal.start(dataset_dir, self.base_url)
+        return dataset_dir, 1, self.base_url
+
+    def dispatch_product(self, handler, url, *job):
+        """Journal and dispatch a product unless it is done or already queued"""
+        if self.journal and not self.journal.should_scrape(url):
+            return
+        if self.journal:
+            self.journal.started(url, *job)
+        self.metrics.count("products_dispatched")
+        self.dispatch(handler, url, *job)
+
+    def product_done(self, url):
+        self.metrics.count("products_completed")
+        if self.journal:
+            self.journal.mark_completed(url)
+
+    def note_quarantined(self, metadata, product_dir):
+        """List images that failed --verify in the product's metadata"""
+        quarantined = self.verifier.pending(product_dir) if self.verifier else None
+        if quarantined:
+            metadata["quarantined"] = quarantined
 
     def make_valid_filename(self, s):
         return (
@@ -327,77 +182,191 @@ class DynamicScraper:
             .replace(" ", "_")
         )
 
+    @classmethod
+    def for_store(cls, name, category, **options):
+        """A scraper for one category of a store registered in stores.py"""
+        store = get_store(name)
+        return cls(
+            category_url(store, category),
+            store=store,
+            dataset=dataset_name(store, category),
+            category=category,
+            **options,
+        )
+
     def get_selectors(self):
         """Get website-specific selectors"""
-        if "khaadi" in self.domain:
-            return {
-                "product_grid": "div.product-item-info",
-                "product_name": "a.product-item-link",
-                "product_url": "a.product-item-link",
-                "price": "span.price",
-                "image_container": "div.gallery-placeholder img.gallery-placeholder__image",
-                "next_page": "a.next",
-            }
-        else:
-            return {
-                "product_grid": "div.product-item-info",
-                "product_name": "h2.product.name a",
-                "product_url": "h2.product.name a",
-                "price": "span.price",
-                "image_container": ".MagicToolboxSelectorsContainer .mt-thumb-switcher",
-                "next_page": "li.pages-item-next a",
-            }
-
-    def wait_for_element(self, selector, timeout=20):
-        return WebDriverWait(self.driver, timeout).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-        )
+        return self.store["selectors"]
+
+    def next_page_url(self, listing, page, page_url, found):
+        """URL of the listing page after page, or None on the last one"""
+        pagination = self.store["pagination"]
+        if pagination == "next_link":
+            return listing.attr(self.get_selectors()["next_page"], "href")
+        if pagination == "query" and found:
+            parts = urlsplit(page_url)
+            query = dict(parse_qsl(parts.query), p=str(page + 1))
+            return urlunsplit(parts._replace(query=urlencode(query)))
+        return None
+
+    def product_fields(self, page):
+        """The store's extra product fields that are present on page"""
+        fields = {}
+        for key, selector in self.store["fields"].items():
+            if isinstance(selector, str):
+                value = page.text(selector, None)
+            else:
+                value = page.attrs(*selector) or None
+            if value is not None:
+                fields[key] = value
+        return fields
+
+    def image_urls(self, urls):
+        """Gallery URLs cleaned up by the store's image rules, once each"""
+        rules = self.store["images"]
+        cleaned = []
+        for url in urls:
+            if not url or any(part in url for part in rules.get("exclude", ())):
+                continue
+            if rules.get("strip_query"):
+                url = url.split("?")[0]
+            cleaned.append(url)
+        # Galleries often repeat the main image
+        return list(dict.fromkeys(cleaned))
+
+    def product_id(self, url, position):
+        """Id prefixing a product's folder, per the store's product_id rule"""
+        if self.store["product_id"] == "url":
+            slug = urlparse(url).path.rstrip("/").rsplit("/", 1)[-1].split(".")[0]
+            if slug:
+                return slug
+        return f"product_{position}"
+
+    def load_page(
+        self,
+        url,
+        ready_selector,
+        attribute=None,
+        network_idle=False,
+        worker=None,
+        validators=None,
+        cache_render=True,
+    ):
+        """Load url over HTTP, falling back to Chrome if ready_selector is missing
+
+        In the browser, optionally waits for network idle first (script-built
+        storefronts), then until ready_selector is present, or until every
+        match has attribute populated when one is given. With validators the
+        HTTP request is conditional and NOT_MODIFIED is returned on a 304.
+        Browser renders are cached unless cache_render is False, for callers
+        that keep changing the page (scrolling) and store it themselves.
+        """
+        if self.fetcher:
+            with self.metrics.timer("page_http"):
+                page = self.fetcher.fetch(url, validators)
+            if page is NOT_MODIFIED:
+                return page
+            if page is not None and page.select(ready_selector):
+                return page
+            self.metrics.count("browser_fallbacks")
+            print(f"Falling back to browser for {url}")
+
+        page = self.cached_render(url, ready_selector)
+        if page is not None:
+            return page
+
+        driver = worker.driver if worker else self.driver
+        with self.metrics.timer("page_browser"), self.limiter.slot(url):
+            driver.get(url)
+            if network_idle:
+                self.readiness.for_network_idle(driver)
+            if attribute:
+                self.readiness.for_gallery(driver, ready_selector, attribute)
+            else:
+                self.readiness.for_selector(driver, ready_selector, timeout=20)
+        if cache_render:
+            self.store_render(url, driver)
+        return DriverPage(driver, url)
+
+    def cached_render(self, url, ready_selector):
+        """A fresh browser render of url from the response cache, if any"""
+        cached = self.cache.get(url, rendered=True) if self.cache else None
+        if cached is None or not cached.fresh:
+            return None
+        page = HtmlFetcher.parse(cached.content, url)
+        return page if page.select(ready_selector) else None
+
+    def store_render(self, url, driver):
+        if self.cache:
+            self.cache.put(url, driver.page_source.encode("utf-8"), rendered=True)
+
+    def dispatch(self, handler, *job):
+        """Run handler(*job) inline, or on the driver pool when workers > 1"""
+        if self.workers <= 1:
+            return handler(*job)
+        if self.pool is None:
+            self.pool = DriverPool(
+                self.create_driver, self.workers, metrics=self.metrics
+            ).start(lambda worker, handler, *job: handler(*job, worker=worker))
+        self.pool.submit(handler, *job)
 
     def scrape_products(self):
+        crawl_complete = False
         try:
             print(f"Starting scrape of {self.base_url}")
-            self.driver.get(self.base_url)
-            dataset_dir = self.create_dataset_structure()
-            page = 1
+            dataset_dir, page, page_url = self.begin_run(self.scrape_product_details)
             selectors = self.get_selectors()
 
-            # Initial page load wait
-            time.sleep(5)
-
-            while True:
+            while page_url:
                 try:
                     print(f"\nScraping page {page}...")
-
-                    # Wait for product grid and scroll
-                    self.wait_for_element(selectors["product_grid"])
-                    self.scroll_page()
-                    time.sleep(2)
-
-                    products = self.driver.find_elements(
-                        By.CSS_SELECTOR, selectors["product_grid"]
-                    )
+                    self.journal.listing(page, page_url)
+
+                    with self.metrics.timer("listing_load"):
+                        listing = self.load_page(
+                            page_url,
+                            selectors["product_grid"],
+                            network_idle=True,
+                            cache_render=False,
+                        )
+                        if isinstance(listing, DriverPage):
+                            # Lazy-loaded grids only fill in as the browser scrolls
+                            self.scroll_page()
+                            self.store_render(page_url, self.driver)
+
+                    with self.metrics.timer("extract"):
+                        products = [
+                            (
+                                product.text(selectors["product_name"]),
+                                product.attr(selectors["product_url"], "href"),
+                            )
+                            for product in listing.select(selectors["product_grid"])
+                        ]
                     print(f"Found {len(products)} products on page {page}")
+                    page_url = self.next_page_url(
+                        listing, page, page_url, bool(products)
+                    )
 
-                    for idx, product in enumerate(products, 1):
+                    for idx, (name, product_url) in enumerate(products, 1):
                         try:
-                            name = product.find_element(
-                                By.CSS_SELECTOR, selectors["product_name"]
-                            ).text.strip()
-                            product_url = product.find_element(
-                                By.CSS_SELECTOR, selectors["product_url"]
-                            ).get_attribute("href")
-
                             print(f"Processing: {name}")
 
-                            product_id = f"product_{((page-1)*36)+idx}"
+                            product_id = self.product_id(
+                                product_url, ((page - 1) * 36) + idx
+                            )
                             product_dir = os.path.join(
                                 dataset_dir,
                                 f"{product_id}_{self.make_valid_filename(name)}",
                             )
                             os.makedirs(product_dir, exist_ok=True)
 
-                            self.scrape_product_details(
-                                product_url, product_dir, name, selectors
+                            self.dispatch_product(
+                                self.scrape_product_details,
+                                product_url,
+                                product_dir,
+                                name,
+                                selectors,
+                                product_id,
                             )
 
                         except Exception as e:
@@ -405,26 +374,130 @@ class DynamicScraper:
                             continue
 
                     # Handle pagination
-                    next_page = self.driver.find_elements(
-                        By.CSS_SELECTOR, selectors["next_page"]
-                    )
-                    if next_page and next_page[0].is_displayed():
-                        next_url = next_page[0].get_attribute("href")
-                        self.driver.get(next_url)
+                    if page_url:
                         page += 1
-                        time.sleep(3)
                     else:
                         print("No more pages found.")
-                        break
 
                 except Exception as e:
                     print(f"Error on page {page}: {str(e)}")
                     break
 
+            crawl_complete = not page_url
         except Exception as e:
             print(f"Fatal error: {str(e)}")
         finally:
-            self.driver.quit()
+            if self.pool is not None:
+                self.pool.join()
+                self.pool = None
+            if self._driver is not None:
+                self._driver.quit()
+            self.downloader.close()
+            self.readiness.report()
+            self.close_state()
+            if self.journal:
+                # Failed products stay in flight, so --resume can retry them
+                if crawl_complete and not self.journal.in_flight:
+                    self.journal.finish()
+                self.journal.close()
+            self.write_report()
+
+    def write_report(self):
+        """Save the run's stage timings and counters into its folder"""
+        if self.dataset_dir:
+            self.metrics.write(
+                self.dataset_dir, self.readiness, self.prometheus, self.limiter
+            )
+            print(f"Run report saved to {self.dataset_dir}")
+
+    def close_state(self):
+        if self.state:
+            self.state.report()
+            self.state.close()
+        if self.cache:
+            self.cache.report()
+            self.cache.close()
+
+    def scrape_products_api(self, page_size=100):
+        """Ingest the category through Magento's catalog API instead of a browser"""
+        # Store view code is the path part of base_url, e.g. 'pk'
+        store_code = urlparse(self.store["base_url"]).path.strip("/") or None
+        client = MagentoCatalogClient(
+            self.base_url,
+            store_code,
+            session=self.downloader.session,
+            page_size=page_size,
+        )
+        try:
+            print(f"Starting API scrape of {self.base_url}")
+            dataset_dir = self.create_dataset_structure()
+
+            for idx, product in enumerate(client.iter_products(self.base_url), 1):
+                self.metrics.count("products_dispatched")
+                print(f"Processing: {product['name']}")
+                product_id = self.product_id(product["url"], idx)
+                product_dir = os.path.join(
+                    dataset_dir,
+                    f"{product_id}_{self.make_valid_filename(product['name'])}",
+                )
+                os.makedirs(product_dir, exist_ok=True)
+
+                # The SKU is the stable identity; fall back to the URL
+                product_key = product["sku"] or product["url"]
+                image_urls = self.image_urls(product["image_urls"])
+                fields_hash = CrawlState.fields_hash(product)
+                if (
+                    self.state
+                    and self.state.is_unchanged(product_key, fields_hash)
+                    and self.state.carry_over(
+                        product_key,
+                        product_dir,
+                        product_id=product_id,
+                        timestamp=datetime.now().isoformat(),
+                    )
+                ):
+                    print(f"Unchanged: {product['name']}")
+                    continue
+
+                metadata = {
+                    "name": product["name"],
+                    "url": product["url"],
+                    "images": [],
+                    "price": product["price"],
+                    "sku": product["sku"],
+                    "product_id": product_id,
+                    "timestamp": datetime.now().isoformat(),
+                }
+
+                def save_metadata(
+                    images,
+                    metadata=metadata,
+                    product_dir=product_dir,
+                    product_key=product_key,
+                    fields_hash=fields_hash,
+                ):
+                    metadata["images"] = images
+                    self.note_quarantined(metadata, product_dir)
+                    with open(
+                        os.path.join(product_dir, "metadata.json"),
+                        "w",
+                        encoding="utf-8",
+                    ) as f:
+                        json.dump(metadata, f, ensure_ascii=False, indent=4)
+                    if self.state:
+                        self.state.record(
+                            product_key, metadata["url"], fields_hash, product_dir
+                        )
+                    self.metrics.count("products_completed")
+
+                self.downloader.submit_all(image_urls, product_dir, save_metadata)
+
+        except Exception as e:
+            print(f"Fatal error: {str(e)}")
+        finally:
+            self.downloader.close()
+            self.close_state()
+            self.write_report()
 
     def scroll_page(self):
         last_height = self.driver.execute_script("return document.body.scrollHeight")
@@ -432,68 +505,255 @@ class DynamicScraper:
             self.driver.execute_script(
                 "window.scrollTo(0, document.body.scrollHeight);"
             )
-            time.sleep(2)
-            new_height = self.driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height:
+            # Stop as soon as a scroll no longer loads more products
+            if not self.readiness.for_height_change(self.driver, last_height):
                 break
-            last_height = new_height
+            last_height = self.driver.execute_script(
+                "return document.body.scrollHeight"
+            )
 
-    def scrape_product_details(self, url, product_dir, name, selectors):
+    def scrape_product_details(
+        self, url, product_dir, name, selectors, product_id=None, worker=None
+    ):
         try:
-            self.driver.execute_script("window.open('');")
-            self.driver.switch_to.window(self.driver.window_handles[-1])
-            self.driver.get(url)
-            time.sleep(3)
+            validators = self.state.validators(url) if self.state else None
+            with self.metrics.timer("product_load"):
+                page = self.load_page(
+                    url,
+                    selectors["image_container"],
+                    attribute=selectors["image_attribute"],
+                    worker=worker,
+                    validators=validators,
+                )
+            if page is NOT_MODIFIED:
+                if self.state.carry_over(
+                    url,
+                    product_dir,
+                    product_id=product_id,
+                    timestamp=datetime.now().isoformat(),
+                ):
+                    print(f"Unchanged: {name}")
+                    self.product_done(url)
+                    return
+                with self.metrics.timer("product_load"):
+                    page = self.load_page(
+                        url,
+                        selectors["image_container"],
+                        attribute=selectors["image_attribute"],
+                        worker=worker,
+                    )
 
-            metadata = {"name": name, "url": url, "images": []}
+            with self.metrics.timer("extract"):
+                metadata = {"name": name, "url": url, "images": []}
 
-            # Get price
-            try:
-                metadata["price"] = self.driver.find_element(
-                    By.CSS_SELECTOR, selectors["price"]
-                ).text.strip()
-            except:
-                metadata["price"] = "N/A"
+                # Get price
+                metadata["price"] = page.text(selectors["price"], "N/A")
+                metadata.update(self.product_fields(page))
 
-            # Get images
-            try:
-                if "khaadi" in self.domain:
-                    image_elements = self.driver.find_elements(
-                        By.CSS_SELECTOR, selectors["image_container"]
+                image_urls = self.image_urls(
+                    page.attrs(
+                        selectors["image_container"], selectors["image_attribute"]
                     )
-                    image_urls = [img.get_attribute("src") for img in image_elements]
-                else:
-                    image_elements = self.driver.find_elements(
-                        By.CSS_SELECTOR, selectors["image_container"]
-                    )
-                    image_urls = [img.get_attribute("href") for img in image_elements]
+                )
 
-                for idx, img_url in enumerate(image_urls, 1):
-                    if img_url and self.download_image(img_url, product_dir, idx):
-                        metadata["images"].append(f"image_{idx}.jpg")
+            # Product pages are keyed on their URL
+            fields_hash = CrawlState.fields_hash(dict(metadata, images=image_urls))
+            if self.state and self.state.is_unchanged(url, fields_hash):
+                if self.state.carry_over(
+                    url,
+                    product_dir,
+                    product_id=product_id,
+                    timestamp=datetime.now().isoformat(),
+                ):
+                    self.state.save_validators(url, page.validators)
+                    print(f"Unchanged: {name}")
+                    self.product_done(url)
+                    return
+            # Left out of the hash: they change without the product changing
+            if product_id:
+                metadata["product_id"] = product_id
+            metadata["timestamp"] = datetime.now().isoformat()
+
+            def save_metadata(images):
+                metadata["images"] = images
+                self.note_quarantined(metadata, product_dir)
+                with open(
+                    os.path.join(product_dir, "metadata.json"), "w", encoding="utf-8"
+                ) as f:
+                    json.dump(metadata, f, ensure_ascii=False, indent=4)
+                if self.state:
+                    # Validators are only kept once the product is on disk, so
+                    # a 304 always has a previous folder to carry over
+                    self.state.record(url, url, fields_hash, product_dir)
+                    self.state.save_validators(url, page.validators)
+                self.product_done(url)
+
+            # Images download in the background while we move to the next product
+            self.downloader.submit_all(image_urls, product_dir, save_metadata)
+
+        except WebDriverException:
+            # Let the driver pool restart a crashed browser and retry
+            raise
+        except Exception as e:
+            self.metrics.count("product_failures")
+            print(f"Error getting product details: {str(e)}")
 
-            except Exception as e:
-                print(f"Error getting images: {str(e)}")
 
-            with open(
-                os.path.join(product_dir, "metadata.json"), "w", encoding="utf-8"
-            ) as f:
-                json.dump(metadata, f, ensure_ascii=False, indent=4)
+def engine_parser(description):
+    """Argument parser with the options every scraper entry point shares"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "--api",
+        action="store_true",
+        help="read products from the Magento GraphQL catalog instead of HTML pages",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of parallel workers for product detail pages",
+    )
+    parser.add_argument(
+        "--show-browser",
+        action="store_true",
+        help="run Chrome with a visible window instead of headless",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only re-scrape products that are new or changed since the last run",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="serve repeated page fetches from the on-disk response cache",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=24,
+        help="hours before a cached page is revalidated, for stores that don't "
+        "set their own cache_ttl (default: 24)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue the last interrupted run from its crawl journal",
+    )
+    parser.add_argument(
+        "--shards",
+        metavar="DIR",
+        help="pack the finished run into WebDataset tar shards in DIR",
+    )
+    parser.add_argument(
+        "--derivatives",
+        action="store_true",
+        help="generate resized WebP/AVIF variants as images are downloaded",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="fully decode each image after download and drop broken ones",
+    )
+    parser.add_argument(
+        "--prometheus",
+        action="store_true",
+        help="also write the run's metrics as a Prometheus text file",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="save a CPU profile, time breakdown and peak memory with the run",
+    )
+    return parser
+
+
+def engine_options(args):
+    """DynamicScraper keyword arguments for parsed engine_parser() options"""
+    return {
+        "workers": args.workers,
+        "profile": BrowserProfile(
+            headless=not args.show_browser,
+            user_agent=DEFAULT_HEADERS["User-Agent"],
+            stealth=True,
+        ),
+        "incremental": args.incremental,
+        "cache": (
+            ResponseCache(default_ttl=args.cache_ttl * 3600, ttls=cache_ttls())
+            if args.cache
+            else None
+        ),
+        "resume": args.resume,
+        "derivatives": args.derivatives,
+        "verify": args.verify,
+        "prometheus": args.prometheus,
+    }
+
+
+def run_engine(scraper, args):
+    """Crawl with scraper as the parsed options ask, then pack shards"""
+    run = scraper.scrape_products_api if args.api else scraper.scrape_products
+    profile_run(run, lambda: scraper.dataset_dir, args.profile)
+    print("\nScraping completed!")
 
-        except Exception as e:
-            print(f"Error getting product details: {str(e)}")
-        finally:
-            self.driver.close()
-            self.driver.switch_to.window(self.driver.window_handles[0])
+    if args.shards and scraper.dataset_dir:
+        manifest = write_shards([scraper.dataset_dir], args.shards)
+        print(f"Packed {manifest['samples']} products into {args.shards}")
+
+
+def choose(title, options):
+    """Numbered menu on stdin; returns the chosen option or None"""
+    print(f"Select {title}:")
+    for number, option in enumerate(options, 1):
+        print(f"{number}. {option}")
+    choice = input(f"Enter your choice (1-{len(options)}): ").strip()
+    if choice.isdigit() and 1 <= int(choice) <= len(options):
+        return options[int(choice) - 1]
+    print("Invalid choice!")
+    return None
+
+
+def store_main(store=None, categories=None, description="Scrape a fashion store"):
+    """Command line for registered stores, asking for whatever isn't given
+
+    store pins the store and categories limits its categories, for the
+    per-store scripts; otherwise --store and --category pick them, with a
+    menu for each that is left out.
+    """
+    parser = engine_parser(description)
+    if store is None:
+        parser.add_argument("--store", choices=list(STORES))
+    parser.add_argument("--category")
+    args = parser.parse_args()
+
+    store = store or args.store or choose("Store", list(STORES))
+    if store is None:
+        return
+    categories = categories or list(get_store(store)["categories"])
+    category = args.category
+    if category is None:
+        category = categories[0] if len(categories) == 1 else None
+        category = category or choose("Category", categories)
+    if category is None:
+        return
+    if category not in categories:
+        parser.error(f"{store} has no category {category!r}")
+
+    scraper = DynamicScraper.for_store(store, category, **engine_options(args))
+    run_engine(scraper, args)
 
 
 def main():
-    print("Enter the URL to scrape:")
-    url = input().strip()
+    parser = engine_parser("Scrape a Magento category")
+    parser.add_argument("url", nargs="?", help="category URL to scrape")
+    args = parser.parse_args()
 
-    scraper = DynamicScraper(url)
-    scraper.scrape_products()
-    print("\nScraping completed!")
+    url = args.url
+    if not url:
+        print("Enter the URL to scrape:")
+        url = input().strip()
+
+    run_engine(DynamicScraper(url, **engine_options(args)), args)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,139 @@
+import lxml.html
+import requests
+from selenium.webdriver.common.by import By
+from image_downloader import DEFAULT_HEADERS
+from crawl_state import conditional_headers, response_validators
+
+# Returned by HtmlFetcher.fetch when a conditional request gets 304
+NOT_MODIFIED = object()
+
+
+class HtmlPage:
+    """Server-rendered HTML queried with the same CSS selectors as Selenium"""
+
+    def __init__(self, root, url=None, validators=None):
+        self.root = root
+        self.url = url
+        self.validators = validators
+
+    def select(self, selector):
+        return [HtmlPage(el, self.url) for el in self.root.cssselect(selector)]
+
+    def text(self, selector=None, default=""):
+        """Whitespace-normalised text of the first match, like WebElement.text"""
+        matches = self.root.cssselect(selector) if selector else [self.root]
+        if not matches:
+            return default
+        return " ".join(matches[0].text_content().split())
+
+    def attr(self, selector, name):
+        values = self.attrs(selector, name)
+        return values[0] if values else None
+
+    def attrs(self, selector, name):
+        return [el.get(name) for el in self.root.cssselect(selector)]
+
+
+class DriverPage:
+    """The page currently loaded in a WebDriver, behind the HtmlPage interface"""
+
+    def __init__(self, root, url=None):
+        self.root = root
+        self.url = url
+        self.validators = None
+
+    def select(self, selector):
+        return [
+            DriverPage(el, self.url)
+            for el in self.root.find_elements(By.CSS_SELECTOR, selector)
+        ]
+
+    def text(self, selector=None, default=""):
+        if not selector:
+            return self.root.text.strip()
+        matches = self.root.find_elements(By.CSS_SELECTOR, selector)
+        return matches[0].text.strip() if matches else default
+
+    def attr(self, selector, name):
+        values = self.attrs(selector, name)
+        return values[0] if values else None
+
+    def attrs(self, selector, name):
+        return [
+            el.get_attribute(name)
+            for el in self.root.find_elements(By.CSS_SELECTOR, selector)
+        ]
+
+
+class HtmlFetcher:
+    """Fetch pages over plain HTTP, skipping the browser for server-rendered HTML"""
+
+    def __init__(self, session=None, timeout=15, cache=None):
+        self.timeout = timeout
+        self.cache = cache
+        self.session = session or requests.Session()
+        if session is None:
+            self.session.headers.update(DEFAULT_HEADERS)
+
+    def fetch(self, url, validators=None):
+        """Return an HtmlPage for url, or None if it can't be fetched as HTML
+
+        With validators saved from an earlier response the request is made
+        conditional, and NOT_MODIFIED is returned when the server answers 304.
+        With a response cache, fresh entries are served without a request and
+        expired ones are revalidated using their own validators.
+        """
+        cached = self.cache.get(url) if self.cache else None
+        if cached is not None and cached.fresh:
+            return self.parse_cached(cached)
+        if cached is not None and any(cached.validators.values()):
+            validators = cached.validators
+        else:
+            cached = None
+
+        try:
+            response = self.session.get(
+                url, headers=conditional_headers(validators), timeout=self.timeout
+            )
+        except Exception as e:
+            print(f"Error fetching {url}: {e}")
+            return None
+        if response.status_code == 304 and cached is not None:
+            self.cache.refresh(url)
+            return self.parse_cached(cached)
+        if response.status_code == 304 and validators:
+            return NOT_MODIFIED
+        if response.status_code != 200:
+            print(f"Got HTTP {response.status_code} for {url}")
+            return None
+        if "html" not in response.headers.get("Content-Type", "text/html"):
+            return None
+        try:
+            page = self.parse(response.content, response.url)
+        except Exception as e:
+            print(f"Error parsing {url}: {e}")
+            return None
+        page.validators = response_validators(response)
+        if self.cache:
+            headers = {
+                name: response.headers[name]
+                for name in ("Content-Type", "ETag", "Last-Modified")
+                if name in response.headers
+            }
+            self.cache.put(url, response.content, headers, response.url)
+        return page
+
+    def parse_cached(self, cached):
+        try:
+            page = self.parse(cached.content, cached.url)
+        except Exception as e:
+            print(f"Error parsing cached {cached.url}: {e}")
+            return None
+        page.validators = cached.validators
+        return page
+
+    @staticmethod
+    def parse(html, url):
+        root = lxml.html.fromstring(html, base_url=url)
+        root.make_links_absolute(url)
+        return HtmlPage(root, url)
@@ -0,0 +1,316 @@
+import os
+import hashlib
+import time
+import tempfile
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from PIL import Image
+from crawl_state import conditional_headers, response_validators
+from run_metrics import RunMetrics
+from domain_limiter import LimitedAdapter
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+}
+
+CONTENT_TYPE_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/jpg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/avif": ".avif",
+    "image/gif": ".gif",
+}
+
+CHUNK_SIZE = 64 * 1024
+
+
+def sniff_extension(head):
+    """Return the file extension for an image's leading bytes, or None"""
+    if head.startswith(b"\xff\xd8\xff"):
+        return ".jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return ".png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"avif", b"avis"):
+        return ".avif"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return ".gif"
+    return None
+
+
+def image_extension(head, content_type):
+    """Pick an extension from magic bytes, falling back to the Content-Type
+
+    Returns None for anything that is not an image, such as the HTML error
+    pages some CDNs serve with a 200 status.
+    """
+    extension = sniff_extension(head)
+    if extension:
+        return extension
+    if head.lstrip()[:1] == b"<":
+        return None
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    return CONTENT_TYPE_EXTENSIONS.get(media_type)
+
+
+def verify_image(path):
+    """Return None if path holds a complete, decodable image, else why not
+
+    The header is probed first, which catches HTML error pages and empty
+    files cheaply; then the whole image is decoded, which catches
+    truncated and corrupt data.
+    """
+    try:
+        with open(path, "rb") as f:
+            head = f.read(32)
+    except OSError as e:
+        return f"unreadable: {e}"
+    if not head:
+        return "empty file"
+    if sniff_extension(head) is None:
+        return "HTML page" if head.lstrip()[:1] == b"<" else "unknown format"
+    try:
+        with Image.open(path) as image:
+            image.verify()
+        # verify() checks structure only; load() decodes every pixel
+        with Image.open(path) as image:
+            image.load()
+    except Exception as e:
+        return f"corrupt: {e}"
+    return None
+
+
+class ImageDownloader:
+    """Download images on a bounded thread pool over one keep-alive session"""
+
+    def __init__(
+        self,
+        max_workers=8,
+        max_pending=64,
+        timeout=10,
+        headers=None,
+        blob_store=None,
+        revalidate=False,
+        derivatives=None,
+        verify=False,
+        quarantine=None,
+        metrics=None,
+        limiter=None,
+    ):
+        self.timeout = timeout
+        self.verify = verify
+        # An ImageVerifier that takes files failing verify, as its batch
+        # run would
+        self.quarantine = quarantine
+        self.metrics = metrics or RunMetrics()
+        self.blob_store = blob_store
+        self.derivatives = derivatives
+        self.revalidate = revalidate and blob_store is not None
+        self.session = requests.Session()
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        # With a DomainLimiter every request on the session, page fetches
+        # included, counts against its caps
+        if limiter:
+            adapter = LimitedAdapter(
+                limiter, pool_connections=4, pool_maxsize=max_workers
+            )
+        else:
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="image-download"
+        )
+        # Caps queued work so a fast listing crawl can't buffer the whole catalog
+        self.slots = threading.BoundedSemaphore(max_pending)
+
+    def download(self, img_url, folder_path, idx):
+        """Download one image and return its filename, or None on failure
+
+        The body is streamed to a temporary file in folder_path and renamed
+        into place only once complete, so a crash never leaves a truncated
+        image behind. The extension follows the actual image format. With a
+        blob store, URLs fetched by earlier runs are linked without a request,
+        or after a conditional request answered 304 when revalidating.
+        With verify, the file is fully decoded before it is kept; one that
+        fails goes to the quarantine, if given, instead of being deleted.
+        """
+        tmp_path = None
+        try:
+            known = self.blob_store.lookup(img_url) if self.blob_store else None
+            if known and not self.revalidate:
+                return self.reuse(known, folder_path, idx)
+
+            validators = self.blob_store.validators(img_url) if known else None
+            transfer_start = time.perf_counter()
+            self.metrics.count("image_requests")
+            with self.session.get(
+                img_url,
+                headers=conditional_headers(validators),
+                stream=True,
+                timeout=self.timeout,
+            ) as response:
+                if response.status_code == 304 and known:
+                    return self.reuse(known, folder_path, idx)
+                if response.status_code != 200:
+                    print(f"Error downloading image {idx}: HTTP {response.status_code}")
+                    self.metrics.count("image_failures")
+                    return None
+
+                fd, tmp_path = tempfile.mkstemp(
+                    prefix=f".image_{idx}.", suffix=".part", dir=folder_path
+                )
+                size = 0
+                head = b""
+                digest = hashlib.sha256()
+                with os.fdopen(fd, "wb") as f:
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        if len(head) < 32:
+                            head += chunk[: 32 - len(head)]
+                        digest.update(chunk)
+                        f.write(chunk)
+                        size += len(chunk)
+                    self.metrics.observe(
+                        "image_transfer", time.perf_counter() - transfer_start
+                    )
+                    self.metrics.count("bytes_downloaded", size)
+                    write_start = time.perf_counter()
+                    f.flush()
+                    os.fsync(f.fileno())
+                write_seconds = time.perf_counter() - write_start
+
+                # Content-Length counts encoded bytes, so only compare it when
+                # the body wasn't transfer-compressed
+                expected = response.headers.get("Content-Length")
+                encoded = response.headers.get("Content-Encoding", "identity")
+                if expected and encoded == "identity" and size != int(expected):
+                    raise IOError(f"truncated: got {size} of {expected} bytes")
+
+                extension = image_extension(head, response.headers.get("Content-Type"))
+                if extension is None:
+                    raise ValueError(
+                        f"not an image ({response.headers.get('Content-Type')})"
+                    )
+                if self.verify:
+                    with self.metrics.timer("image_verify"):
+                        reason = verify_image(tmp_path)
+                    if reason:
+                        if self.quarantine:
+                            self.quarantine.quarantine(
+                                folder_path,
+                                f"image_{idx}{extension}",
+                                reason,
+                                [img_url],
+                                source=tmp_path,
+                            )
+                            tmp_path = None
+                        self.metrics.count("images_quarantined")
+                        raise ValueError(reason)
+
+            filename = f"image_{idx}{extension}"
+            write_start = time.perf_counter()
+            if self.blob_store:
+                self.blob_store.add(
+                    tmp_path,
+                    digest.hexdigest(),
+                    extension,
+                    img_url,
+                    response_validators(response),
+                )
+                tmp_path = None
+                self.blob_store.link(
+                    digest.hexdigest(), extension, folder_path, filename
+                )
+            else:
+                # mkstemp creates owner-only files; match a normal open()
+                os.chmod(tmp_path, 0o644)
+                os.replace(tmp_path, os.path.join(folder_path, filename))
+                tmp_path = None
+            self.metrics.observe(
+                "image_write", write_seconds + time.perf_counter() - write_start
+            )
+            self.metrics.count("images_downloaded")
+            print(f"Downloaded image {idx}")
+            self.make_derivatives(folder_path, filename)
+            return filename
+        except Exception as e:
+            print(f"Error downloading image {idx}: {e}")
+            self.metrics.count("image_failures")
+            return None
+        finally:
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def reuse(self, known, folder_path, idx):
+        filename = f"image_{idx}{known[1]}"
+        self.blob_store.link(*known, folder_path, filename)
+        self.metrics.count("images_reused")
+        print(f"Reused image {idx}")
+        self.make_derivatives(folder_path, filename)
+        return filename
+
+    def make_derivatives(self, folder_path, filename):
+        """Hand a saved image to the derivative generator's process pool"""
+        if self.derivatives:
+            self.derivatives.submit(folder_path, filename)
+
+    def submit(self, img_url, folder_path, idx):
+        """Queue one image download, blocking only while the queue is full"""
+        self.slots.acquire()
+        try:
+            future = self.executor.submit(self.download, img_url, folder_path, idx)
+        except Exception:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future
+
+    def submit_all(self, img_urls, folder_path, callback=None):
+        """Queue a product's gallery and call callback(filenames) once all finish
+
+        Images keep their 1-based gallery position as idx; empty URLs are
+        skipped. The callback runs on a worker thread and receives the
+        filenames that downloaded successfully, in gallery order.
+        """
+        jobs = [(idx, url) for idx, url in enumerate(img_urls, 1) if url]
+        if not jobs:
+            if callback:
+                callback([])
+            return []
+
+        results = {}
+        remaining = [len(jobs)]
+        lock = threading.Lock()
+
+        def on_done(idx, future):
+            with lock:
+                results[idx] = future.result() if not future.exception() else None
+                remaining[0] -= 1
+                finished = remaining[0] == 0
+            if finished and callback:
+                try:
+                    callback([results[i] for i in sorted(results) if results[i]])
+                except Exception as e:
+                    print(f"Error finishing downloads for {folder_path}: {e}")
+
+        futures = []
+        for idx, url in jobs:
+            future = self.submit(url, folder_path, idx)
+            future.add_done_callback(lambda f, idx=idx: on_done(idx, f))
+            futures.append(future)
+        return futures
+
+    def close(self):
+        """Wait for queued downloads and release pooled connections"""
+        self.executor.shutdown(wait=True)
+        self.session.close()
+        if self.derivatives:
+            self.derivatives.close()
+            self.derivatives.report()
+        if self.blob_store:
+            self.blob_store.close()
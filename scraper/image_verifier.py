@@ -0,0 +1,241 @@
+import os
+import json
+import shutil
+import argparse
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from image_downloader import ImageDownloader, verify_image
+from blob_store import IMAGE_FILE, BlobStore, file_sha256
+
+QUARANTINE_DIR = ".quarantine"
+REDOWNLOAD_QUEUE = "redownload.jsonl"
+
+
+def write_json(path, data):
+    """Replace a JSON file atomically, leaving hardlinked copies untouched"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=4)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+
+
+class ImageVerifier:
+    """Decode every image of a run on a process pool and quarantine bad ones
+
+    Bad files are moved under <root>/.quarantine/, dropped from their
+    product's metadata "images" and listed under "quarantined" with the
+    reason, and their source URLs (from the blob store index) are queued in
+    .quarantine/redownload.jsonl. The bad blob is forgotten, so the next
+    download fetches the image again.
+
+    ImageDownloader(verify=True, quarantine=verifier) hands files that fail
+    inline verification to the same path. Their product's metadata isn't
+    written yet, so the note waits in pending() for the scraper to add.
+    """
+
+    def __init__(self, root="fashion_dataset", workers=None, blob_store=None):
+        self.root = root
+        self.workers = workers
+        self.blob_store = blob_store
+        self.quarantine_dir = os.path.join(root, QUARANTINE_DIR)
+        self.queue_path = os.path.join(self.quarantine_dir, REDOWNLOAD_QUEUE)
+        self.blob_inodes = None
+        self.lock = threading.Lock()
+        self.unsaved = {}
+        self.stats = {"verified": 0, "quarantined": 0}
+
+    def images(self, path):
+        """(folder, filename) for every image in product folders under path"""
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            if "metadata.json" not in filenames:
+                continue
+            dirnames[:] = []
+            for filename in sorted(filenames):
+                if IMAGE_FILE.match(filename):
+                    yield dirpath, filename
+
+    def verify(self, paths):
+        """Verify every image under paths; returns the quarantined entries"""
+        # Hardlinked copies of one blob share an inode, so decode each once
+        by_inode = {}
+        for path in paths:
+            for folder, filename in self.images(path):
+                stat = os.stat(os.path.join(folder, filename))
+                by_inode.setdefault((stat.st_dev, stat.st_ino), []).append(
+                    (folder, filename)
+                )
+
+        files = [copies[0] for copies in by_inode.values()]
+        with ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            reasons = executor.map(
+                verify_image,
+                [os.path.join(folder, filename) for folder, filename in files],
+                chunksize=32,
+            )
+            quarantined = []
+            for copies, reason in zip(by_inode.values(), reasons):
+                self.stats["verified"] += len(copies)
+                if reason is None:
+                    continue
+                urls = self.forget_blob(os.path.join(*copies[0]))
+                for folder, filename in copies:
+                    quarantined.append(self.quarantine(folder, filename, reason, urls))
+        return quarantined
+
+    def forget_blob(self, path):
+        """Drop the blob behind a bad file from the store; returns its URLs"""
+        if not self.blob_store:
+            return []
+        # A blob corrupted on disk no longer hashes to its name, so find it
+        # through the inode it shares with the product's hardlink first
+        if self.blob_inodes is None:
+            self.blob_inodes = {}
+            for dirpath, _, filenames in os.walk(self.blob_store.objects_dir):
+                for filename in filenames:
+                    stat = os.stat(os.path.join(dirpath, filename))
+                    self.blob_inodes[(stat.st_dev, stat.st_ino)] = filename
+        stat = os.stat(path)
+        blob = self.blob_inodes.get((stat.st_dev, stat.st_ino))
+        digest = os.path.splitext(blob)[0] if blob else file_sha256(path)
+        return self.blob_store.forget(digest)
+
+    def quarantine(self, folder, filename, reason, urls, source=None):
+        """Move one bad image aside, note it in metadata and queue a re-download
+
+        source is where the file is now, if not yet at folder/filename.
+        """
+        relative = os.path.relpath(folder, self.root)
+        target_dir = os.path.join(self.quarantine_dir, relative)
+        os.makedirs(target_dir, exist_ok=True)
+        shutil.move(
+            source or os.path.join(folder, filename),
+            os.path.join(target_dir, filename),
+        )
+
+        entry = {
+            "folder": folder,
+            "filename": filename,
+            "idx": int(IMAGE_FILE.match(filename).group(1)),
+            "reason": reason,
+            "url": urls[0] if urls else None,
+        }
+        metadata_path = os.path.join(folder, "metadata.json")
+        try:
+            with open(metadata_path, encoding="utf-8") as f:
+                metadata = json.load(f)
+        except (OSError, ValueError):
+            metadata = None
+        note = {"filename": filename, "reason": reason, "url": entry["url"]}
+        if isinstance(metadata, dict):
+            if isinstance(metadata.get("images"), list):
+                metadata["images"] = [i for i in metadata["images"] if i != filename]
+            metadata.setdefault("quarantined", []).append(note)
+            write_json(metadata_path, metadata)
+
+        with self.lock:
+            if not isinstance(metadata, dict):
+                self.unsaved.setdefault(folder, []).append(note)
+            self.stats["quarantined"] += 1
+            if entry["url"]:
+                with open(self.queue_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        print(f"Quarantined {os.path.join(relative, filename)}: {reason}")
+        return entry
+
+    def pending(self, folder):
+        """Quarantine notes for a product whose metadata wasn't written yet"""
+        with self.lock:
+            return sorted(
+                self.unsaved.pop(folder, []), key=lambda note: note["filename"]
+            )
+
+    def redownload(self, downloader):
+        """Fetch queued images again, restoring them in their product metadata
+
+        Entries that still fail stay in the queue for the next attempt.
+        """
+        if not os.path.exists(self.queue_path):
+            return 0
+        with open(self.queue_path, encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+
+        failed, restored = [], 0
+        for entry in entries:
+            if not os.path.isdir(entry["folder"]):
+                continue
+            filename = downloader.download(entry["url"], entry["folder"], entry["idx"])
+            if filename is None:
+                failed.append(entry)
+                continue
+            self.restore(entry, filename)
+            restored += 1
+
+        with open(self.queue_path, "w", encoding="utf-8") as f:
+            for entry in failed:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return restored
+
+    def restore(self, entry, filename):
+        metadata_path = os.path.join(entry["folder"], "metadata.json")
+        with open(metadata_path, encoding="utf-8") as f:
+            metadata = json.load(f)
+        metadata["quarantined"] = [
+            q
+            for q in metadata.get("quarantined", [])
+            if q["filename"] != entry["filename"]
+        ]
+        if not metadata["quarantined"]:
+            del metadata["quarantined"]
+        if isinstance(metadata.get("images"), list):
+            images = set(metadata["images"]) | {filename}
+            metadata["images"] = sorted(
+                images, key=lambda name: int(IMAGE_FILE.match(name).group(1))
+            )
+        write_json(metadata_path, metadata)
+
+    def report(self):
+        print(
+            f"\nVerified {self.stats['verified']} images, "
+            f"quarantined {self.stats['quarantined']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Verify scraped images and quarantine broken ones"
+    )
+    parser.add_argument(
+        "paths", nargs="*", default=["fashion_dataset"], help="run or dataset folders"
+    )
+    parser.add_argument("--root", default="fashion_dataset")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument(
+        "--redownload",
+        action="store_true",
+        help="then fetch quarantined images again from their source URLs",
+    )
+    args = parser.parse_args()
+
+    blob_root = os.path.join(args.root, ".blobs")
+    blob_store = BlobStore(blob_root) if os.path.isdir(blob_root) else None
+    verifier = ImageVerifier(args.root, args.workers, blob_store)
+    verifier.verify(args.paths)
+    verifier.report()
+
+    if args.redownload:
+        downloader = ImageDownloader(blob_store=blob_store, verify=True)
+        restored = verifier.redownload(downloader)
+        downloader.close()
+        print(f"Re-downloaded {restored} images")
+    elif blob_store:
+        blob_store.close()
+
+
+if __name__ == "__main__":
+    main()
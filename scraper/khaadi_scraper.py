@@ -0,0 +1,10 @@
+from dynamic_scraper import store_main
+
+
+def main():
+    # Khaadi is only a store definition in stores.py
+    store_main("khaadi", description="Scrape a Khaadi category")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import requests
+from urllib.parse import urlparse
+from image_downloader import DEFAULT_HEADERS
+
+CATEGORY_QUERY = """
+query ($path: String!) {
+  categoryList(filters: {url_path: {eq: $path}}) { uid name }
+}
+"""
+
+PRODUCTS_QUERY = """
+query ($uid: String!, $pageSize: Int!, $currentPage: Int!) {
+  products(
+    filter: {category_uid: {eq: $uid}}
+    pageSize: $pageSize
+    currentPage: $currentPage
+  ) {
+    total_count
+    page_info { current_page total_pages }
+    items {
+      sku
+      name
+      url_key
+      url_suffix
+      price_range {
+        minimum_price {
+          regular_price { value currency }
+          final_price { value currency }
+        }
+      }
+      media_gallery { url label position disabled }
+    }
+  }
+}
+"""
+
+
+class MagentoCatalogClient:
+    """Read category listings in bulk from Magento's GraphQL catalog API"""
+
+    def __init__(
+        self, store_url, store_code=None, session=None, page_size=100, timeout=30
+    ):
+        parsed = urlparse(store_url)
+        self.origin = f"{parsed.scheme}://{parsed.netloc}"
+        self.graphql_url = f"{self.origin}/graphql"
+        # Multi-store sites like sanasafinaz.com/pk/ select the store view by
+        # path; GraphQL selects it with the Store header instead
+        self.store_code = store_code
+        # Product pages are served under the store view path
+        self.store_url = f"{self.origin}/{store_code}" if store_code else self.origin
+        self.page_size = page_size
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        if session is None:
+            self.session.headers.update(DEFAULT_HEADERS)
+
+    def query(self, query, variables):
+        headers = {"Store": self.store_code} if self.store_code else {}
+        response = self.session.post(
+            self.graphql_url,
+            json={"query": query, "variables": variables},
+            headers=headers,
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        payload = response.json()
+        if payload.get("errors"):
+            raise RuntimeError(payload["errors"][0].get("message", "GraphQL error"))
+        return payload["data"]
+
+    def category_uid(self, category_url):
+        """Resolve a category page URL like /mens/kameez-shalwar.html to its uid"""
+        path = urlparse(category_url).path.strip("/")
+        if self.store_code and path.startswith(self.store_code + "/"):
+            path = path[len(self.store_code) + 1 :]
+        if path.endswith(".html"):
+            path = path[: -len(".html")]
+
+        categories = self.query(CATEGORY_QUERY, {"path": path})["categoryList"]
+        if not categories:
+            raise ValueError(f"No category found for {category_url}")
+        return categories[0]["uid"]
+
+    def iter_products(self, category_url):
+        """Yield every product in a category, page_size products per request"""
+        uid = self.category_uid(category_url)
+        current_page = 1
+        while True:
+            result = self.query(
+                PRODUCTS_QUERY,
+                {
+                    "uid": uid,
+                    "pageSize": self.page_size,
+                    "currentPage": current_page,
+                },
+            )["products"]
+            print(
+                f"Fetched page {current_page}/{result['page_info']['total_pages']}"
+                f" ({result['total_count']} products)"
+            )
+            for item in result["items"]:
+                yield self.normalize(item)
+
+            if current_page >= result["page_info"]["total_pages"]:
+                break
+            current_page += 1
+
+    def normalize(self, item):
+        """Flatten a GraphQL product into the fields the scrapers write"""
+        prices = item["price_range"]["minimum_price"]
+        gallery = sorted(
+            (m for m in item.get("media_gallery") or [] if not m.get("disabled")),
+            key=lambda m: m.get("position") or 0,
+        )
+        return {
+            "name": item["name"],
+            "url": f"{self.store_url}/{item['url_key']}{item.get('url_suffix') or '.html'}",
+            "sku": item["sku"],
+            "price": self.format_price(prices["final_price"]),
+            "old_price": self.format_price(prices["regular_price"]),
+            "image_urls": [m["url"] for m in gallery],
+        }
+
+    def format_price(self, price):
+        """Render a price like the storefront does, e.g. PKR 4,990"""
+        return f"{price['currency']} {price['value']:,.0f}"
@@ -0,0 +1,427 @@
+import argparse
+import functools
+import html
+import json
+import random
+import re
+import struct
+import threading
+import time
+import zlib
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# One markup serving every store definition's selectors: Junaid Jamshed and
+# stock Magento (h2.product.name a, MagicToolbox gallery, sku, overview,
+# fabric_details), Sana Safinaz (strong.product.name and
+# img.product-image-photo) and Khaadi (a.product-item-link, a.next,
+# gallery-placeholder). Gallery thumbnails are resized copies with a query
+# string, and one is a lazy-load placeholder, as on the live Magento themes.
+LISTING_ITEM = """
+<li class="item product product-item">
+  <div class="product-item-info">
+    <a href="{url}" class="product photo product-item-photo">
+      <img class="product-image-photo" src="{image}" alt="{name}">
+    </a>
+    <div class="product details product-item-details">
+      <h2 class="product name product-item-name">
+        <a class="product-item-link" href="{url}">{name}</a>
+      </h2>
+      <strong class="product name product-item-name">{name}</strong>
+      <div class="price-box"><span class="price">{price}</span></div>
+    </div>
+  </div>
+</li>"""
+
+NEXT_PAGE = """
+<li class="item pages-item-next">
+  <a class="action next" href="{url}" title="Next"><span>Next</span></a>
+</li>"""
+
+PRODUCT_PAGE = """<!DOCTYPE html>
+<html><head><title>{name}</title></head><body>
+<div class="product media">
+  <div class="gallery-placeholder">
+    <img class="gallery-placeholder__image" src="{image}" alt="{name}">
+  </div>
+  <div class="MagicToolboxSelectorsContainer">{thumbs}
+    <img class="product-image-photo" src="{placeholder}" alt="">
+  </div>
+</div>
+<div class="product-info-main">
+  <h1 class="page-title"><span class="base">{name}</span></h1>
+  <strong class="product name product-item-name">{name}</strong>
+  <div class="price-box"><span class="price">{price}</span></div>
+  <div class="product attribute sku">
+    <strong class="type">SKU</strong><div class="value">{sku}</div>
+  </div>
+  <div class="product attribute overview"><div class="value">{description}</div></div>
+  <div class="product attribute description"><div class="value">{description}</div></div>
+  <div class="product attribute fabric_details"><div class="value">Cotton</div></div>
+</div>
+</body></html>"""
+
+THUMB = """
+    <a class="mt-thumb-switcher" href="{image}">
+      <img class="product-image-photo" src="{image}?width=265&amp;height=398" alt="">
+    </a>"""
+
+PLACEHOLDER = (
+    "/static/frontend/Magento/luma/en_US/Magento_Catalog/images/product/"
+    "placeholder/image.jpg"
+)
+
+
+@functools.lru_cache(maxsize=512)
+def make_png(width, height, rgb):
+    """Encode a solid-colour PNG without any imaging library"""
+
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    row = b"\x00" + bytes(rgb) * width
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(row * height))
+        + chunk(b"IEND", b"")
+    )
+
+
+class MockCatalog:
+    """Synthetic Magento catalog: categories of products with image galleries"""
+
+    def __init__(
+        self,
+        categories=None,
+        products_per_category=120,
+        images_per_product=3,
+        page_size=36,
+        image_size=(48, 64),
+        broken_image=None,
+    ):
+        self.images_per_product = images_per_product
+        # Gallery position served cut short, to exercise --verify
+        self.broken_image = broken_image
+        # Pages and images carry validators, so re-crawls can get 304s
+        self.last_modified = formatdate(usegmt=True)
+        self.page_size = page_size
+        self.image_size = image_size
+        self.categories = {}
+        for c_idx, path in enumerate(categories or ["mens/kameez-shalwar"]):
+            uid = f"Q0FU{c_idx}"
+            self.categories[path] = {
+                "uid": uid,
+                "name": path.split("/")[-1].replace("-", " ").title(),
+                "products": [
+                    self.make_product(c_idx, p_idx)
+                    for p_idx in range(1, products_per_category + 1)
+                ],
+            }
+        self.products_by_key = {
+            product["url_key"]: product
+            for category in self.categories.values()
+            for product in category["products"]
+        }
+
+    def make_product(self, c_idx, p_idx):
+        sku = f"MOCK-{c_idx}-{p_idx:05d}"
+        return {
+            "sku": sku,
+            "name": f"Mock Kurta {c_idx}-{p_idx} | {sku}",
+            "url_key": f"mock-kurta-{c_idx}-{p_idx}",
+            "url_suffix": ".html",
+            "price": 2990 + (p_idx % 20) * 250,
+            "images": [
+                f"/media/catalog/product/{sku.lower()}_{i}.png"
+                for i in range(1, self.images_per_product + 1)
+            ],
+        }
+
+    def category_by_uid(self, uid):
+        for category in self.categories.values():
+            if category["uid"] == uid:
+                return category
+        return None
+
+
+class RequestStats:
+    """Requests and response bytes served, by kind, since the last reset"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {"requests": {}, "bytes": 0}
+
+    def reset(self):
+        """Zero the counters; returns what they held"""
+        with self.lock:
+            snapshot = self.counts
+            self.counts = {"requests": {}, "bytes": 0}
+        return snapshot
+
+    def record(self, kind, size):
+        with self.lock:
+            requests = self.counts["requests"]
+            requests[kind] = requests.get(kind, 0) + 1
+            self.counts["bytes"] += size
+
+
+class MockMagentoHandler(BaseHTTPRequestHandler):
+    catalog = None
+    origin = ""
+    latency = 0.0
+    jitter = 0.0
+    stats = None
+    # Requests served at once before answering 429, like a throttling CDN
+    capacity = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, status, content_type, body, kind="other", headers=None):
+        # Simulated server and network time, per response
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        if self.stats:
+            self.stats.record(kind, len(body))
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_validated(self, content_type, body, kind):
+        """Send body with an ETag and Last-Modified, or 304 if the client has it"""
+        etag = f'"{zlib.crc32(body):08x}"'
+        headers = {"ETag": etag, "Last-Modified": self.catalog.last_modified}
+        match = self.headers.get("If-None-Match")
+        since = self.headers.get("If-Modified-Since")
+        # If-None-Match wins when both are sent, as in RFC 9110
+        if match == etag or (match is None and since == self.catalog.last_modified):
+            return self.send_body(304, content_type, b"", "not_modified", headers)
+        self.send_body(200, content_type, body, kind, headers)
+
+    def do_POST(self):
+        self.within_capacity(self.route_post)
+
+    def do_GET(self):
+        self.within_capacity(self.route_get)
+
+    def within_capacity(self, route):
+        if self.capacity is None:
+            return route()
+        if not self.capacity.acquire(blocking=False):
+            return self.send_body(429, "text/plain", b"Too many requests", "throttled")
+        try:
+            route()
+        finally:
+            self.capacity.release()
+
+    def route_post(self):
+        if self.path != "/graphql":
+            return self.send_body(404, "text/plain", b"Not found")
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        data = self.resolve(request.get("query", ""), request.get("variables") or {})
+        self.send_body(
+            200, "application/json", json.dumps({"data": data}).encode(), "graphql"
+        )
+
+    def route_get(self):
+        url = urlsplit(self.path)
+        image = re.match(r"^/media/catalog/product/(.+)_(\d+)\.png$", url.path)
+        if image:
+            # Colour derived from the file name so every image differs
+            seed = zlib.crc32(url.path.encode())
+            rgb = (seed & 0xFF, (seed >> 8) & 0xFF, (seed >> 16) & 0xFF)
+            body = make_png(*self.catalog.image_size, rgb)
+            if int(image.group(2)) == self.catalog.broken_image:
+                body = body[: len(body) // 2]
+            return self.send_validated("image/png", body, "image")
+
+        key = url.path.strip("/")
+        key = key[: -len(".html")] if key.endswith(".html") else key
+        if key in self.catalog.categories:
+            page = int(parse_qs(url.query).get("p", ["1"])[0])
+            body = self.listing_page(self.catalog.categories[key], key, page)
+            return self.send_validated("text/html; charset=utf-8", body, "listing")
+        if key in self.catalog.products_by_key:
+            body = self.product_page(self.catalog.products_by_key[key])
+            return self.send_validated("text/html; charset=utf-8", body, "product")
+        self.send_body(404, "text/plain", b"Not found")
+
+    def product_url(self, product):
+        return f"{self.origin}/{product['url_key']}{product['url_suffix']}"
+
+    def listing_page(self, category, path, page):
+        """A server-rendered category grid, page_size products per page"""
+        size = self.catalog.page_size
+        products = category["products"][(page - 1) * size : page * size]
+        items = "".join(
+            LISTING_ITEM.format(
+                url=html.escape(self.product_url(product)),
+                image=self.origin + product["images"][0],
+                name=html.escape(product["name"]),
+                price=f"PKR {product['price']:,}",
+            )
+            for product in products
+        )
+        pager = ""
+        if page * size < len(category["products"]):
+            pager = NEXT_PAGE.format(url=f"{self.origin}/{path}.html?p={page + 1}")
+        return (
+            f"<!DOCTYPE html><html><head><title>{category['name']}</title></head>"
+            f'<body><ol class="products list items product-items">{items}</ol>'
+            f'<div class="pages"><ul class="items pages-items">{pager}</ul></div>'
+            "</body></html>"
+        ).encode()
+
+    def product_page(self, product):
+        images = [self.origin + path for path in product["images"]]
+        return PRODUCT_PAGE.format(
+            name=html.escape(product["name"]),
+            image=images[0],
+            thumbs="".join(THUMB.format(image=image) for image in images),
+            placeholder=self.origin + PLACEHOLDER,
+            price=f"PKR {product['price']:,}",
+            sku=product["sku"],
+            description=f"Mock description of {html.escape(product['name'])}",
+        ).encode()
+
+    def resolve(self, query, variables):
+        if "categoryList" in query:
+            category = self.catalog.categories.get(variables.get("path"))
+            if category is None:
+                return {"categoryList": []}
+            return {
+                "categoryList": [{"uid": category["uid"], "name": category["name"]}]
+            }
+
+        category = self.catalog.category_by_uid(variables.get("uid"))
+        products = category["products"] if category else []
+        page_size = variables.get("pageSize", 20)
+        current_page = variables.get("currentPage", 1)
+        start = (current_page - 1) * page_size
+        return {
+            "products": {
+                "total_count": len(products),
+                "page_info": {
+                    "current_page": current_page,
+                    "total_pages": max(1, -(-len(products) // page_size)),
+                },
+                "items": [
+                    self.graphql_item(p) for p in products[start : start + page_size]
+                ],
+            }
+        }
+
+    def graphql_item(self, product):
+        price = {"value": product["price"], "currency": "PKR"}
+        return {
+            "sku": product["sku"],
+            "name": product["name"],
+            "url_key": product["url_key"],
+            "url_suffix": product["url_suffix"],
+            "price_range": {
+                "minimum_price": {"regular_price": price, "final_price": price}
+            },
+            "media_gallery": [
+                {
+                    "url": self.origin + path,
+                    "label": product["name"],
+                    "position": position,
+                    "disabled": False,
+                }
+                for position, path in enumerate(product["images"], 1)
+            ],
+        }
+
+
+class MockMagentoServer:
+    """Local stand-in for a Magento storefront, for offline scraper runs"""
+
+    def __init__(
+        self,
+        catalog=None,
+        host="127.0.0.1",
+        port=0,
+        latency=0.0,
+        jitter=0.0,
+        capacity=None,
+    ):
+        self.catalog = catalog or MockCatalog()
+        self.stats = RequestStats()
+        handler = type(
+            "Handler",
+            (MockMagentoHandler,),
+            {
+                "catalog": self.catalog,
+                "latency": latency,
+                "jitter": jitter,
+                "stats": self.stats,
+                "capacity": threading.Semaphore(capacity) if capacity else None,
+            },
+        )
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.base_url = f"http://{host}:{self.httpd.server_address[1]}"
+        handler.origin = self.base_url
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def category_url(self, path):
+        return f"{self.base_url}/{path}.html"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a mock Magento catalog")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--products", type=int, default=120)
+    parser.add_argument("--images", type=int, default=3)
+    parser.add_argument(
+        "--category", action="append", help="category url_path, e.g. mens/unstitched"
+    )
+    parser.add_argument("--page-size", type=int, default=36)
+    parser.add_argument(
+        "--latency", type=float, default=0, help="added delay per response in ms"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0, help="extra random delay up to this in ms"
+    )
+    parser.add_argument(
+        "--capacity",
+        type=int,
+        help="requests served at once; any more are answered 429",
+    )
+    args = parser.parse_args()
+
+    catalog = MockCatalog(args.category, args.products, args.images, args.page_size)
+    server = MockMagentoServer(
+        catalog,
+        port=args.port,
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        capacity=args.capacity,
+    )
+    for path in catalog.categories:
+        print(f"Serving {server.category_url(path)}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import os
+import time
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from dynamic_scraper import DynamicScraper, engine_parser, engine_options
+from domain_limiter import AdaptiveLimiter
+from run_profiler import profile_run
+from shard_writer import write_shards
+from stores import STORES, get_store, dataset_name
+
+
+def all_jobs(stores=None):
+    """(store, category) for every category of stores, default all stores"""
+    return [
+        (store, category)
+        for store in stores or STORES
+        for category in get_store(store)["categories"]
+    ]
+
+
+def plan_lanes(jobs):
+    """Group jobs into lanes that can run side by side
+
+    Jobs writing the same dataset folder share its incremental state, so
+    they queue one after another in a single lane.
+    Lanes are interleaved across stores, so when only some can start at
+    once every store gets one going before any store gets a second.
+    """
+    lanes = {}
+    for store, category in jobs:
+        dataset = dataset_name(get_store(store), category)
+        lanes.setdefault(dataset, []).append((store, category))
+
+    by_store = {}
+    for lane in lanes.values():
+        by_store.setdefault(lane[0][0], []).append(lane)
+    ordered = []
+    while any(by_store.values()):
+        for queue in by_store.values():
+            if queue:
+                ordered.append(queue.pop(0))
+    return ordered
+
+
+class Orchestrator:
+    """Run many store crawls at once under shared politeness limits
+
+    Every crawl's HTTP requests, page fetches and image downloads alike, go
+    through one limiter (see domain_limiter): a global cap on requests in
+    flight plus per-domain connection and rate caps, granted fairly across
+    domains.
+    max_crawls bounds how many crawls (and so browsers, if pages fall back
+    to Chrome) run at the same time.
+    """
+
+    def __init__(self, jobs, limiter, options, max_crawls=None, api=False):
+        self.lanes = plan_lanes(jobs)
+        self.limiter = limiter
+        self.options = options
+        self.max_crawls = max_crawls or len(self.lanes)
+        self.api = api
+        self.lock = threading.Lock()
+        self.results = []
+
+    def run_job(self, store, category):
+        # Each crawl closes its own response cache, so options are per job
+        scraper = DynamicScraper.for_store(
+            store, category, limiter=self.limiter, **self.options()
+        )
+        start = time.perf_counter()
+        if self.api:
+            scraper.scrape_products_api()
+        else:
+            scraper.scrape_products()
+        result = {
+            "store": store,
+            "category": category,
+            "dataset_dir": scraper.dataset_dir,
+            "seconds": time.perf_counter() - start,
+            "products": scraper.metrics.counters.get("products_completed", 0),
+        }
+        with self.lock:
+            self.results.append(result)
+        print(
+            f"Finished {store} {category}: {result['products']} products "
+            f"in {result['seconds']:.1f}s"
+        )
+        return result
+
+    def run_lane(self, lane):
+        for store, category in lane:
+            try:
+                self.run_job(store, category)
+            except Exception as e:
+                print(f"Crawl of {store} {category} failed: {e}")
+
+    def run(self):
+        """Crawl every job; returns one result dict per finished crawl"""
+        with ThreadPoolExecutor(
+            max_workers=self.max_crawls, thread_name_prefix="crawl"
+        ) as executor:
+            futures = [executor.submit(self.run_lane, lane) for lane in self.lanes]
+            for future in futures:
+                future.result()
+        return self.results
+
+
+def profile_dir():
+    # One profile covers every crawl, so it gets a folder of its own
+    path = os.path.join(
+        "fashion_dataset",
+        ".profiles",
+        f"orchestrator_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+    )
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def main():
+    parser = engine_parser("Crawl several stores at once with shared rate limits")
+    parser.add_argument(
+        "--store",
+        action="append",
+        choices=list(STORES),
+        help="store to crawl, all its categories (repeatable; default: all)",
+    )
+    parser.add_argument(
+        "--job",
+        action="append",
+        metavar="STORE:CATEGORY",
+        help="one category to crawl (repeatable)",
+    )
+    parser.add_argument(
+        "--max-crawls",
+        type=int,
+        help="crawls running at once (default: all)",
+    )
+    parser.add_argument(
+        "--max-requests",
+        type=int,
+        default=32,
+        help="requests in flight across all stores (default: 32)",
+    )
+    parser.add_argument(
+        "--per-domain",
+        type=int,
+        default=16,
+        help="most requests in flight per domain; the limit in use adapts "
+        "below it (default: 16)",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        help="most requests per second per domain (default: no cap)",
+    )
+    args = parser.parse_args()
+
+    jobs = []
+    for job in args.job or []:
+        store, _, category = job.partition(":")
+        if store not in STORES or category not in STORES[store]["categories"]:
+            parser.error(f"unknown job {job!r}; expected STORE:CATEGORY")
+        jobs.append((store, category))
+    if args.store or not jobs:
+        jobs += all_jobs(args.store)
+
+    orchestrator = Orchestrator(
+        list(dict.fromkeys(jobs)),
+        AdaptiveLimiter(args.max_requests, args.per_domain, args.rate),
+        lambda: engine_options(args),
+        max_crawls=args.max_crawls,
+        api=args.api,
+    )
+    start = time.perf_counter()
+    results = profile_run(orchestrator.run, profile_dir, args.profile)
+    print(
+        f"\nCrawled {sum(r['products'] for r in results)} products from "
+        f"{len(results)} categories in {time.perf_counter() - start:.1f}s"
+    )
+    for domain, limits in orchestrator.limiter.report().items():
+        print(
+            f"  {domain}: {limits['limit']} concurrent, "
+            f"{limits['rate'] or 'unlimited'} req/s, {limits['latency_ms']}ms latency"
+        )
+
+    run_dirs = [r["dataset_dir"] for r in results if r["dataset_dir"]]
+    if args.shards and run_dirs:
+        manifest = write_shards(run_dirs, args.shards)
+        print(f"Packed {manifest['samples']} products into {args.shards}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import os
+import json
+import argparse
+from datetime import datetime
+import pyarrow as pa
+import pyarrow.dataset as ds
+from catalog_index import CatalogIndex
+
+PARTITION_COLUMNS = ["store", "section", "run"]
+
+SCHEMA = pa.schema(
+    [
+        ("store", pa.string()),
+        ("section", pa.string()),
+        ("run", pa.string()),
+        ("run_at", pa.timestamp("s")),
+        ("folder", pa.string()),
+        ("name", pa.string()),
+        ("url", pa.string()),
+        ("sku", pa.string()),
+        ("price_pkr", pa.int64()),
+        ("old_price_pkr", pa.int64()),
+        ("sizes", pa.list_(pa.string())),
+        ("description", pa.string()),
+        ("fabric_details", pa.string()),
+        ("image_paths", pa.list_(pa.string())),
+        ("image_sha256", pa.list_(pa.string())),
+        ("image_bytes", pa.list_(pa.int64())),
+    ]
+)
+
+PRODUCTS_QUERY = """
+SELECT p.*,
+    (SELECT json_group_array(json_array(filename, sha256, size)) FROM (
+        SELECT filename, sha256, size FROM images AS i
+        WHERE i.folder = p.folder ORDER BY position
+    )) AS image_rows
+FROM products AS p
+ORDER BY p.store, p.section, p.run, p.folder
+"""
+
+
+def partitioning():
+    fields = [SCHEMA.field(name) for name in PARTITION_COLUMNS]
+    return ds.partitioning(pa.schema(fields), flavor="hive")
+
+
+def product_record(row):
+    metadata = json.loads(row["metadata"])
+    images = json.loads(row["image_rows"])
+    sizes = metadata.get("sizes") or []
+    return {
+        "store": row["store"],
+        "section": row["section"],
+        "run": row["run"],
+        "run_at": datetime.fromisoformat(row["run_at"]) if row["run_at"] else None,
+        "folder": row["folder"],
+        "name": row["name"],
+        "url": row["url"],
+        "sku": row["sku"],
+        "price_pkr": row["price_pkr"],
+        "old_price_pkr": row["old_price_pkr"],
+        "sizes": [str(size) for size in sizes if size],
+        "description": metadata.get("description") or None,
+        "fabric_details": metadata.get("fabric_details") or None,
+        "image_paths": [f"{row['folder']}/{name}" for name, _, _ in images],
+        "image_sha256": [digest for _, digest, _ in images],
+        "image_bytes": [size for _, _, size in images],
+    }
+
+
+def record_batches(index, batch_size):
+    """Stream the catalog as Arrow record batches of up to batch_size rows"""
+    cursor = index.db.execute(PRODUCTS_QUERY)
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        yield pa.RecordBatch.from_pylist(
+            [product_record(row) for row in rows], schema=SCHEMA
+        )
+
+
+def export_parquet(root="fashion_dataset", out_dir="catalog_parquet", batch_size=5000):
+    """Write every run under root to Parquet, partitioned by store/section/run
+
+    The catalog index is brought up to date first, then rows stream from
+    it in batches so memory stays flat however many runs there are.
+    Partitions that are written again replace their previous files.
+    Returns the number of products exported.
+    """
+    index = CatalogIndex(root)
+    try:
+        index.update()
+        total = index.db.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+        reader = pa.RecordBatchReader.from_batches(
+            SCHEMA, record_batches(index, batch_size)
+        )
+        ds.write_dataset(
+            reader,
+            out_dir,
+            format="parquet",
+            partitioning=partitioning(),
+            existing_data_behavior="delete_matching",
+            basename_template="products-{i}.parquet",
+        )
+        return total
+    finally:
+        index.close()
+
+
+def read_catalog(out_dir="catalog_parquet", columns=None, filter=None):
+    """Load the exported catalog as one Arrow table
+
+    filter is a pyarrow.dataset expression, e.g.
+    ds.field("store") == "sanasafinaz"; partition columns prune whole files.
+    """
+    dataset = ds.dataset(out_dir, format="parquet", partitioning=partitioning())
+    return dataset.to_table(columns=columns, filter=filter)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export fashion_dataset to partitioned Parquet"
+    )
+    parser.add_argument("--root", default="fashion_dataset")
+    parser.add_argument("--out", default="catalog_parquet")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    total = export_parquet(args.root, args.out, args.batch_size)
+    print(f"Exported {total} products to {os.path.abspath(args.out)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+import json
+import time
+import argparse
+import numpy as np
+from PIL import Image, ImageOps
+from catalog_index import CatalogIndex
+
+HASH_SIZE = 8
+DCT_SIZE = 32
+
+# DCT-II basis for the 32x32 grayscale thumbnail pHash is taken from
+DCT_MATRIX = np.cos(
+    np.pi / DCT_SIZE * np.arange(DCT_SIZE)[:, None] * (np.arange(DCT_SIZE) + 0.5)
+)
+
+# Bit counts for every byte, for NumPy builds without np.bitwise_count
+BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def phash(path):
+    """64-bit perceptual hash: signs of the lowest 8x8 DCT frequencies"""
+    with Image.open(path) as image:
+        gray = ImageOps.exif_transpose(image).convert("L")
+        gray = gray.resize((DCT_SIZE, DCT_SIZE), Image.LANCZOS)
+        pixels = np.asarray(gray, dtype=np.float64)
+    low = (DCT_MATRIX @ pixels @ DCT_MATRIX.T)[:HASH_SIZE, :HASH_SIZE].ravel()
+    bits = low > np.median(low[1:])
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def phash_or_none(path):
+    try:
+        return phash(path)
+    except Exception:
+        return None
+
+
+def to_signed(value):
+    # SQLite integers are signed 64-bit
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def popcount(values):
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    as_bytes = values[..., None].view(np.uint8)
+    return BYTE_POPCOUNT[as_bytes].sum(axis=-1, dtype=np.uint8)
+
+
+def near_duplicate_pairs(hashes, threshold=6):
+    """Index pairs (i, j), i < j, of hashes within threshold bits of each other
+
+    Pigeonhole banding: split the 64 bits into threshold + 1 bands, and any
+    two hashes that close must agree exactly on at least one band. Hashes
+    are only compared, as packed uint64 XOR + popcount blocks, within groups
+    sharing a band value, never all against all.
+    """
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    bands = min(threshold + 1, 64)
+    edges = np.linspace(0, 64, bands + 1).astype(int)
+    found = []
+    for start, stop in zip(edges[:-1], edges[1:]):
+        mask = np.uint64((1 << int(stop - start)) - 1)
+        keys = (hashes >> np.uint64(start)) & mask
+        order = np.argsort(keys, kind="stable")
+        boundaries = np.flatnonzero(np.diff(keys[order])) + 1
+        for group in np.split(order, boundaries):
+            if len(group) < 2:
+                continue
+            block = hashes[group]
+            distances = popcount(block[:, None] ^ block[None, :])
+            i, j = np.nonzero(np.triu(distances <= threshold, k=1))
+            if len(i):
+                found.append(np.stack([group[i], group[j]], axis=1))
+    if not found:
+        return np.empty((0, 2), dtype=np.int64)
+    pairs = np.concatenate(found)
+    pairs.sort(axis=1)
+    return np.unique(pairs, axis=0)
+
+
+def cluster_labels(count, pairs):
+    """Connected components over pairs: a label per item, its smallest member"""
+    labels = np.arange(count)
+    if len(pairs) == 0:
+        return labels
+    i, j = pairs[:, 0], pairs[:, 1]
+    while True:
+        lowest = np.minimum(labels[i], labels[j])
+        updated = labels.copy()
+        np.minimum.at(updated, i, lowest)
+        np.minimum.at(updated, j, lowest)
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+class NearDuplicateFinder:
+    """Perceptual hashes for every catalogued image, and clusters of near-copies
+
+    Hashes are stored per image content (sha256) in the catalog database,
+    so each distinct image is hashed once however many runs link it.
+    """
+
+    def __init__(self, root="fashion_dataset", workers=None):
+        self.root = root
+        self.workers = workers
+        self.index = CatalogIndex(root)
+        self.index.db.executescript("""
+            CREATE TABLE IF NOT EXISTS image_hashes (
+                sha256 TEXT PRIMARY KEY,
+                phash INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS image_clusters (
+                sha256 TEXT PRIMARY KEY,
+                cluster INTEGER NOT NULL
+            );
+            """)
+
+    def hash_missing(self):
+        """Hash images not yet in image_hashes; returns how many were hashed"""
+        hashed = self.index.missing_images("image_hashes", phash_or_none, self.workers)
+        if not hashed:
+            return 0
+        self.index.db.executemany(
+            "INSERT OR REPLACE INTO image_hashes VALUES (?, ?)",
+            [
+                (sha256, None if value is None else to_signed(value))
+                for sha256, value in hashed
+            ],
+        )
+        self.index.db.commit()
+        return len(hashed)
+
+    def clusters(self, threshold=6):
+        """Group images whose hashes are within threshold bits
+
+        Returns clusters of two or more distinct images, largest first, each
+        a list of {sha256, folder, filename, store, name} for every product
+        image with that content. Cluster ids are also saved to image_clusters.
+        """
+        rows = self.index.db.execute(
+            "SELECT sha256, phash FROM image_hashes WHERE phash IS NOT NULL"
+        ).fetchall()
+        digests = [sha256 for sha256, _ in rows]
+        hashes = np.array([value for _, value in rows], dtype=np.int64).view(np.uint64)
+
+        # Byte-identical hashes collapse first so banding groups stay small
+        unique, inverse = np.unique(hashes, return_inverse=True)
+        pairs = near_duplicate_pairs(unique, threshold)
+        labels = cluster_labels(len(unique), pairs)[inverse.ravel()]
+
+        sizes = np.bincount(labels, minlength=len(labels))
+        members = {}
+        for digest, label in zip(digests, labels):
+            if sizes[label] > 1:
+                members.setdefault(int(label), []).append(digest)
+
+        self.index.db.execute("DELETE FROM image_clusters")
+        self.index.db.executemany(
+            "INSERT INTO image_clusters VALUES (?, ?)",
+            [
+                (digest, cluster)
+                for cluster, group in members.items()
+                for digest in group
+            ],
+        )
+        self.index.db.commit()
+
+        clusters = []
+        for cluster, group in members.items():
+            images = self.index.db.execute(
+                f"""SELECT i.sha256, i.folder, i.filename, p.store, p.name
+                FROM images AS i JOIN products AS p ON p.folder = i.folder
+                WHERE i.sha256 IN ({",".join("?" * len(group))})
+                ORDER BY p.store, i.folder""",
+                group,
+            ).fetchall()
+            keys = ("sha256", "folder", "filename", "store", "name")
+            clusters.append(
+                {
+                    "cluster": cluster,
+                    "images": [dict(zip(keys, image)) for image in images],
+                }
+            )
+        clusters.sort(key=lambda c: len(c["images"]), reverse=True)
+        return clusters
+
+    def close(self):
+        self.index.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Find near-duplicate images across stores and runs"
+    )
+    parser.add_argument("--root", default="fashion_dataset")
+    parser.add_argument(
+        "--threshold", type=int, default=6, help="max differing hash bits"
+    )
+    parser.add_argument("--out", default="near_duplicates.json")
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    finder = NearDuplicateFinder(args.root, args.workers)
+    start = time.monotonic()
+    hashed = finder.hash_missing()
+    print(f"Hashed {hashed} new images in {time.monotonic() - start:.1f}s")
+
+    start = time.monotonic()
+    clusters = finder.clusters(args.threshold)
+    print(
+        f"Found {len(clusters)} near-duplicate clusters "
+        f"in {time.monotonic() - start:.2f}s"
+    )
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(clusters, f, ensure_ascii=False, indent=4)
+    finder.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import time
+import threading
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+GALLERY_SCRIPT = """
+return Array.from(document.querySelectorAll(arguments[0])).map(
+    (el) => el[arguments[1]] || el.getAttribute(arguments[1]) || ""
+);
+"""
+
+RESOURCE_COUNT_SCRIPT = "return performance.getEntriesByType('resource').length;"
+
+
+class Readiness:
+    """Wait for page conditions instead of fixed sleeps, timing every wait
+
+    Each wait returns as soon as its condition holds, or None after timeout
+    so callers carry on exactly as they did after the old fixed sleep.
+    Durations are recorded under the wait's name; summary() reports them.
+    """
+
+    def __init__(self, timeout=10, poll_frequency=0.1):
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+        self.timings = {}
+        self.timeouts = {}
+        self.lock = threading.Lock()
+
+    def record(self, name, seconds, timed_out=False):
+        with self.lock:
+            self.timings.setdefault(name, []).append(seconds)
+            if timed_out:
+                self.timeouts[name] = self.timeouts.get(name, 0) + 1
+
+    def wait(self, driver, name, condition, timeout=None, quiet=False):
+        """Poll condition(driver) until it returns something truthy"""
+        start = time.monotonic()
+        try:
+            result = WebDriverWait(
+                driver, timeout or self.timeout, poll_frequency=self.poll_frequency
+            ).until(condition)
+            self.record(name, time.monotonic() - start)
+            return result
+        except TimeoutException:
+            self.record(name, time.monotonic() - start, timed_out=True)
+            if not quiet:
+                print(f"Timed out waiting for {name}")
+            return None
+
+    def for_selector(self, driver, selector, timeout=None):
+        return self.wait(
+            driver,
+            f"selector {selector}",
+            EC.presence_of_element_located((By.CSS_SELECTOR, selector)),
+            timeout,
+        )
+
+    def for_gallery(self, driver, selector, attribute, timeout=None):
+        """Wait until every gallery item has its URL and the count stops changing"""
+        last = {"count": -1}
+
+        def populated(d):
+            values = d.execute_script(GALLERY_SCRIPT, selector, attribute)
+            count = len(values) if values and all(values) else 0
+            stable = count > 0 and count == last["count"]
+            last["count"] = count
+            return values if stable else False
+
+        return self.wait(driver, f"gallery {selector}", populated, timeout)
+
+    def for_network_idle(self, driver, idle_time=0.5, timeout=None):
+        """Wait until no new resources have loaded for idle_time seconds"""
+        last = {"count": -1, "since": time.monotonic()}
+
+        def idle(d):
+            if d.execute_script("return document.readyState") != "complete":
+                return False
+            count = d.execute_script(RESOURCE_COUNT_SCRIPT)
+            now = time.monotonic()
+            if count != last["count"]:
+                last["count"], last["since"] = count, now
+                return False
+            return now - last["since"] >= idle_time
+
+        return self.wait(driver, "network idle", idle, timeout)
+
+    def for_height_change(self, driver, last_height, timeout=2):
+        """Wait for lazy content to grow the page after a scroll"""
+        return self.wait(
+            driver,
+            "scroll",
+            lambda d: d.execute_script("return document.body.scrollHeight")
+            != last_height,
+            timeout,
+            quiet=True,
+        )
+
+    def summary(self):
+        with self.lock:
+            return {
+                name: {
+                    "count": len(times),
+                    "total_s": round(sum(times), 3),
+                    "mean_s": round(sum(times) / len(times), 3),
+                    "max_s": round(max(times), 3),
+                    "timeouts": self.timeouts.get(name, 0),
+                }
+                for name, times in self.timings.items()
+            }
+
+    def report(self):
+        summary = self.summary()
+        if not summary:
+            return
+        print("\nPage readiness waits:")
+        for name, stats in sorted(summary.items()):
+            print(
+                f"  {name}: {stats['count']} waits, {stats['total_s']}s total, "
+                f"{stats['mean_s']}s mean, {stats['max_s']}s max, "
+                f"{stats['timeouts']} timeouts"
+            )
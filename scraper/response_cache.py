@@ -0,0 +1,195 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import tempfile
+import threading
+from urllib.parse import urlparse
+
+
+class CachedResponse:
+    """A page body read back from the response cache"""
+
+    def __init__(self, url, content, headers, stored_at, fresh):
+        self.url = url
+        self.content = content
+        self.headers = headers
+        self.stored_at = stored_at
+        self.fresh = fresh
+
+    @property
+    def validators(self):
+        return {
+            "etag": self.headers.get("ETag"),
+            "last_modified": self.headers.get("Last-Modified"),
+        }
+
+
+class ResponseCache:
+    """Persistent cache of fetched and browser-rendered pages
+
+    Bodies live under bodies/<ab>/<sha1 of key>, with an SQLite index of
+    size, headers and access times. Entries expire after their store's TTL
+    (ttls maps a domain suffix to seconds) and the least recently used ones
+    are evicted once the cache grows past max_bytes. Expired entries keep
+    their ETag / Last-Modified so they can be revalidated with a 304.
+    """
+
+    def __init__(
+        self,
+        root=os.path.join("fashion_dataset", ".http_cache"),
+        default_ttl=24 * 3600,
+        ttls=None,
+        max_bytes=512 * 1024 * 1024,
+    ):
+        self.root = root
+        self.bodies_dir = os.path.join(root, "bodies")
+        os.makedirs(self.bodies_dir, exist_ok=True)
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(
+            os.path.join(root, "index.sqlite"), timeout=30, check_same_thread=False
+        )
+        self.db.execute("""CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                headers TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )""")
+        self.db.commit()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stale": 0,
+            "revalidated": 0,
+            "stores": 0,
+            "evictions": 0,
+        }
+
+    @staticmethod
+    def cache_key(url, rendered=False):
+        # Browser-rendered DOM differs from the raw response, so keep both
+        return f"rendered {url}" if rendered else url
+
+    def body_path(self, key):
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.bodies_dir, name[:2], name)
+
+    def ttl_for(self, url):
+        host = urlparse(url).netloc.lower()
+        for domain, ttl in self.ttls.items():
+            if host == domain or host.endswith("." + domain):
+                return ttl
+        return self.default_ttl
+
+    def count(self, stat):
+        with self.lock:
+            self.stats[stat] += 1
+
+    def get(self, url, rendered=False):
+        """Return the cached response for url, or None if there isn't one
+
+        Expired entries are still returned, with fresh=False, so the caller
+        can revalidate them; they count as stale rather than as hits.
+        """
+        key = self.cache_key(url, rendered)
+        with self.lock:
+            row = self.db.execute(
+                "SELECT url, headers, stored_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        try:
+            with open(self.body_path(key), "rb") as f:
+                content = f.read()
+        except OSError:
+            row = None
+        if row is None:
+            self.count("misses")
+            return None
+
+        fresh = time.time() - row[2] < self.ttl_for(url)
+        self.count("hits" if fresh else "stale")
+        with self.lock:
+            self.db.execute(
+                "UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+            self.db.commit()
+        return CachedResponse(row[0], content, json.loads(row[1]), row[2], fresh)
+
+    def put(self, url, content, headers=None, final_url=None, rendered=False):
+        """Store a response body, then evict old entries if over max_bytes"""
+        key = self.cache_key(url, rendered)
+        path = self.body_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    final_url or url,
+                    json.dumps(dict(headers or {})),
+                    len(content),
+                    now,
+                    now,
+                ),
+            )
+            self.db.commit()
+            self.stats["stores"] += 1
+        self.evict()
+
+    def refresh(self, url, rendered=False):
+        """Mark a stale entry fresh again after the server answered 304"""
+        with self.lock:
+            self.db.execute(
+                "UPDATE entries SET stored_at = ? WHERE key = ?",
+                (time.time(), self.cache_key(url, rendered)),
+            )
+            self.db.commit()
+            self.stats["revalidated"] += 1
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits max_bytes"""
+        with self.lock:
+            total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries")
+            total = total.fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            for key, size in self.db.execute(
+                "SELECT key, size FROM entries ORDER BY accessed_at"
+            ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                try:
+                    os.remove(self.body_path(key))
+                except OSError:
+                    pass
+                total -= size
+                self.stats["evictions"] += 1
+            self.db.commit()
+
+    def report(self):
+        stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"] + stats["stale"]
+        if not lookups:
+            return
+        print(
+            f"\nResponse cache: {stats['hits']} hits, {stats['misses']} misses, "
+            f"{stats['stale']} stale ({stats['revalidated']} revalidated), "
+            f"{stats['stores']} stored, {stats['evictions']} evicted, "
+            f"{stats['hits'] / lookups:.0%} hit rate"
+        )
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,172 @@
+import os
+import json
+import time
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+
+REPORT_FILE = "run_report.json"
+PROMETHEUS_FILE = "metrics.prom"
+
+
+def summarize(samples):
+    """count / total / mean / p50 / p95 / max, in ms, for a list of seconds"""
+    ordered = sorted(samples)
+    count = len(ordered)
+
+    def at(q):
+        return ordered[min(count - 1, int(q * count))] * 1000
+
+    return {
+        "count": count,
+        "total_ms": round(sum(ordered) * 1000, 2),
+        "mean_ms": round(sum(ordered) / count * 1000, 2),
+        "p50_ms": round(at(0.50), 2),
+        "p95_ms": round(at(0.95), 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+class RunMetrics:
+    """Per-stage timers and counters for one scraper run
+
+    Stages are timed with timer(name) or observe(name, seconds) and events
+    counted with count(name, n). Recording is an append or an add under a
+    lock, so instrumenting hot paths costs well under a microsecond.
+    write() saves a JSON report, and optionally a Prometheus text file,
+    into the run folder.
+    """
+
+    def __init__(self, labels=None):
+        self.labels = dict(labels or {})
+        self.lock = threading.Lock()
+        self.timings = {}
+        self.counters = {}
+        self.started_at = datetime.now()
+        self.start = time.perf_counter()
+
+    def observe(self, stage, seconds):
+        with self.lock:
+            self.timings.setdefault(stage, []).append(seconds)
+
+    @contextmanager
+    def timer(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def instrument_driver(self, driver):
+        """Count and time every WebDriver command the driver sends
+
+        All Selenium calls, element lookups included, go through
+        driver.execute, so wrapping it covers them in one place.
+        """
+        execute = driver.execute
+
+        def timed_execute(command, params=None):
+            start = time.perf_counter()
+            try:
+                return execute(command, params)
+            finally:
+                self.observe("webdriver", time.perf_counter() - start)
+                self.count("webdriver_calls")
+
+        driver.execute = timed_execute
+        return driver
+
+    def report(self, readiness=None, limiter=None):
+        with self.lock:
+            timings = {name: list(samples) for name, samples in self.timings.items()}
+            counters = dict(self.counters)
+        if readiness is not None:
+            # Readiness waits are already timed; fold them in as stages
+            with readiness.lock:
+                for name, samples in readiness.timings.items():
+                    timings[f"wait {name}"] = list(samples)
+                for name, timeouts in readiness.timeouts.items():
+                    counters[f"wait_timeouts {name}"] = timeouts
+        return {
+            "labels": self.labels,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "wall_seconds": round(time.perf_counter() - self.start, 3),
+            "stages": {name: summarize(s) for name, s in sorted(timings.items()) if s},
+            "counters": dict(sorted(counters.items())),
+            # Where adaptive per-domain limits settled
+            "domains": limiter.report() if limiter is not None else {},
+        }
+
+    def write(self, run_dir, readiness=None, prometheus=False, limiter=None):
+        """Save run_report.json (and metrics.prom) in run_dir; returns the report"""
+        report = self.report(readiness, limiter)
+        if not run_dir or not os.path.isdir(run_dir):
+            return report
+        if not report["labels"]:
+            # fashion_dataset/<dataset>/<run>
+            path = os.path.normpath(run_dir)
+            report["labels"] = {
+                "dataset": os.path.basename(os.path.dirname(path)),
+                "run": os.path.basename(path),
+            }
+        with open(os.path.join(run_dir, REPORT_FILE), "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=4)
+        if prometheus:
+            with open(os.path.join(run_dir, PROMETHEUS_FILE), "w") as f:
+                f.write(prometheus_text(report))
+        return report
+
+
+def prometheus_labels(labels):
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+        for key, value in labels.items()
+    )
+    return ",".join(f'{key}="{value}"' for key, value in escaped)
+
+
+def prometheus_text(report):
+    """A run report in the Prometheus text exposition format
+
+    Meant for node_exporter's textfile collector: stage timings become a
+    summary with 0.5 / 0.95 quantiles, counters become counters.
+    """
+    base = report["labels"]
+    lines = [
+        "# HELP scraper_stage_seconds Time spent per scraper stage",
+        "# TYPE scraper_stage_seconds summary",
+    ]
+    for stage, stats in report["stages"].items():
+        labels = dict(base, stage=stage)
+        for quantile, key in (("0.5", "p50_ms"), ("0.95", "p95_ms")):
+            lines.append(
+                f"scraper_stage_seconds{{{prometheus_labels(dict(labels, quantile=quantile))}}} "
+                f"{stats[key] / 1000:.6f}"
+            )
+        lines.append(
+            f"scraper_stage_seconds_sum{{{prometheus_labels(labels)}}} "
+            f"{stats['total_ms'] / 1000:.6f}"
+        )
+        lines.append(
+            f"scraper_stage_seconds_count{{{prometheus_labels(labels)}}} {stats['count']}"
+        )
+
+    lines += [
+        "# HELP scraper_events_total Events counted during the run",
+        "# TYPE scraper_events_total counter",
+    ]
+    for name, value in report["counters"].items():
+        labels = prometheus_labels(dict(base, event=name))
+        lines.append(f"scraper_events_total{{{labels}}} {value}")
+
+    lines += [
+        "# HELP scraper_run_seconds Wall-clock duration of the run",
+        "# TYPE scraper_run_seconds gauge",
+        f"scraper_run_seconds{{{prometheus_labels(base)}}} {report['wall_seconds']}",
+    ]
+    return "\n".join(lines) + "\n"
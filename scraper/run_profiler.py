@@ -0,0 +1,295 @@
+import io
+import os
+import sys
+import json
+import time
+import pstats
+import argparse
+import cProfile
+import threading
+import tracemalloc
+from datetime import datetime
+
+PROFILE_STATS = "profile.pstats"
+PROFILE_REPORT = "profile.json"
+PROFILE_TEXT = "profile.txt"
+
+# Where a profiled thread's time goes when it isn't running Python: matched
+# on (file suffix, function name) in the cProfile stats. A blocking call
+# made inside another (a lock wait inside an HTTP send) counts only toward
+# the outer one.
+BLOCKING = {
+    "webdriver": [("selenium/webdriver/remote/webdriver.py", "execute")],
+    "http": [("requests/sessions.py", "send")],
+    "sleep": [("~", "<built-in method time.sleep>")],
+    # Pool threads waiting for work, and callers waiting on futures
+    "idle": [("~", "<method 'acquire' of '_thread.lock' objects>")],
+}
+
+# From 3.12 cProfile runs on sys.monitoring, which is process-wide: the one
+# profiler enabled in the main thread already records every thread, and
+# enabling a second one raises ValueError. Before that each thread needs a
+# profiler of its own.
+PER_THREAD = sys.version_info < (3, 12)
+
+
+def function_name(key):
+    filename, line, name = key
+    if filename == "~":
+        return name
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+
+class RunProfiler:
+    """CPU profile, blocked-time breakdown and peak memory for one run
+
+    Before Python 3.12 cProfile only sees the thread that enabled it, so a
+    profiler is also started in every thread created while profiling
+    (download and driver pool workers) and the results merged. From 3.12
+    the main profiler sees every thread itself, but their calls share one
+    stack, so the main thread can't be told apart and per-function times
+    across threads are approximate. tracemalloc traces allocations from
+    start() on; expect the run to be noticeably slower while it does.
+    """
+
+    def __init__(self, top=40):
+        self.top = top
+        self.lock = threading.Lock()
+        self.profiles = []
+        self.threads = 0
+        self.main = cProfile.Profile()
+        self.wall = None
+        self.cpu = None
+        self.memory = None
+
+    def start(self):
+        threading.setprofile(self.profile_thread)
+        tracemalloc.start()
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        self.main.enable()
+        return self
+
+    def profile_thread(self, frame, event, arg):
+        # Runs once, on a new thread's first call: counts the thread and,
+        # where needed, swaps in a cProfile of its own
+        sys.setprofile(None)
+        with self.lock:
+            self.threads += 1
+            if not PER_THREAD:
+                return
+            profile = cProfile.Profile()
+            self.profiles.append(profile)
+        profile.enable()
+
+    def stop(self):
+        self.main.disable()
+        threading.setprofile(None)
+        self.wall = time.perf_counter() - self.wall
+        self.cpu = time.process_time() - self.cpu
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+        tracemalloc.stop()
+        self.memory = {
+            "peak_mb": round(peak / 1024 / 1024, 2),
+            "current_mb": round(current / 1024 / 1024, 2),
+            "top_allocations": [
+                {
+                    "where": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    "kb": round(stat.size / 1024, 1),
+                    "count": stat.count,
+                }
+                for stat in snapshot.statistics("lineno")[:15]
+            ],
+        }
+
+    def stats(self, profiles):
+        stats = pstats.Stats(stream=io.StringIO())
+        for profile in profiles:
+            profile.create_stats()
+            # Threads that never ran any Python have nothing to add
+            if profile.stats:
+                stats.add(profile)
+        return stats
+
+    @staticmethod
+    def nested_time(stats, blocking):
+        """A lookup of how much of a function's cumulative time was spent
+        inside one of the blocking functions, by stats key
+
+        cProfile only records direct callers, so each caller passes down the
+        share of its own time that was nested, in proportion to the time it
+        spent calling the function.
+        """
+        nested = {}
+
+        def inside(key):
+            if key in nested:
+                return nested[key]
+            # Recursive calls are already part of the outer call's time
+            nested[key] = 0.0
+            seconds = 0.0
+            for caller, edge in stats.stats[key][4].items():
+                if caller == key or caller not in stats.stats:
+                    continue
+                if caller in blocking:
+                    seconds += edge[3]
+                elif stats.stats[caller][3]:
+                    seconds += edge[3] * inside(caller) / stats.stats[caller][3]
+            nested[key] = min(seconds, stats.stats[key][3])
+            return nested[key]
+
+        return inside
+
+    def breakdown(self, stats):
+        """Seconds blocked per BLOCKING category, and the rest as Python"""
+        total = stats.total_tt
+        blocking = {
+            key: category
+            for key in stats.stats
+            for category, functions in BLOCKING.items()
+            if any(
+                key[0].endswith(suffix) and key[2] == function
+                for suffix, function in functions
+            )
+        }
+        inside = self.nested_time(stats, blocking)
+        seconds = dict.fromkeys(BLOCKING, 0.0)
+        for key, category in blocking.items():
+            seconds[category] += stats.stats[key][3] - inside(key)
+        seconds["python"] = max(0.0, total - sum(seconds.values()))
+        return {
+            "total_seconds": round(total, 3),
+            **{f"{key}_seconds": round(value, 3) for key, value in seconds.items()},
+        }
+
+    def report(self):
+        main = self.stats([self.main])
+        merged = self.stats([self.main, *self.profiles])
+        functions = sorted(merged.stats.items(), key=lambda item: -item[1][3])
+        return {
+            "profiled_at": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "wall_seconds": round(self.wall, 3),
+            "cpu_seconds": round(self.cpu, 3),
+            "threads": 1 + self.threads,
+            # False when main_thread covers every thread (Python 3.12+)
+            "per_thread": PER_THREAD,
+            # The main thread's wall time, split; then summed over every thread
+            "main_thread": self.breakdown(main),
+            "all_threads": self.breakdown(merged),
+            "memory": self.memory,
+            "functions": [
+                {
+                    "function": function_name(key),
+                    "calls": values[1],
+                    "tottime": round(values[2], 4),
+                    "cumtime": round(values[3], 4),
+                }
+                for key, values in functions[: self.top]
+            ],
+        }
+
+    def save(self, run_dir):
+        """Write profile.pstats, profile.json and profile.txt into run_dir
+
+        profile.pstats loads in pstats, snakeviz or gprof2dot; profile.json
+        is what compare() diffs between runs.
+        """
+        report = self.report()
+        merged = self.stats([self.main, *self.profiles])
+        merged.dump_stats(os.path.join(run_dir, PROFILE_STATS))
+        with open(os.path.join(run_dir, PROFILE_REPORT), "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=4)
+
+        text = io.StringIO()
+        merged.stream = text
+        merged.sort_stats("cumulative").print_stats(self.top)
+        with open(os.path.join(run_dir, PROFILE_TEXT), "w", encoding="utf-8") as f:
+            f.write(format_summary(report) + "\n\n" + text.getvalue())
+        return report
+
+
+def profile_run(run, run_dir, enabled=True):
+    """Call run(), under a RunProfiler when enabled
+
+    run_dir is called afterwards for the folder to save into, since the
+    scrapers only pick their run folder once they start.
+    """
+    if not enabled:
+        return run()
+    profiler = RunProfiler().start()
+    try:
+        return run()
+    finally:
+        profiler.stop()
+        path = run_dir()
+        if path and os.path.isdir(path):
+            report = profiler.save(path)
+            print(format_summary(report))
+            print(f"Profile saved to {path}")
+
+
+def format_summary(report):
+    main = report["main_thread"]
+    scope = "Main thread" if report.get("per_thread", True) else "All threads"
+    return (
+        f"Wall {report['wall_seconds']:.2f}s, CPU {report['cpu_seconds']:.2f}s, "
+        f"{report['threads']} threads, peak traced memory "
+        f"{report['memory']['peak_mb']:.1f} MB\n"
+        f"{scope}: {main['python_seconds']:.2f}s Python, "
+        f"{main['webdriver_seconds']:.2f}s WebDriver, "
+        f"{main['http_seconds']:.2f}s HTTP, {main['sleep_seconds']:.2f}s sleeping, "
+        f"{main['idle_seconds']:.2f}s waiting on other threads"
+    )
+
+
+def load_report(path):
+    if os.path.isdir(path):
+        path = os.path.join(path, PROFILE_REPORT)
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(before, after, top=15):
+    """Print how two profiled runs differ: time split, memory, hot functions"""
+
+    def delta(old, new):
+        if not old:
+            return f"{new:.2f}"
+        return f"{old:.2f} -> {new:.2f} ({(new - old) / old * 100:+.1f}%)"
+
+    print(f"wall           {delta(before['wall_seconds'], after['wall_seconds'])}")
+    print(f"cpu            {delta(before['cpu_seconds'], after['cpu_seconds'])}")
+    for key in after["main_thread"]:
+        print(
+            f"main {key[:-8]:<10}"
+            f"{delta(before['main_thread'].get(key, 0), after['main_thread'][key])}"
+        )
+    print(
+        f"peak memory    "
+        f"{delta(before['memory']['peak_mb'], after['memory']['peak_mb'])} MB"
+    )
+
+    old = {f["function"]: f for f in before["functions"]}
+    print("\nHottest functions by cumulative time:")
+    for function in after["functions"][:top]:
+        previous = old.get(function["function"], {}).get("cumtime", 0)
+        print(f"  {delta(previous, function['cumtime']):<32} {function['function']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the profiles saved by two --profile runs"
+    )
+    parser.add_argument("before", help="run folder or profile.json")
+    parser.add_argument("after", help="run folder or profile.json")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+    compare(load_report(args.before), load_report(args.after), args.top)
+
+
+if __name__ == "__main__":
+    main()
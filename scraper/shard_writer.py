@@ -0,0 +1,182 @@
+import io
+import os
+import re
+import json
+import random
+import tarfile
+import argparse
+from blob_store import IMAGE_FILE, BlobStore
+
+
+def product_folders(path):
+    """Every product folder (one holding metadata.json) at or under path"""
+    if os.path.exists(os.path.join(path, "metadata.json")):
+        return [path]
+    folders = []
+    for dirpath, dirnames, filenames in os.walk(path):
+        # Skip .blobs, .http_cache and other store internals
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        if "metadata.json" in filenames:
+            folders.append(dirpath)
+            dirnames[:] = []
+    return folders
+
+
+def sample_key(folder, root):
+    """A WebDataset key for a product folder: no dots, unique within root"""
+    relative = os.path.relpath(folder, root)
+    return re.sub(r"[^\w-]+", "_", relative).strip("_")
+
+
+class ShardWriter:
+    """Pack product folders into WebDataset-style tar shards
+
+    Each product becomes one sample: <key>.json holds its metadata and
+    <key>.image_N.<ext> its images, stored next to each other so a loader
+    reads a shard front to back. A shard is closed once it reaches
+    max_bytes or max_count samples, and only renamed to shard-NNNNNN.tar
+    once complete.
+    """
+
+    def __init__(self, out_dir, max_bytes=1024**3, max_count=10000):
+        self.out_dir = out_dir
+        self.max_bytes = max_bytes
+        self.max_count = max_count
+        os.makedirs(out_dir, exist_ok=True)
+        self.shards = []
+        self.tar = None
+        self.tmp_path = None
+        self.count = 0
+        self.size = 0
+
+    def open_shard(self):
+        name = f"shard-{len(self.shards):06d}.tar"
+        self.tmp_path = os.path.join(self.out_dir, name + ".part")
+        self.tar = tarfile.open(self.tmp_path, "w")
+        self.shards.append({"name": name, "samples": 0, "bytes": 0})
+        self.count = self.size = 0
+
+    def close_shard(self):
+        if self.tar is None:
+            return
+        self.tar.close()
+        final_path = os.path.join(self.out_dir, self.shards[-1]["name"])
+        os.replace(self.tmp_path, final_path)
+        self.shards[-1].update(samples=self.count, bytes=os.path.getsize(final_path))
+        self.tar = None
+
+    def add_member(self, name, data, mtime):
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = int(mtime)
+        info.mode = 0o644
+        self.tar.addfile(info, io.BytesIO(data))
+        self.size += len(data) + 512
+
+    def write(self, folder, key):
+        """Add one product folder as a sample; returns False if unreadable"""
+        try:
+            with open(os.path.join(folder, "metadata.json"), "rb") as f:
+                metadata = f.read()
+            filenames = json.loads(metadata).get("images") or sorted(os.listdir(folder))
+        except (OSError, ValueError):
+            return False
+
+        images = []
+        for filename in filenames:
+            if not isinstance(filename, str) or not IMAGE_FILE.match(filename):
+                continue
+            path = BlobStore.resolve(folder, filename)
+            if path:
+                with open(path, "rb") as f:
+                    images.append((filename, f.read()))
+
+        sample_size = len(metadata) + sum(len(data) for _, data in images)
+        if self.tar is not None and (
+            self.count >= self.max_count or self.size + sample_size > self.max_bytes
+        ):
+            self.close_shard()
+        if self.tar is None:
+            self.open_shard()
+
+        mtime = os.path.getmtime(os.path.join(folder, "metadata.json"))
+        self.add_member(f"{key}.json", metadata, mtime)
+        for filename, data in images:
+            self.add_member(f"{key}.{filename}", data, mtime)
+        self.count += 1
+        return True
+
+    def close(self):
+        """Finish the last shard and write shards.json; returns its contents"""
+        self.close_shard()
+        manifest = {
+            "shards": self.shards,
+            "samples": sum(shard["samples"] for shard in self.shards),
+        }
+        with open(os.path.join(self.out_dir, "shards.json"), "w") as f:
+            json.dump(manifest, f, indent=4)
+        return manifest
+
+
+def write_shards(
+    paths,
+    out_dir,
+    root="fashion_dataset",
+    max_bytes=1024**3,
+    max_count=10000,
+    shuffle=False,
+    seed=None,
+):
+    """Pack the product folders under paths (datasets, runs or products)
+
+    With shuffle, samples are written in a random order (repeatable with
+    seed) so consecutive reads from a shard don't all come from one run.
+    """
+    folders = [folder for path in paths for folder in product_folders(path)]
+    if shuffle:
+        random.Random(seed).shuffle(folders)
+
+    writer = ShardWriter(out_dir, max_bytes, max_count)
+    for folder in folders:
+        if not writer.write(folder, sample_key(folder, root)):
+            print(f"Skipped unreadable product folder {folder}")
+    return writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Pack scraped products into WebDataset tar shards"
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        default=["fashion_dataset"],
+        help="dataset, run or product folders (default: all of fashion_dataset)",
+    )
+    parser.add_argument("--out", default="shards")
+    parser.add_argument("--root", default="fashion_dataset")
+    parser.add_argument(
+        "--max-mb", type=int, default=1024, help="target shard size in MB"
+    )
+    parser.add_argument("--max-count", type=int, default=10000)
+    parser.add_argument("--shuffle", action="store_true")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    manifest = write_shards(
+        args.paths,
+        args.out,
+        root=args.root,
+        max_bytes=args.max_mb * 1024 * 1024,
+        max_count=args.max_count,
+        shuffle=args.shuffle,
+        seed=args.seed,
+    )
+    print(
+        f"Wrote {manifest['samples']} samples to {len(manifest['shards'])} "
+        f"shards in {args.out}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import os
+import json
+from urllib.parse import urlparse
+
+# Selectors for a stock Magento 2 theme; stores override what differs
+MAGENTO_SELECTORS = {
+    # Listing page: one element per product, and the name/link inside it
+    "product_grid": "div.product-item-info",
+    "product_name": "h2.product.name a",
+    "product_url": "h2.product.name a",
+    "next_page": "li.pages-item-next a",
+    # Product page: gallery elements and the attribute holding each image URL
+    "price": "span.price",
+    "image_container": ".MagicToolboxSelectorsContainer .mt-thumb-switcher",
+    "image_attribute": "href",
+}
+
+# Saved in every run folder: the store, category and URL the run crawled,
+# since stores that share a dataset folder mix categories across its runs
+RUN_FILE = "run.json"
+
+# Every store the crawl engine knows. Each definition has:
+#   base_url     storefront root; for Magento store views include the view
+#                path (e.g. /pk), which is also the GraphQL store code
+#   categories   category name -> path under base_url
+#   selectors    overrides of MAGENTO_SELECTORS
+#   fields       extra metadata read from product pages: name -> selector
+#                for text, or [selector, attribute] for a list of values
+#   pagination   "next_link" follows selectors["next_page"], "query" asks
+#                for ?p=2, ?p=3... until a page is empty, "none" reads
+#                only the category page
+#   images       gallery URL clean-up: "exclude" drops URLs containing any
+#                of its substrings (lazy-load placeholders), "strip_query"
+#                cuts resize parameters to fetch the full-size original
+#   product_id   "position" (product_<n> in listing order) or "url" (the
+#                product page's file name); it prefixes product folders
+#                and is saved in metadata
+#   dataset      fashion_dataset folder name, formatted with store and
+#                category
+#   cache_ttl    hours before the response cache revalidates this store's
+#                pages (optional; --cache-ttl applies otherwise)
+STORES = {
+    "junaidjamshed": {
+        "base_url": "https://www.junaidjamshed.com",
+        "categories": {
+            "kameez_shalwar": "/mens/kameez-shalwar.html",
+            "unstitched": "/mens/unstitched.html",
+            "women_stitched": "/womens/stitched.html",
+            "women_unstitched": "/womens/un-stitched.html",
+        },
+        "selectors": {},
+        "fields": {
+            "sku": "div.product.attribute.sku .value",
+            "description": "div.product.attribute.overview .value",
+            "fabric_details": "div.product.attribute.fabric_details .value",
+            "sizes": ["div.swatch-option.text", "option-label"],
+        },
+        "pagination": "next_link",
+        "dataset": "{category}",
+    },
+    "sanasafinaz": {
+        "base_url": "https://www.sanasafinaz.com/pk",
+        "categories": {
+            "ready-to-wear": "/ready-to-wear.html",
+            "unstitched": "/unstitched.html",
+            "bottoms": "/bottoms.html",
+        },
+        "selectors": {
+            "product_name": "strong.product.name.product-item-name",
+            "product_url": "a.product-item-link",
+            "image_container": "img.product-image-photo",
+            "image_attribute": "src",
+        },
+        "fields": {
+            "description": "div.product.attribute.description",
+        },
+        "pagination": "next_link",
+        "images": {"exclude": ["placeholder"], "strip_query": True},
+        "product_id": "url",
+        "dataset": "{store}",
+    },
+    "sitarastudio": {
+        "base_url": "https://sitarastudio.pk",
+        "categories": {"home": "/"},
+        "selectors": {"product_name": "h2.product.name.product-item-name a"},
+        "fields": {
+            "sku": "div.product.attribute.sku .value",
+            "description": "div.product.attribute.overview .value",
+            "sizes": ["div.swatch-option.text", "option-label"],
+        },
+        "pagination": "next_link",
+        # Its one category is the home page, whose featured products rotate
+        "cache_ttl": 6,
+        "dataset": "{store}",
+    },
+    "khaadi": {
+        "base_url": "https://pk.khaadi.com",
+        "categories": {
+            "ready-to-wear": "/ready-to-wear.html",
+            "unstitched": "/unstitched.html",
+            "west": "/west.html",
+        },
+        "selectors": {
+            "product_name": "a.product-item-link",
+            "product_url": "a.product-item-link",
+            "next_page": "a.next",
+            "image_container": "div.gallery-placeholder img.gallery-placeholder__image",
+            "image_attribute": "src",
+        },
+        "fields": {},
+        "pagination": "next_link",
+        "dataset": "{store}_{category}",
+    },
+}
+
+
+def get_store(name):
+    """The full definition of a registered store, defaults filled in"""
+    if name not in STORES:
+        raise KeyError(f"Unknown store {name!r}; known stores: {', '.join(STORES)}")
+    store = dict(STORES[name], name=name)
+    store["selectors"] = dict(MAGENTO_SELECTORS, **store.get("selectors", {}))
+    store.setdefault("fields", {})
+    store.setdefault("pagination", "next_link")
+    store.setdefault("images", {})
+    store.setdefault("product_id", "position")
+    store.setdefault("dataset", "{store}_{category}")
+    return store
+
+
+def store_for_url(url):
+    """The registered store serving url, or a stock Magento definition"""
+    host = urlparse(url).netloc.lower()
+    for name, store in STORES.items():
+        if urlparse(store["base_url"]).netloc.lower() == host:
+            return get_store(name)
+    return {
+        "name": host,
+        "base_url": f"{urlparse(url).scheme}://{host}",
+        "categories": {},
+        "selectors": dict(MAGENTO_SELECTORS),
+        "fields": {},
+        "pagination": "next_link",
+        "images": {},
+        "product_id": "position",
+        "dataset": "{store}",
+    }
+
+
+def category_url(store, category):
+    if category not in store["categories"]:
+        raise KeyError(
+            f"{store['name']} has no category {category!r}; "
+            f"known categories: {', '.join(store['categories'])}"
+        )
+    return store["base_url"] + store["categories"][category]
+
+
+def dataset_name(store, category):
+    return store["dataset"].format(store=store["name"], category=category)
+
+
+def read_run(run_dir):
+    """The run.json of a run folder, or {} for runs that predate it"""
+    try:
+        with open(os.path.join(run_dir, RUN_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def cache_ttls():
+    """Response cache TTLs in seconds by domain, for stores that set cache_ttl"""
+    return {
+        urlparse(store["base_url"]).netloc.lower(): store["cache_ttl"] * 3600
+        for store in STORES.values()
+        if "cache_ttl" in store
+    }
+
+
+def store_datasets():
+    """(store, section) for every dataset folder a registered store writes"""
+    datasets = {}
+    for name in STORES:
+        store = get_store(name)
+        for category in store["categories"]:
+            # Stores that share one folder across categories have no section
+            shared = "{category}" not in store["dataset"]
+            datasets[dataset_name(store, category)] = (
+                name,
+                None if shared else category,
+            )
+    return datasets
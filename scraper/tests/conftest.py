@@ -0,0 +1,30 @@
+import os
+import sys
+
+# The scraper modules import each other as siblings, as when run from scraper/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from mock_magento import MockCatalog, MockMagentoServer
+
+
+@pytest.fixture
+def storefront(tmp_path, monkeypatch):
+    """Start mock storefronts in a scratch fashion_dataset; stops them after"""
+    monkeypatch.chdir(tmp_path)
+    servers = []
+
+    def start(**options):
+        catalog = MockCatalog(
+            options.pop("categories", None),
+            products_per_category=options.pop("products", 6),
+            page_size=options.pop("page_size", 3),
+        )
+        server = MockMagentoServer(catalog, **options).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
@@ -0,0 +1,18 @@
+import json
+import os
+
+CATEGORY = "mens/kameez-shalwar"
+
+
+def products(run_dir):
+    """metadata.json of every product folder in a run, by folder name"""
+    found = {}
+    for entry in os.scandir(run_dir):
+        if entry.is_dir():
+            with open(os.path.join(entry.path, "metadata.json"), encoding="utf-8") as f:
+                found[entry.name] = json.load(f)
+    return found
+
+
+def requests_of(server, kind):
+    return server.stats.counts["requests"].get(kind, 0)
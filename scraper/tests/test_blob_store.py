@@ -0,0 +1,28 @@
+import os
+
+from crawl_helpers import CATEGORY, products, requests_of
+from dynamic_scraper import DynamicScraper
+
+
+def test_repeat_crawl_reuses_stored_images(storefront):
+    server = storefront()
+    url = server.category_url(CATEGORY)
+    first = DynamicScraper(url)
+    first.scrape_products()
+
+    server.stats.reset()
+    second = DynamicScraper(url)
+    second.scrape_products()
+
+    assert requests_of(server, "image") == 0
+    assert second.metrics.counters["images_reused"] == 18
+    old, new = products(first.dataset_dir), products(second.dataset_dir)
+    folder = sorted(new)[0]
+    same = [
+        os.path.samefile(
+            os.path.join(first.dataset_dir, folder, name),
+            os.path.join(second.dataset_dir, folder, name),
+        )
+        for name in new[folder]["images"]
+    ]
+    assert old[folder]["images"] == new[folder]["images"] and all(same)
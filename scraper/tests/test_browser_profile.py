@@ -0,0 +1,43 @@
+import browser_profile
+from browser_profile import DEFAULT_BLOCKED_URLS, BrowserProfile
+
+
+class Chrome:
+    """Records the options and CDP commands a profile sets up a browser with"""
+
+    def __init__(self, options):
+        self.options = options
+        self.cdp = []
+
+    def execute_cdp_cmd(self, command, params):
+        self.cdp.append((command, params))
+
+
+def test_default_profile_is_headless_without_images():
+    options = BrowserProfile().chrome_options()
+
+    assert "--headless=new" in options.arguments
+    assert "--blink-settings=imagesEnabled=false" in options.arguments
+    assert options.experimental_options["prefs"] == {
+        "profile.managed_default_content_settings.images": 2
+    }
+    assert "excludeSwitches" not in options.experimental_options
+
+    visible = BrowserProfile(headless=False, block_images=False, stealth=True)
+    options = visible.chrome_options()
+    assert "--headless=new" not in options.arguments
+    assert "prefs" not in options.experimental_options
+    assert "--disable-blink-features=AutomationControlled" in options.arguments
+
+
+def test_driver_blocks_trackers_and_overrides_the_user_agent(monkeypatch):
+    monkeypatch.setattr(browser_profile.webdriver, "Chrome", Chrome)
+
+    driver = BrowserProfile(user_agent="Mozilla/5.0 test").create_driver()
+    assert driver.cdp == [
+        ("Network.enable", {}),
+        ("Network.setBlockedURLs", {"urls": DEFAULT_BLOCKED_URLS}),
+        ("Network.setUserAgentOverride", {"userAgent": "Mozilla/5.0 test"}),
+    ]
+
+    assert BrowserProfile(blocked_urls=[]).create_driver().cdp == []
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+
+from blob_store import BlobStore
+from catalog_index import CatalogIndex, parse_price
+from dynamic_scraper import DynamicScraper
+from stores import RUN_FILE, dataset_name, get_store
+
+
+def write_run(root, dataset, run, category, products):
+    run_dir = os.path.join(root, dataset, run)
+    os.makedirs(run_dir)
+    if category:
+        with open(os.path.join(run_dir, RUN_FILE), "w", encoding="utf-8") as f:
+            json.dump({"store": "sanasafinaz", "category": category}, f)
+    for name, price in products:
+        folder = os.path.join(run_dir, name)
+        os.makedirs(folder)
+        with open(os.path.join(folder, "image_1.jpg"), "wb") as f:
+            f.write(name.encode())
+        with open(os.path.join(folder, "metadata.json"), "w", encoding="utf-8") as f:
+            json.dump(
+                {"name": name, "url": f"https://example.com/{name}", "price": price},
+                f,
+            )
+
+
+def test_latest_run_is_kept_per_category_in_a_shared_folder(tmp_path):
+    root = str(tmp_path)
+    write_run(root, "sanasafinaz", "20250101_000000", "ready-to-wear", [("a", "PKR 1")])
+    write_run(
+        root,
+        "sanasafinaz",
+        "20250102_000000",
+        "ready-to-wear",
+        [("b", "PKR 2,000"), ("c", "PKR 3")],
+    )
+    write_run(root, "sanasafinaz", "20250103_000000", "bottoms", [("d", "PKR 4")])
+
+    index = CatalogIndex(root)
+    assert index.update()["added"] == 4
+
+    latest = {p["name"]: p["section"] for p in index.products()}
+    assert latest == {"b": "ready-to-wear", "c": "ready-to-wear", "d": "bottoms"}
+    assert index.count(section="bottoms") == 1
+    assert index.count(latest=False) == 4
+    assert index.update() == {"added": 0, "updated": 0, "unchanged": 4, "removed": 0}
+    index.close()
+
+
+def test_latest_run_per_dataset_folder(tmp_path):
+    root = str(tmp_path)
+    write_run(root, "kameez_shalwar", "20250101_000000", None, [("old", "PKR 1")])
+    write_run(root, "kameez_shalwar", "20250102_000000", None, [("new", "PKR 1")])
+
+    index = CatalogIndex(root)
+    index.update()
+    assert [p["name"] for p in index.products()] == ["new"]
+    assert [p["section"] for p in index.products()] == ["kameez_shalwar"]
+    index.close()
+
+
+def test_image_kept_only_in_the_blob_store_is_indexed(tmp_path):
+    root = str(tmp_path)
+    write_run(root, "kameez_shalwar", "20250101_000000", None, [("a", "PKR 1")])
+    folder = os.path.join(root, "kameez_shalwar", "20250101_000000", "a")
+    # As if hardlinking failed: the image is only listed in blobs.json
+    image = os.path.join(folder, "image_1.jpg")
+    digest = hashlib.sha256(b"a").hexdigest()
+    blobs = BlobStore(os.path.join(root, ".blobs"))
+    blob = blobs.add(image, digest, ".jpg", "https://example.com/a.jpg")
+    blobs.add_manifest_entry(folder, "image_1.jpg", blob, digest)
+    blobs.close()
+    metadata = {"name": "a", "price": "PKR 1", "images": ["image_1.jpg"]}
+    with open(os.path.join(folder, "metadata.json"), "w", encoding="utf-8") as f:
+        json.dump(metadata, f)
+
+    index = CatalogIndex(root)
+    index.update()
+    [row] = index.images(os.path.relpath(folder, root))
+    assert (row["filename"], row["size"], row["sha256"]) == ("image_1.jpg", 1, digest)
+    assert index.products()[0]["image_count"] == 1
+    index.close()
+
+
+def test_parse_price():
+    assert parse_price("PKR 4,990") == 4990
+    assert parse_price("N/A") is None
+
+
+def test_catalog_keeps_each_category_of_a_shared_folder(storefront):
+    server = storefront(categories=["ready-to-wear", "bottoms"], products=2)
+    store = get_store("sanasafinaz")
+    for category in ("ready-to-wear", "bottoms"):
+        DynamicScraper(
+            server.category_url(category),
+            store=store,
+            dataset=dataset_name(store, category),
+            category=category,
+        ).scrape_products()
+
+    index = CatalogIndex("fashion_dataset")
+    index.update()
+    assert index.count() == 4
+    assert index.count(store="sanasafinaz", section="bottoms") == 2
+    index.close()
@@ -0,0 +1,123 @@
+import json
+
+from crawl_helpers import CATEGORY, products, requests_of
+from crawl_journal import CrawlJournal
+from dynamic_scraper import DynamicScraper
+from stores import dataset_name, get_store
+
+READY = "https://www.sanasafinaz.com/pk/ready-to-wear.html"
+BOTTOMS = "https://www.sanasafinaz.com/pk/bottoms.html"
+
+
+def crashed_run(tmp_path):
+    """A journal left behind by a run that stopped part way through page 2"""
+    run_dir = tmp_path / "20250101_000000"
+    run_dir.mkdir()
+    path = str(tmp_path / "journal.jsonl")
+    journal = CrawlJournal(path)
+    journal.start(str(run_dir), READY)
+    journal.listing(1, READY)
+    journal.started("https://x/a.html", "dir_a", "A")
+    journal.mark_completed("https://x/a.html")
+    journal.listing(2, READY + "?p=2")
+    journal.started("https://x/b.html", "dir_b", "B")
+    journal.close()
+    return path, str(run_dir)
+
+
+def test_replay_resumes_the_same_category(tmp_path):
+    path, run_dir = crashed_run(tmp_path)
+
+    journal = CrawlJournal(path)
+    assert journal.resumable(READY)
+    assert journal.dataset_dir == run_dir
+    assert (journal.page, journal.page_url) == (2, READY + "?p=2")
+    assert journal.completed == {"https://x/a.html"}
+    assert journal.in_flight == {"https://x/b.html": ["dir_b", "B"]}
+    assert not journal.should_scrape("https://x/a.html")
+    assert journal.should_scrape("https://x/c.html")
+
+
+def test_other_category_in_the_same_folder_does_not_resume(tmp_path):
+    path, _ = crashed_run(tmp_path)
+    assert not CrawlJournal(path).resumable(BOTTOMS)
+
+
+def test_finished_run_and_torn_line(tmp_path):
+    path, _ = crashed_run(tmp_path)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"event": "completed", "url": "https://x/b')
+
+    journal = CrawlJournal(path)
+    assert journal.resumable(READY)
+    assert "https://x/b.html" in journal.in_flight
+
+    journal.reopen()
+    journal.finish()
+    journal.close()
+    assert not CrawlJournal(path).resumable(READY)
+
+
+def test_journal_without_base_url_starts_fresh(tmp_path):
+    run_dir = tmp_path / "20250101_000000"
+    run_dir.mkdir()
+    path = tmp_path / "journal.jsonl"
+    path.write_text(json.dumps({"event": "run", "dataset_dir": str(run_dir)}) + "\n")
+    assert not CrawlJournal(str(path)).resumable(READY)
+
+
+def interrupted_crawl(url, **options):
+    """Crawl url until the connection drops on the second listing page"""
+    scraper = DynamicScraper(url, resume=True, **options)
+    load_page = scraper.load_page
+
+    def dropped_connection(page_url, *args, **kwargs):
+        if "p=2" in page_url:
+            raise IOError("connection reset")
+        return load_page(page_url, *args, **kwargs)
+
+    scraper.load_page = dropped_connection
+    scraper.scrape_products()
+    return scraper
+
+
+def test_resume_continues_the_interrupted_run(storefront):
+    server = storefront()
+    url = server.category_url(CATEGORY)
+
+    first = interrupted_crawl(url)
+    assert len(products(first.dataset_dir)) == 3
+    assert not CrawlJournal(first.journal.path).finished
+
+    server.stats.reset()
+    second = DynamicScraper(url, resume=True)
+    second.scrape_products()
+
+    assert second.dataset_dir == first.dataset_dir
+    assert len(products(second.dataset_dir)) == 6
+    # Only the second page's products were fetched again
+    assert requests_of(server, "product") == 3
+    assert CrawlJournal(second.journal.path).finished
+
+
+def test_next_category_in_a_shared_folder_keeps_the_journal(storefront):
+    server = storefront(categories=["ready-to-wear", "bottoms"])
+    store = get_store("sanasafinaz")
+
+    def options(category):
+        dataset = dataset_name(store, category)
+        return dict(store=store, dataset=dataset, category=category)
+
+    ready = server.category_url("ready-to-wear")
+    first = interrupted_crawl(ready, **options("ready-to-wear"))
+    DynamicScraper(
+        server.category_url("bottoms"), **options("bottoms")
+    ).scrape_products()
+
+    server.stats.reset()
+    second = DynamicScraper(ready, resume=True, **options("ready-to-wear"))
+    second.scrape_products()
+
+    assert second.dataset_dir == first.dataset_dir
+    assert len(products(second.dataset_dir)) == 6
+    assert requests_of(server, "product") == 3
@@ -0,0 +1,61 @@
+import json
+import os
+
+from crawl_helpers import CATEGORY, products, requests_of
+from crawl_state import CrawlState
+from dynamic_scraper import DynamicScraper
+
+
+def test_incremental_recrawl_of_an_unchanged_store_is_a_no_op(storefront):
+    server = storefront()
+    url = server.category_url(CATEGORY)
+    first = DynamicScraper(url, incremental=True)
+    first.scrape_products()
+
+    server.stats.reset()
+    again = DynamicScraper(url, incremental=True)
+    again.scrape_products()
+
+    # Every product page answered 304; nothing downloaded
+    assert requests_of(server, "not_modified") == 6
+    assert requests_of(server, "product") == 0
+    assert requests_of(server, "image") == 0
+    carried = products(again.dataset_dir)
+    assert len(carried) == 6
+    assert all(len(m["images"]) == 3 for m in carried.values())
+    stamps = {m["timestamp"] for m in products(first.dataset_dir).values()}
+    assert stamps.isdisjoint(m["timestamp"] for m in carried.values())
+
+
+def test_changed_product_is_scraped_again(storefront):
+    server = storefront()
+    url = server.category_url(CATEGORY)
+    DynamicScraper(url, incremental=True).scrape_products()
+
+    server.catalog.categories[CATEGORY]["products"][0]["price"] += 500
+    server.stats.reset()
+    DynamicScraper(url, incremental=True).scrape_products()
+
+    assert requests_of(server, "product") == 1
+    # Five product pages, and the changed one's images revalidated
+    assert requests_of(server, "not_modified") == 8
+    assert requests_of(server, "image") == 0
+
+
+def test_carried_over_product_gets_fresh_metadata(tmp_path):
+    old_dir, new_dir = tmp_path / "run1" / "3_kurta", tmp_path / "run2" / "7_kurta"
+    old_dir.mkdir(parents=True)
+    (old_dir / "image_1.jpg").write_bytes(b"jpeg")
+    old = {"name": "Kurta", "images": ["image_1.jpg"], "product_id": "3"}
+    (old_dir / "metadata.json").write_text(json.dumps(old), encoding="utf-8")
+
+    state = CrawlState(str(tmp_path))
+    state.record("SKU-1", "https://x/kurta.html", "hash", str(old_dir))
+    assert state.carry_over("SKU-1", str(new_dir), product_id="7", timestamp="now")
+    state.close()
+
+    assert os.path.samefile(old_dir / "image_1.jpg", new_dir / "image_1.jpg")
+    assert not os.path.samefile(old_dir / "metadata.json", new_dir / "metadata.json")
+    carried = json.loads((new_dir / "metadata.json").read_text(encoding="utf-8"))
+    assert carried == dict(old, product_id="7", timestamp="now")
+    assert json.loads((old_dir / "metadata.json").read_text(encoding="utf-8")) == old
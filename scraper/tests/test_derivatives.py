@@ -0,0 +1,48 @@
+import json
+import os
+
+from PIL import Image
+
+from derivatives import DERIVATIVES_DIR, DerivativeGenerator
+
+VARIANTS = [
+    {"width": 100, "height": 150, "format": "webp", "quality": 80},
+    # Larger than the source, which is never upscaled
+    {"width": 768, "height": 1024, "format": "webp", "quality": 80},
+]
+
+
+def product(root, name):
+    folder = os.path.join(root, "run", name)
+    os.makedirs(folder)
+    Image.new("RGB", (400, 600), (150, 30, 60)).save(
+        os.path.join(folder, "image_1.jpg"), "JPEG"
+    )
+    with open(os.path.join(folder, "metadata.json"), "w", encoding="utf-8") as f:
+        json.dump({"name": name, "images": ["image_1.jpg"]}, f)
+    return folder
+
+
+def test_variants_are_written_once_and_fit_their_box(tmp_path):
+    folder = product(str(tmp_path), "a")
+
+    generator = DerivativeGenerator(VARIANTS, workers=1)
+    assert len(generator.submit_folder(str(tmp_path))) == 1
+    generator.close()
+    assert generator.stats == {"generated": 2, "skipped": 0, "failed": 0}
+
+    out = os.path.join(folder, DERIVATIVES_DIR)
+    assert sorted(os.listdir(out)) == [
+        "image_1.100x150.webp",
+        "image_1.768x1024.webp",
+    ]
+    with Image.open(os.path.join(out, "image_1.100x150.webp")) as image:
+        assert image.size == (100, 150)
+    with Image.open(os.path.join(out, "image_1.768x1024.webp")) as image:
+        assert image.size == (400, 600)
+
+    # Current variants are skipped; the derivatives folder isn't walked
+    again = DerivativeGenerator(VARIANTS, workers=1)
+    again.submit_folder(str(tmp_path))
+    again.close()
+    assert again.stats == {"generated": 0, "skipped": 2, "failed": 0}
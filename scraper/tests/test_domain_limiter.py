@@ -0,0 +1,168 @@
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from crawl_helpers import CATEGORY, products
+from domain_limiter import AdaptiveLimiter, DomainLimiter, LimitedAdapter
+from dynamic_scraper import DynamicScraper
+from run_metrics import REPORT_FILE
+
+URL = "https://shop.example/item.html"
+
+
+def respond(limiter, status=200, latency=0.01, wait=None):
+    domain = limiter.acquire(URL)
+    limiter.release(domain, status, latency, wait)
+    return limiter.domains[domain]
+
+
+def test_healthy_windows_raise_the_limit_up_to_per_domain():
+    limiter = AdaptiveLimiter(per_domain=6, initial=4)
+    for _ in range(4):
+        state = respond(limiter)
+    assert state.limit == 5
+    for _ in range(20):
+        respond(limiter)
+    assert state.limit == 6
+
+
+def test_throttling_halves_limit_and_sets_a_rate_once_per_round_trip():
+    limiter = AdaptiveLimiter(initial=4)
+    state = respond(limiter, latency=0.02)
+    respond(limiter, status=429, latency=0.02)
+    assert state.limit == 2
+    # Throughput was about limit / latency = 200/s; start the bucket at half
+    assert state.rate == 100
+
+    # More errors from the same burst count once
+    respond(limiter, status=503, latency=0.02)
+    assert state.limit == 2
+    time.sleep(0.05)
+    respond(limiter, status=503, latency=0.02)
+    assert state.limit == 1
+    assert state.rate == 50
+
+
+def test_failures_and_latency_spikes_back_off():
+    limiter = AdaptiveLimiter(initial=8)
+    state = respond(limiter)
+    domain = limiter.acquire(URL)
+    limiter.release(domain, failed=True)
+    assert state.limit == 4
+
+    limiter = AdaptiveLimiter(initial=8, spike=3.0)
+    for _ in range(3):
+        state = respond(limiter, latency=0.01)
+    while state.limit == 8:
+        respond(limiter, latency=0.5)
+    assert state.limit == 4
+
+
+def test_rate_never_exceeds_the_configured_ceiling():
+    limiter = AdaptiveLimiter(rate=5.0, initial=1, rate_step=10.0)
+    state = respond(limiter)
+    assert state.rate == 5.0
+    respond(limiter, status=429)
+    assert state.rate == 2.5
+    for _ in range(5):
+        respond(limiter)
+    assert state.rate == 5.0
+
+
+def test_retry_after_pauses_the_domain():
+    limiter = DomainLimiter(per_domain=2)
+    respond(limiter, status=429, wait=0.2)
+    start = time.monotonic()
+    respond(limiter)
+    assert time.monotonic() - start >= 0.15
+
+
+def test_per_domain_cap_holds_across_threads():
+    limiter = DomainLimiter(max_requests=8, per_domain=2)
+    peak, lock, active = [0], threading.Lock(), [0]
+
+    def request():
+        with limiter.slot(URL):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=request) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 2
+
+
+class SlowBodyHandler(BaseHTTPRequestHandler):
+    """Sends headers at once and the body a little later"""
+
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+        try:
+            body = b"x" * 1024
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.flush()
+            time.sleep(0.1)
+            self.wfile.write(body)
+            self.wfile.flush()
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+
+def test_slot_is_held_until_the_body_is_read():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowBodyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    session = requests.Session()
+    session.mount("http://", LimitedAdapter(DomainLimiter(per_domain=1)))
+    try:
+        threads = [
+            threading.Thread(target=lambda: session.get(url).content) for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        with session.get(url, stream=True) as response:
+            assert len(response.content) == 1024
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert SlowBodyHandler.peak == 1
+
+
+def test_throttling_storefront_backs_off_and_loses_nothing(storefront):
+    server = storefront(products=12, page_size=12, capacity=2)
+    scraper = DynamicScraper(server.category_url(CATEGORY), workers=4)
+    scraper.scrape_products()
+
+    saved = products(scraper.dataset_dir)
+    assert len(saved) == 12
+    assert all(len(m["images"]) == 3 for m in saved.values())
+    assert scraper.metrics.counters.get("image_failures", 0) == 0
+    with open(os.path.join(scraper.dataset_dir, REPORT_FILE), encoding="utf-8") as f:
+        report = json.load(f)
+    [limits] = report["domains"].values()
+    assert 1 <= limits["limit"] <= 16
@@ -0,0 +1,64 @@
+import json
+import os
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from dominant_colors import ColorIndex, kmeans, palette, parse_color
+
+RED, NAVY = (200, 16, 46), (0, 0, 128)
+
+
+def two_tone(path, top, bottom):
+    """A 32x48 garment on a white backdrop: 34 rows of top, 14 of bottom"""
+    image = Image.new("RGB", (64, 64), "white")
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((16, 8, 47, 41), fill=top)
+    draw.rectangle((16, 42, 47, 55), fill=bottom)
+    image.save(path, "PNG")
+
+
+def test_kmeans_separates_two_colours_in_lab(tmp_path):
+    path = str(tmp_path / "image_1.png")
+    two_tone(path, RED, NAVY)
+
+    colors = palette(path, size=2)
+    # The white backdrop is left out; weights are shares of the garment
+    assert [c["hex"] for c in colors] == ["#c8102e", "#000080"]
+    assert [c["weight"] for c in colors] == [0.7083, 0.2917]
+
+    points = np.array([[0.0, 0.0], [0.1, 0.0], [10.0, 10.0], [10.1, 10.0]])
+    centers, labels = kmeans(points, 2)
+    assert labels[0] == labels[1] != labels[2] == labels[3]
+    assert sorted(np.round(centers[:, 0], 2).tolist()) == [0.05, 10.05]
+
+
+def test_parse_color():
+    assert parse_color("Maroon") == (128, 0, 0)
+    assert parse_color("#1f4fbf") == (31, 79, 191)
+    assert parse_color(" 10, 20,30 ") == (10, 20, 30)
+
+
+def write_product(root, name, top, bottom):
+    folder = os.path.join(root, "kameez_shalwar", "20250101_000000", name)
+    os.makedirs(folder)
+    two_tone(os.path.join(folder, "image_1.png"), top, bottom)
+    with open(os.path.join(folder, "metadata.json"), "w", encoding="utf-8") as f:
+        json.dump({"name": name, "url": f"https://x/{name}"}, f)
+
+
+def test_search_by_colour_ignores_thin_trims(tmp_path):
+    root = str(tmp_path)
+    write_product(root, "red kurta", RED, NAVY)
+    write_product(root, "navy kurta", NAVY, RED)
+    write_product(root, "green kurta", (34, 139, 34), (34, 139, 34))
+
+    index = ColorIndex(root, workers=1)
+    assert index.extract_missing() == 3
+
+    matches = {r["name"]: r["distance"] for r in index.nearest("red")}
+    assert matches["red kurta"] < 1 and matches["navy kurta"] < 1
+    # Red covers under half of the navy kurta, so only its navy counts
+    strict = {r["name"]: r["distance"] for r in index.nearest("red", min_weight=0.5)}
+    assert strict["red kurta"] < 1 and strict["navy kurta"] > 30
+    index.close()
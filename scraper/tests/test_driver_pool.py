@@ -0,0 +1,70 @@
+import threading
+
+from selenium.common.exceptions import WebDriverException
+
+from driver_pool import DriverPool
+from run_metrics import RunMetrics
+
+
+class Browser:
+    """Stands in for a Chrome WebDriver; only quit() is called by the pool"""
+
+    def __init__(self):
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_browser_failure_recycles_the_driver_and_retries_once():
+    browsers = []
+
+    def create_driver():
+        browsers.append(Browser())
+        return browsers[-1]
+
+    attempts = {}
+    lock = threading.Lock()
+
+    def handler(worker, name):
+        worker.driver
+        with lock:
+            attempts[name] = attempts.get(name, 0) + 1
+        if name == "flaky" and attempts[name] == 1:
+            raise WebDriverException("chrome not reachable")
+        if name == "dead":
+            raise WebDriverException("session deleted")
+
+    metrics = RunMetrics()
+    pool = DriverPool(create_driver, size=1, metrics=metrics).start(handler)
+    for name in ("ok", "flaky", "dead"):
+        pool.submit(name)
+    pool.join()
+
+    assert attempts == {"ok": 1, "flaky": 2, "dead": 2}
+    assert metrics.counters == {"job_retries": 2, "job_failures": 1}
+    # A fresh browser for each retry: ok and flaky's first try share one
+    assert len(browsers) == 3
+    assert all(browser.quit_called for browser in browsers)
+
+
+def test_browsers_are_recycled_every_max_jobs_and_started_lazily():
+    browsers = []
+
+    def create_driver():
+        browsers.append(Browser())
+        return browsers[-1]
+
+    def handler(worker, needs_browser):
+        if needs_browser:
+            worker.driver
+
+    pool = DriverPool(create_driver, size=1, max_jobs_per_driver=2)
+    pool.start(handler)
+    for needs_browser in (True, True, True, False, False):
+        pool.submit(needs_browser)
+    pool.join()
+
+    # Jobs 1-2 share a browser, job 3 gets a new one; 4-5 never start one
+    assert len(browsers) == 2
+    assert all(browser.quit_called for browser in browsers)
@@ -0,0 +1,56 @@
+import time
+
+from crawl_helpers import CATEGORY, requests_of
+from html_fetcher import NOT_MODIFIED, HtmlFetcher
+from response_cache import ResponseCache
+from stores import MAGENTO_SELECTORS
+
+
+def test_listing_page_is_read_without_a_browser(storefront):
+    server = storefront(products=4, page_size=3)
+    page = HtmlFetcher().fetch(server.category_url(CATEGORY))
+
+    items = page.select(MAGENTO_SELECTORS["product_grid"])
+    assert len(items) == 3
+    assert items[0].text(MAGENTO_SELECTORS["product_name"]).startswith("Mock Kurta")
+    assert items[0].attr(MAGENTO_SELECTORS["product_url"], "href") == (
+        f"{server.base_url}/mock-kurta-0-1.html"
+    )
+    assert page.attr(MAGENTO_SELECTORS["next_page"], "href").endswith("?p=2")
+    assert page.text("span.missing", None) is None
+    assert page.validators["etag"] and page.validators["last_modified"]
+
+
+def test_conditional_fetch_and_non_html(storefront):
+    server = storefront()
+    fetcher = HtmlFetcher()
+    url = server.category_url(CATEGORY)
+    page = fetcher.fetch(url)
+
+    assert fetcher.fetch(url, page.validators) is NOT_MODIFIED
+    assert requests_of(server, "not_modified") == 1
+    # Images and missing pages aren't pages to parse
+    assert fetcher.fetch(f"{server.base_url}/media/catalog/product/x_1.png") is None
+    assert fetcher.fetch(f"{server.base_url}/missing.html") is None
+
+
+def test_cached_pages_are_served_then_revalidated(storefront, monkeypatch):
+    server = storefront()
+    url = server.category_url(CATEGORY)
+    cache = ResponseCache(default_ttl=60)
+    fetcher = HtmlFetcher(cache=cache)
+    first = fetcher.fetch(url)
+
+    server.stats.reset()
+    assert fetcher.fetch(url).attrs("a.product-item-link", "href") == first.attrs(
+        "a.product-item-link", "href"
+    )
+    assert requests_of(server, "listing") == 0
+
+    # Once expired, the cached copy is revalidated with a 304
+    now = time.time() + 120
+    monkeypatch.setattr(time, "time", lambda: now)
+    assert fetcher.fetch(url).select("div.product-item-info")
+    assert requests_of(server, "not_modified") == 1
+    assert cache.stats["revalidated"] == 1
+    cache.close()
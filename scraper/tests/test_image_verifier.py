@@ -0,0 +1,69 @@
+import json
+import os
+
+from dynamic_scraper import DynamicScraper
+from image_downloader import ImageDownloader
+from image_verifier import QUARANTINE_DIR, REDOWNLOAD_QUEUE, ImageVerifier
+from mock_magento import MockCatalog, MockMagentoServer
+
+
+def test_inline_verify_quarantines_like_the_batch_verifier(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    catalog = MockCatalog(products_per_category=2, broken_image=2)
+    server = MockMagentoServer(catalog).start()
+    try:
+        scraper = DynamicScraper(
+            server.category_url("mens/kameez-shalwar"), verify=True
+        )
+        scraper.scrape_products()
+    finally:
+        server.stop()
+
+    products = sorted(
+        entry.path for entry in os.scandir(scraper.dataset_dir) if entry.is_dir()
+    )
+    assert len(products) == 2
+    for product in products:
+        with open(os.path.join(product, "metadata.json"), encoding="utf-8") as f:
+            metadata = json.load(f)
+        assert metadata["images"] == ["image_1.png", "image_3.png"]
+        [note] = metadata["quarantined"]
+        assert note["filename"] == "image_2.png"
+        assert note["url"].endswith("_2.png")
+        assert note["reason"].startswith("corrupt")
+        relative = os.path.relpath(product, "fashion_dataset")
+        assert os.path.isfile(
+            os.path.join("fashion_dataset", QUARANTINE_DIR, relative, "image_2.png")
+        )
+        assert not [n for n in os.listdir(product) if n.endswith(".part")]
+
+    queue = os.path.join("fashion_dataset", QUARANTINE_DIR, REDOWNLOAD_QUEUE)
+    with open(queue, encoding="utf-8") as f:
+        assert len(f.readlines()) == 2
+    assert scraper.metrics.counters["images_quarantined"] == 2
+
+
+def test_redownload_restores_quarantined_images(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    catalog = MockCatalog(products_per_category=1, broken_image=2)
+    server = MockMagentoServer(catalog).start()
+    try:
+        scraper = DynamicScraper(
+            server.category_url("mens/kameez-shalwar"), verify=True
+        )
+        scraper.scrape_products()
+
+        # The storefront fixed its image
+        catalog.broken_image = None
+        verifier = ImageVerifier()
+        downloader = ImageDownloader(verify=True)
+        assert verifier.redownload(downloader) == 1
+        downloader.close()
+    finally:
+        server.stop()
+
+    [product] = [e.path for e in os.scandir(scraper.dataset_dir) if e.is_dir()]
+    with open(os.path.join(product, "metadata.json"), encoding="utf-8") as f:
+        metadata = json.load(f)
+    assert metadata["images"] == ["image_1.png", "image_2.png", "image_3.png"]
+    assert "quarantined" not in metadata
@@ -0,0 +1,57 @@
+from crawl_helpers import CATEGORY, requests_of
+from magento_api import MagentoCatalogClient
+
+ITEM = {
+    "sku": "SS-1",
+    "name": "Printed Kurta",
+    "url_key": "printed-kurta",
+    "url_suffix": ".html",
+    "price_range": {
+        "minimum_price": {
+            "regular_price": {"value": 5990, "currency": "PKR"},
+            "final_price": {"value": 4990, "currency": "PKR"},
+        }
+    },
+    "media_gallery": [
+        {"url": "https://x/2.jpg", "position": 2, "disabled": False},
+        {"url": "https://x/off.jpg", "position": 1, "disabled": True},
+        {"url": "https://x/1.jpg", "position": 1, "disabled": False},
+    ],
+}
+
+
+def test_iter_products_pages_through_the_category(storefront):
+    server = storefront(products=5)
+    url = server.category_url(CATEGORY)
+    client = MagentoCatalogClient(url, page_size=2)
+
+    products = list(client.iter_products(url))
+
+    assert len(products) == 5
+    # One category lookup, then three pages of two
+    assert requests_of(server, "graphql") == 4
+    first = products[0]
+    assert first["url"] == f"{server.base_url}/mock-kurta-0-1.html"
+    assert first["sku"] == "MOCK-0-00001"
+    assert first["price"] == first["old_price"] == "PKR 3,240"
+    assert [u.rsplit("_", 1)[1] for u in first["image_urls"]] == [
+        "1.png",
+        "2.png",
+        "3.png",
+    ]
+
+
+def test_normalize_keeps_the_store_view_path():
+    client = MagentoCatalogClient("https://www.sanasafinaz.com/pk/bottoms.html", "pk")
+    product = client.normalize(ITEM)
+
+    assert client.graphql_url == "https://www.sanasafinaz.com/graphql"
+    assert product["url"] == "https://www.sanasafinaz.com/pk/printed-kurta.html"
+    assert (product["price"], product["old_price"]) == ("PKR 4,990", "PKR 5,990")
+    # Disabled entries dropped, the rest in gallery order
+    assert product["image_urls"] == ["https://x/1.jpg", "https://x/2.jpg"]
+
+    plain = MagentoCatalogClient("https://www.junaidjamshed.com/mens/x.html")
+    assert plain.normalize(ITEM)["url"] == (
+        "https://www.junaidjamshed.com/printed-kurta.html"
+    )
@@ -0,0 +1,61 @@
+import threading
+import time
+
+from orchestrator import Orchestrator, all_jobs, plan_lanes
+from stores import dataset_name, get_store
+
+
+def test_categories_sharing_a_folder_queue_in_one_lane():
+    lanes = plan_lanes(all_jobs(["sanasafinaz", "khaadi"]))
+
+    # sanasafinaz writes every category into one folder; khaadi one per category
+    assert [
+        ("sanasafinaz", "ready-to-wear"),
+        ("sanasafinaz", "unstitched"),
+        ("sanasafinaz", "bottoms"),
+    ] in lanes
+    assert [("khaadi", "west")] in lanes
+    assert len(lanes) == 4
+
+
+def test_lanes_alternate_between_stores():
+    lanes = plan_lanes(all_jobs(["junaidjamshed", "khaadi", "sitarastudio"]))
+
+    # Four junaidjamshed lanes, three khaadi, one sitarastudio
+    assert [lane[0][0] for lane in lanes] == [
+        "junaidjamshed",
+        "khaadi",
+        "sitarastudio",
+        "junaidjamshed",
+        "khaadi",
+        "junaidjamshed",
+        "khaadi",
+        "junaidjamshed",
+    ]
+
+
+def test_a_lane_runs_its_jobs_one_at_a_time_and_survives_failures(monkeypatch):
+    orchestrator = Orchestrator(all_jobs(["sanasafinaz", "khaadi"]), None, dict)
+    lock = threading.Lock()
+    active, overlaps, ran = {}, [], []
+
+    def run_job(store, category):
+        dataset = dataset_name(get_store(store), category)
+        with lock:
+            if active.get(dataset):
+                overlaps.append(dataset)
+            active[dataset] = True
+            ran.append((store, category))
+        time.sleep(0.02)
+        with lock:
+            active[dataset] = False
+        if category == "ready-to-wear":
+            raise RuntimeError("storefront down")
+
+    monkeypatch.setattr(orchestrator, "run_job", run_job)
+    orchestrator.run()
+
+    assert overlaps == []
+    assert len(ran) == 6
+    # The failed first category doesn't stop the rest of its lane
+    assert ("sanasafinaz", "bottoms") in ran
@@ -0,0 +1,60 @@
+import json
+import os
+
+import pyarrow.dataset as ds
+
+from parquet_export import export_parquet, read_catalog
+from stores import RUN_FILE
+
+
+def write_run(root, run, category, names):
+    run_dir = os.path.join(root, "sanasafinaz", run)
+    os.makedirs(run_dir)
+    with open(os.path.join(run_dir, RUN_FILE), "w", encoding="utf-8") as f:
+        json.dump({"store": "sanasafinaz", "category": category}, f)
+    for name in names:
+        folder = os.path.join(run_dir, name)
+        os.makedirs(folder)
+        for position in (1, 2):
+            with open(os.path.join(folder, f"image_{position}.jpg"), "wb") as f:
+                f.write(f"{name}-{position}".encode())
+        metadata = {
+            "name": name,
+            "url": f"https://x/{name}.html",
+            "price": "PKR 4,990",
+            "sizes": ["S", "M"],
+            "images": ["image_1.jpg", "image_2.jpg"],
+        }
+        with open(os.path.join(folder, "metadata.json"), "w", encoding="utf-8") as f:
+            json.dump(metadata, f)
+
+
+def test_export_writes_hive_partitions_by_store_section_and_run(tmp_path):
+    root, out = str(tmp_path / "fashion_dataset"), str(tmp_path / "parquet")
+    write_run(root, "20250101_000000", "ready-to-wear", ["a", "b"])
+    write_run(root, "20250102_000000", "bottoms", ["c"])
+
+    assert export_parquet(root, out) == 3
+    files = sorted(
+        os.path.relpath(os.path.join(dirpath, name), out)
+        for dirpath, _, names in os.walk(out)
+        for name in names
+    )
+    assert files == [
+        "store=sanasafinaz/section=bottoms/run=20250102_000000/products-0.parquet",
+        "store=sanasafinaz/section=ready-to-wear/run=20250101_000000/products-0.parquet",
+    ]
+
+    table = read_catalog(out, filter=ds.field("section") == "ready-to-wear")
+    rows = sorted(table.to_pylist(), key=lambda row: row["name"])
+    assert [row["name"] for row in rows] == ["a", "b"]
+    assert rows[0]["price_pkr"] == 4990 and rows[0]["sizes"] == ["S", "M"]
+    assert rows[0]["image_paths"] == [
+        "sanasafinaz/20250101_000000/a/image_1.jpg",
+        "sanasafinaz/20250101_000000/a/image_2.jpg",
+    ]
+    assert rows[0]["image_bytes"] == [3, 3]
+
+    # Exporting again replaces the partitions rather than adding to them
+    assert export_parquet(root, out) == 3
+    assert read_catalog(out).num_rows == 3
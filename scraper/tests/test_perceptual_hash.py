@@ -0,0 +1,68 @@
+import json
+import os
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from perceptual_hash import NearDuplicateFinder, cluster_labels, near_duplicate_pairs
+
+
+def test_banded_search_finds_every_pair_within_threshold():
+    rng = np.random.default_rng(7)
+    hashes = rng.integers(0, 2**63, size=300, dtype=np.int64).astype(np.uint64)
+    # Copies of the first 40 with 1 to 8 bits flipped
+    flips = [
+        sum(1 << int(bit) for bit in rng.choice(64, 1 + n % 8, replace=False))
+        for n in range(40)
+    ]
+    hashes = np.concatenate([hashes, hashes[:40] ^ np.array(flips, dtype=np.uint64)])
+
+    pairs = near_duplicate_pairs(hashes, threshold=6)
+
+    distances = np.array([[bin(int(a ^ b)).count("1") for b in hashes] for a in hashes])
+    expected = np.argwhere(np.triu(distances <= 6, k=1))
+    assert np.array_equal(pairs, expected)
+    assert len(pairs) >= 30
+
+
+def test_cluster_labels_follow_chains_of_pairs():
+    pairs = np.array([[1, 2], [0, 1], [4, 5]])
+    assert cluster_labels(6, pairs).tolist() == [0, 0, 0, 3, 4, 4]
+    assert cluster_labels(3, np.empty((0, 2), dtype=np.int64)).tolist() == [0, 1, 2]
+
+
+def write_product(root, name, image):
+    folder = os.path.join(root, "kameez_shalwar", "20250101_000000", name)
+    os.makedirs(folder)
+    image.save(os.path.join(folder, "image_1.jpg"), "JPEG", quality=90)
+    with open(os.path.join(folder, "metadata.json"), "w", encoding="utf-8") as f:
+        json.dump({"name": name, "url": f"https://x/{name}"}, f)
+    return folder
+
+
+def garment(size, color, box):
+    image = Image.new("RGB", (96, 128), "white")
+    ImageDraw.Draw(image).rectangle(box, fill=color)
+    return image.resize(size)
+
+
+def test_resized_copy_clusters_with_its_original(tmp_path):
+    root = str(tmp_path)
+    write_product(root, "a", garment((96, 128), (200, 30, 30), (20, 20, 76, 108)))
+    write_product(root, "copy", garment((300, 400), (200, 30, 30), (20, 20, 76, 108)))
+    write_product(root, "other", garment((96, 128), (30, 30, 200), (0, 60, 96, 128)))
+    broken = write_product(root, "broken", garment((96, 128), (0, 0, 0), (0, 0, 1, 1)))
+    with open(os.path.join(broken, "image_1.jpg"), "wb") as f:
+        f.write(b"not a jpeg")
+
+    finder = NearDuplicateFinder(root, workers=1)
+    assert finder.hash_missing() == 4
+    # The unreadable image was stored as NULL and isn't hashed again
+    assert finder.hash_missing() == 0
+
+    [cluster] = finder.clusters(threshold=6)
+    assert sorted(image["folder"].rsplit("/", 1)[1] for image in cluster["images"]) == [
+        "a",
+        "copy",
+    ]
+    finder.close()
@@ -0,0 +1,41 @@
+from readiness import GALLERY_SCRIPT, Readiness
+
+
+class Page:
+    """Answers execute_script like a page whose gallery fills in over polls"""
+
+    def __init__(self, galleries, height=1000):
+        self.galleries = list(galleries)
+        self.height = height
+
+    def execute_script(self, script, *args):
+        if script == GALLERY_SCRIPT:
+            return (
+                self.galleries.pop(0) if len(self.galleries) > 1 else self.galleries[0]
+            )
+        return self.height
+
+
+def test_gallery_wait_returns_once_urls_are_filled_and_stable():
+    page = Page([[], ["a.jpg", ""], ["a.jpg", "b.jpg"], ["a.jpg", "b.jpg"]])
+    readiness = Readiness(timeout=2, poll_frequency=0.01)
+
+    assert readiness.for_gallery(page, "img", "src") == ["a.jpg", "b.jpg"]
+    summary = readiness.summary()["gallery img"]
+    assert (summary["count"], summary["timeouts"]) == (1, 0)
+
+
+def test_timeouts_return_none_and_are_counted():
+    readiness = Readiness(timeout=0.05, poll_frequency=0.01)
+    page = Page([[]])
+
+    assert readiness.for_gallery(page, "img", "src") is None
+    # A scroll that loads nothing more is the normal way out of scrolling
+    assert readiness.for_height_change(page, 1000, timeout=0.05) is None
+    page.height = 1600
+    assert readiness.for_height_change(page, 1000)
+
+    summary = readiness.summary()
+    assert summary["gallery img"]["timeouts"] == 1
+    assert (summary["scroll"]["count"], summary["scroll"]["timeouts"]) == (2, 1)
+    assert summary["gallery img"]["max_s"] >= 0.05
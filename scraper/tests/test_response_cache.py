@@ -0,0 +1,60 @@
+import time
+
+from dynamic_scraper import engine_options, engine_parser
+from response_cache import ResponseCache
+
+URL = "https://www.junaidjamshed.com/mens/kameez-shalwar.html"
+
+
+def test_entries_expire_after_their_domain_ttl(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path), default_ttl=60, ttls={"sanasafinaz.com": 3600})
+    other = "https://www.sanasafinaz.com/pk/bottoms.html"
+    cache.put(URL, b"<html>jj</html>", {"ETag": '"v1"'})
+    cache.put(other, b"<html>ss</html>")
+    assert cache.get(URL).fresh and cache.get(other).fresh
+
+    # Two minutes on: past the default TTL, inside sanasafinaz's hour
+    now = time.time() + 120
+    monkeypatch.setattr(time, "time", lambda: now)
+    stale = cache.get(URL)
+    assert not stale.fresh and stale.content == b"<html>jj</html>"
+    assert stale.validators == {"etag": '"v1"', "last_modified": None}
+    assert cache.get(other).fresh
+
+    # A 304 makes the entry fresh again
+    cache.refresh(URL)
+    assert cache.get(URL).fresh
+    assert cache.get("https://www.junaidjamshed.com/other.html") is None
+    assert (cache.stats["hits"], cache.stats["stale"], cache.stats["misses"]) == (
+        4,
+        1,
+        1,
+    )
+    cache.close()
+
+
+def test_least_recently_used_entries_are_evicted_past_max_bytes(tmp_path, monkeypatch):
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr(time, "time", lambda: next(clock))
+    cache = ResponseCache(str(tmp_path), max_bytes=250)
+    for name in ("a", "b"):
+        cache.put(f"https://x/{name}", b"x" * 100)
+    # Reading a makes b the least recently used entry
+    cache.get("https://x/a")
+    cache.put("https://x/c", b"x" * 100)
+
+    assert cache.get("https://x/b") is None
+    assert cache.get("https://x/a") is not None
+    assert cache.get("https://x/c") is not None
+    assert cache.stats["evictions"] == 1
+    cache.close()
+
+
+def test_store_cache_ttl_reaches_the_cache(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    args = engine_parser("test").parse_args(["--cache", "--cache-ttl", "12"])
+    cache = engine_options(args)["cache"]
+    # sitarastudio sets cache_ttl in the store registry; the rest use --cache-ttl
+    assert cache.ttl_for("https://sitarastudio.pk/") == 6 * 3600
+    assert cache.ttl_for("https://www.sanasafinaz.com/pk/bottoms.html") == 12 * 3600
+    cache.close()
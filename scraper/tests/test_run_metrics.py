@@ -0,0 +1,56 @@
+import json
+import os
+
+from readiness import Readiness
+from run_metrics import PROMETHEUS_FILE, REPORT_FILE, RunMetrics, summarize
+
+
+def test_summarize_reports_milliseconds_and_quantiles():
+    stats = summarize([i / 1000 for i in range(1, 101)])
+    assert stats == {
+        "count": 100,
+        "total_ms": 5050.0,
+        "mean_ms": 50.5,
+        "p50_ms": 51.0,
+        "p95_ms": 96.0,
+        "max_ms": 100.0,
+    }
+
+
+def test_report_folds_in_readiness_waits_and_is_written(tmp_path):
+    run_dir = tmp_path / "kameez_shalwar" / "20250101_000000"
+    run_dir.mkdir(parents=True)
+    metrics = RunMetrics()
+    with metrics.timer("extract"):
+        pass
+    metrics.observe("page_http", 0.25)
+    metrics.count("products_completed", 3)
+    readiness = Readiness()
+    readiness.record("gallery img", 0.5, timed_out=True)
+
+    report = metrics.write(str(run_dir), readiness, prometheus=True)
+
+    assert report["labels"] == {"dataset": "kameez_shalwar", "run": "20250101_000000"}
+    assert sorted(report["stages"]) == ["extract", "page_http", "wait gallery img"]
+    assert report["stages"]["page_http"]["total_ms"] == 250.0
+    assert report["counters"] == {
+        "products_completed": 3,
+        "wait_timeouts gallery img": 1,
+    }
+    with open(run_dir / REPORT_FILE, encoding="utf-8") as f:
+        assert json.load(f)["counters"] == report["counters"]
+
+    prom = (run_dir / PROMETHEUS_FILE).read_text().splitlines()
+    labels = 'dataset="kameez_shalwar",run="20250101_000000"'
+    assert (
+        f'scraper_stage_seconds{{{labels},stage="page_http",quantile="0.5"}} 0.250000'
+        in prom
+    )
+    assert f'scraper_events_total{{{labels},event="products_completed"}} 3' in prom
+    assert f'scraper_stage_seconds_count{{{labels},stage="extract"}} 1' in prom
+
+
+def test_write_without_a_run_folder_only_reports(tmp_path):
+    report = RunMetrics({"store": "khaadi"}).write(str(tmp_path / "missing"))
+    assert report["labels"] == {"store": "khaadi"}
+    assert not os.listdir(tmp_path)
@@ -0,0 +1,82 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import run_profiler
+from run_profiler import (
+    PROFILE_REPORT,
+    PROFILE_STATS,
+    PROFILE_TEXT,
+    RunProfiler,
+    format_summary,
+    load_report,
+    profile_run,
+)
+
+
+def busy(n):
+    total = sum(i * i for i in range(20000))
+    time.sleep(0.01)
+    return n, total
+
+
+def threaded_job():
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        return [n for n, _ in pool.map(busy, range(12))]
+
+
+def test_threaded_job_completes_under_profiler():
+    profiler = RunProfiler().start()
+    try:
+        results = threaded_job()
+    finally:
+        profiler.stop()
+
+    assert results == list(range(12))
+    report = profiler.report()
+    assert report["threads"] >= 2
+    assert any("busy" in f["function"] for f in report["functions"])
+    assert report["all_threads"]["sleep_seconds"] > 0
+    assert report["memory"]["peak_mb"] >= 0
+
+
+def test_profile_run_saves_into_run_dir(tmp_path):
+    results = profile_run(threaded_job, lambda: str(tmp_path))
+
+    assert results == list(range(12))
+    for name in (PROFILE_STATS, PROFILE_REPORT, PROFILE_TEXT):
+        assert os.path.isfile(tmp_path / name)
+    report = load_report(str(tmp_path))
+    assert format_summary(report).startswith("Wall ")
+
+
+def test_profile_run_disabled_just_runs():
+    assert profile_run(threaded_job, lambda: None, enabled=False) == list(range(12))
+
+
+def fetch():
+    # Stands in for an HTTP send that waits on a lock inside
+    wait()
+
+
+def wait():
+    time.sleep(0.1)
+
+
+def test_blocking_inside_blocking_counts_once(monkeypatch):
+    monkeypatch.setitem(
+        run_profiler.BLOCKING, "http", [("test_run_profiler.py", "fetch")]
+    )
+    profiler = RunProfiler().start()
+    try:
+        fetch()
+        time.sleep(0.05)
+    finally:
+        profiler.stop()
+
+    main = profiler.report()["main_thread"]
+    assert 0.09 < main["http_seconds"] < 0.13
+    # Only the sleep outside fetch() counts as sleeping
+    assert 0.04 < main["sleep_seconds"] < 0.08
+    total = sum(value for key, value in main.items() if key != "total_seconds")
+    assert abs(total - main["total_seconds"]) < 0.01
@@ -0,0 +1,60 @@
+import hashlib
+import json
+import os
+import tarfile
+
+from blob_store import BlobStore
+from shard_writer import write_shards
+
+
+def write_product(root, name, images):
+    folder = os.path.join(root, "kameez_shalwar", "20250101_000000", name)
+    os.makedirs(folder)
+    for filename in images:
+        with open(os.path.join(folder, filename), "wb") as f:
+            f.write(f"{name} {filename}".encode())
+    with open(os.path.join(folder, "metadata.json"), "w", encoding="utf-8") as f:
+        json.dump({"name": name, "images": images}, f)
+    return folder
+
+
+def test_samples_are_split_into_shards_with_keyed_members(tmp_path):
+    root, out = str(tmp_path / "fashion_dataset"), str(tmp_path / "shards")
+    write_product(root, "a", ["image_1.jpg", "image_2.webp"])
+    write_product(root, "b", ["image_1.png"])
+    folder = write_product(root, "c", ["image_1.jpg"])
+    # c's image only exists in the blob store, listed in blobs.json
+    blobs = BlobStore(os.path.join(root, ".blobs"))
+    digest = hashlib.sha256(b"c image_1.jpg").hexdigest()
+    image = os.path.join(folder, "image_1.jpg")
+    blob = blobs.add(image, digest, ".jpg", "https://x/c_1.jpg")
+    blobs.add_manifest_entry(folder, "image_1.jpg", blob, digest)
+    blobs.close()
+
+    manifest = write_shards([root], out, root=root, max_count=2)
+
+    assert manifest["samples"] == 3
+    assert [shard["samples"] for shard in manifest["shards"]] == [2, 1]
+    assert sorted(os.listdir(out)) == [
+        "shard-000000.tar",
+        "shard-000001.tar",
+        "shards.json",
+    ]
+    members = {}
+    for shard in manifest["shards"]:
+        with tarfile.open(os.path.join(out, shard["name"])) as tar:
+            for member in tar.getmembers():
+                members[member.name] = tar.extractfile(member).read()
+
+    key = "kameez_shalwar_20250101_000000"
+    assert sorted(members) == [
+        f"{key}_a.image_1.jpg",
+        f"{key}_a.image_2.webp",
+        f"{key}_a.json",
+        f"{key}_b.image_1.png",
+        f"{key}_b.json",
+        f"{key}_c.image_1.jpg",
+        f"{key}_c.json",
+    ]
+    assert members[f"{key}_c.image_1.jpg"] == b"c image_1.jpg"
+    assert json.loads(members[f"{key}_b.json"])["name"] == "b"
@@ -0,0 +1,64 @@
+import json
+import os
+
+from dynamic_scraper import DynamicScraper
+from mock_magento import MockCatalog, MockMagentoServer
+from stores import RUN_FILE, dataset_name, get_store, read_run
+
+
+def scraper_for(server, store, category, **options):
+    store = get_store(store)
+    return DynamicScraper(
+        server.category_url("mens/kameez-shalwar"),
+        store=store,
+        dataset=dataset_name(store, category),
+        category=category,
+        **options,
+    )
+
+
+def product_folders(run_dir):
+    return sorted(entry.name for entry in os.scandir(run_dir) if entry.is_dir())
+
+
+def load_metadata(run_dir, folder):
+    with open(os.path.join(run_dir, folder, "metadata.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_sanasafinaz_image_rules_and_product_ids(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    server = MockMagentoServer(MockCatalog(products_per_category=3)).start()
+    try:
+        scraper = scraper_for(server, "sanasafinaz", "bottoms")
+        scraper.scrape_products()
+    finally:
+        server.stop()
+
+    run_dir = scraper.dataset_dir
+    assert read_run(run_dir)["category"] == "bottoms"
+    assert os.path.isfile(os.path.join(run_dir, RUN_FILE))
+    folders = product_folders(run_dir)
+    assert folders[0].startswith("mock-kurta-0-1_Mock_Kurta_0-1")
+    metadata = load_metadata(run_dir, folders[0])
+    assert metadata["product_id"] == "mock-kurta-0-1"
+    assert metadata["timestamp"]
+    # Placeholder dropped, resized thumbnails fetched at full size
+    assert len(metadata["images"]) == 3
+    assert server.stats.counts["requests"]["image"] == 9
+
+
+def test_position_product_ids_by_default(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    server = MockMagentoServer(MockCatalog(products_per_category=2)).start()
+    try:
+        scraper = scraper_for(server, "junaidjamshed", "kameez_shalwar")
+        scraper.scrape_products()
+    finally:
+        server.stop()
+
+    folders = product_folders(scraper.dataset_dir)
+    assert [f.split("_Mock")[0] for f in folders] == ["product_1", "product_2"]
+    metadata = load_metadata(scraper.dataset_dir, folders[0])
+    assert metadata["product_id"] == "product_1"
+    assert metadata["sku"] == "MOCK-0-00001"
@@ -0,0 +1,47 @@
+import json
+import os
+
+from PIL import Image, ImageDraw
+
+from visual_similarity import SimilarityIndex
+
+
+def garment(path, color, box):
+    image = Image.new("RGB", (96, 128), "white")
+    ImageDraw.Draw(image).rectangle(box, fill=color)
+    image.save(path, "PNG")
+
+
+def write_product(root, run, name, url, color, box):
+    folder = os.path.join(root, "kameez_shalwar", run, name)
+    os.makedirs(folder)
+    garment(os.path.join(folder, "image_1.png"), color, box)
+    with open(os.path.join(folder, "metadata.json"), "w", encoding="utf-8") as f:
+        json.dump({"name": name, "url": url, "images": ["image_1.png"]}, f)
+    return os.path.relpath(folder, root)
+
+
+def test_similar_skips_copies_and_older_runs(tmp_path):
+    root = str(tmp_path)
+    red, wide, tall = (200, 30, 30), (20, 20, 76, 108), (30, 10, 66, 118)
+    for run in ("20250101_000000", "20250102_000000"):
+        query = write_product(root, run, "a", "https://x/a", red, wide)
+        write_product(root, run, "b", "https://x/b", (180, 40, 40), tall)
+        write_product(root, run, "c", "https://x/c", (30, 30, 200), tall)
+    # The same image listed under another URL
+    write_product(root, "20250102_000000", "copy", "https://x/copy", red, wide)
+
+    index = SimilarityIndex(root, workers=1)
+    assert index.append_missing() == 3
+
+    results = index.similar(query, "image_1.png")
+    assert [r["name"] for r in results] == ["b", "c"]
+    assert all(r["folder"].startswith("kameez_shalwar/20250102") for r in results)
+    assert all(r["score"] < 1.0 for r in results)
+
+    # Without a filename the product's first image is the query
+    assert index.similar(query) == results
+
+    every_run = index.similar(query, "image_1.png", latest=False)
+    assert [r["name"] for r in every_run] == ["b", "c"]
+    index.close()
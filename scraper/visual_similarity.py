@@ -0,0 +1,339 @@
+import os
+import json
+import time
+import argparse
+import numpy as np
+from PIL import Image, ImageOps
+from blob_store import IMAGE_FILE
+from catalog_index import CatalogIndex
+from dominant_colors import foreground_pixels
+
+FEATURES_DIR = ".features"
+FEATURES_FILE = "features.f32"
+
+# What makes two catalog rows the same product, across runs
+PRODUCT_KEY = "COALESCE(p.url, p.sku, p.folder)"
+
+# Lab colour histogram bins (L, a, b) and HOG layout over a 64x128 portrait,
+# 256 dimensions in all: a query over 200k rows reads 200 MB, and that
+# memory bandwidth, not arithmetic, is what a search costs
+COLOR_BINS = (4, 4, 4)
+HOG_SIZE = (64, 128)
+HOG_CELL = 16
+HOG_ORIENTATIONS = 6
+FEATURE_DIM = int(np.prod(COLOR_BINS)) + (
+    (HOG_SIZE[0] // HOG_CELL) * (HOG_SIZE[1] // HOG_CELL) * HOG_ORIENTATIONS
+)
+
+
+def color_histogram(lab):
+    """Normalised Lab histogram of foreground pixels, square-rooted so cosine
+    similarity behaves like the Hellinger kernel"""
+    edges = [
+        np.linspace(0, 100, COLOR_BINS[0] + 1)[1:-1],
+        np.linspace(-60, 60, COLOR_BINS[1] + 1)[1:-1],
+        np.linspace(-60, 60, COLOR_BINS[2] + 1)[1:-1],
+    ]
+    bins = [np.digitize(lab[:, i], edges[i]) for i in range(3)]
+    flat = np.ravel_multi_index(bins, COLOR_BINS)
+    histogram = np.bincount(flat, minlength=int(np.prod(COLOR_BINS)))
+    return np.sqrt(histogram / max(len(lab), 1))
+
+
+def hog(gray):
+    """Histogram of oriented gradients: unsigned orientations per cell,
+    each cell L2-normalised"""
+    g = np.asarray(gray, dtype=np.float32)
+    gx = np.zeros_like(g)
+    gy = np.zeros_like(g)
+    gx[:, 1:-1] = g[:, 2:] - g[:, :-2]
+    gy[1:-1, :] = g[2:, :] - g[:-2, :]
+    magnitude = np.hypot(gx, gy)
+    orientation = np.mod(np.arctan2(gy, gx), np.pi)
+    bins = np.minimum(
+        (orientation / np.pi * HOG_ORIENTATIONS).astype(int), HOG_ORIENTATIONS - 1
+    )
+
+    rows, cols = g.shape[0] // HOG_CELL, g.shape[1] // HOG_CELL
+    cell = (np.arange(g.shape[0]) // HOG_CELL)[:, None] * cols + (
+        np.arange(g.shape[1]) // HOG_CELL
+    )[None, :]
+    histogram = np.bincount(
+        (cell * HOG_ORIENTATIONS + bins).ravel(),
+        weights=magnitude.ravel(),
+        minlength=rows * cols * HOG_ORIENTATIONS,
+    ).reshape(rows * cols, HOG_ORIENTATIONS)
+    histogram /= np.linalg.norm(histogram, axis=1, keepdims=True) + 1e-6
+    return histogram.ravel()
+
+
+def unit(vector):
+    return vector / (np.linalg.norm(vector) + 1e-12)
+
+
+def features(path):
+    """FEATURE_DIM float32 vector of unit length: colour and shape halves
+    weighted equally, so a dot product is the cosine similarity"""
+    with Image.open(path) as image:
+        image = ImageOps.exif_transpose(image)
+        _, lab = foreground_pixels(image.copy())
+        gray = ImageOps.pad(image.convert("L"), HOG_SIZE, Image.BILINEAR, color=255)
+    vector = np.concatenate([unit(color_histogram(lab)), unit(hog(gray))])
+    return unit(vector).astype(np.float32)
+
+
+def features_or_none(path):
+    try:
+        return features(path)
+    except Exception:
+        return None
+
+
+class SimilarityIndex:
+    """Visual feature vectors for every catalogued image, searched by cosine
+
+    Vectors live in one float32 row-major file, <root>/.features/features.f32,
+    memory-mapped for queries. New images are appended to the end, and the
+    image_features table in the catalog database maps each image's sha256 to
+    its row; rows are only recorded once their bytes are on disk, so a crash
+    mid-append just leaves a tail that the next append overwrites.
+    """
+
+    def __init__(self, root="fashion_dataset", workers=None):
+        self.root = root
+        self.workers = workers
+        self.index = CatalogIndex(root)
+        self.index.db.executescript("""
+            CREATE TABLE IF NOT EXISTS image_features (
+                sha256 TEXT PRIMARY KEY,
+                row INTEGER
+            );
+            """)
+        self.dir = os.path.join(root, FEATURES_DIR)
+        os.makedirs(self.dir, exist_ok=True)
+        self.path = os.path.join(self.dir, FEATURES_FILE)
+        self.check_layout()
+        self.matrix = None
+        self.digests = None
+
+    def check_layout(self):
+        """Start over if the stored vectors were built with other dimensions"""
+        layout_path = os.path.join(self.dir, "layout.json")
+        layout = {"dim": FEATURE_DIM, "dtype": "float32"}
+        try:
+            with open(layout_path) as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            stored = None
+        if stored != layout:
+            self.index.db.execute("DELETE FROM image_features")
+            self.index.db.commit()
+            open(self.path, "wb").close()
+            with open(layout_path, "w") as f:
+                json.dump(layout, f)
+
+    def rows(self):
+        return self.index.db.execute(
+            "SELECT COUNT(*) FROM image_features WHERE row IS NOT NULL"
+        ).fetchone()[0]
+
+    def append_missing(self):
+        """Extract and append vectors for images not yet indexed
+
+        Returns how many images were processed.
+        """
+        extracted = self.index.missing_images(
+            "image_features", features_or_none, self.workers
+        )
+        if not extracted:
+            return 0
+
+        start = self.rows()
+        records, rows = [], []
+        for sha256, vector in extracted:
+            if vector is None:
+                records.append((sha256, None))
+                continue
+            records.append((sha256, start + len(rows)))
+            rows.append(vector)
+
+        with open(self.path, "r+b") as f:
+            f.truncate(start * FEATURE_DIM * 4)
+            f.seek(0, os.SEEK_END)
+            if rows:
+                f.write(np.stack(rows).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        self.index.db.executemany(
+            "INSERT OR REPLACE INTO image_features VALUES (?, ?)", records
+        )
+        self.index.db.commit()
+        self.matrix = None
+        return len(extracted)
+
+    def load(self):
+        """Memory-map the vectors; returns (matrix, sha256 per row)"""
+        count = self.rows()
+        self.digests = [None] * count
+        for sha256, row in self.index.db.execute(
+            "SELECT sha256, row FROM image_features WHERE row IS NOT NULL"
+        ):
+            self.digests[row] = sha256
+        if count:
+            self.matrix = np.memmap(
+                self.path, dtype=np.float32, mode="r", shape=(count, FEATURE_DIM)
+            )
+        else:
+            self.matrix = np.empty((0, FEATURE_DIM), dtype=np.float32)
+        return self.matrix, self.digests
+
+    def top_k(self, queries, k=10, block=65536):
+        """Indices and cosine scores of the k nearest rows for each query
+
+        queries is a (q, FEATURE_DIM) array of unit vectors. Rows are scored
+        a block at a time with one matrix product per block, keeping only
+        each block's top k, so memory stays bounded whatever the index size.
+        """
+        matrix = self.matrix if self.matrix is not None else self.load()[0]
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        k = min(k, len(matrix))
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        for start in range(0, len(matrix), block):
+            scores = queries @ matrix[start : start + block].T
+            kk = min(k, scores.shape[1])
+            top = np.argpartition(-scores, kk - 1, axis=1)[:, :kk]
+            best_rows = np.concatenate([best_rows, top + start], axis=1)
+            best_scores = np.concatenate(
+                [best_scores, np.take_along_axis(scores, top, axis=1)], axis=1
+            )
+            if best_rows.shape[1] > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+        order = np.argsort(-best_scores, axis=1)
+        return (
+            np.take_along_axis(best_rows, order, axis=1),
+            np.take_along_axis(best_scores, order, axis=1),
+        )
+
+    def vector_for(self, folder, filename):
+        row = self.index.db.execute(
+            """SELECT f.row FROM images AS i
+            JOIN image_features AS f ON f.sha256 = i.sha256
+            WHERE i.folder = ? AND i.filename = ?""",
+            (folder, filename),
+        ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        matrix = self.matrix if self.matrix is not None else self.load()[0]
+        return np.array(matrix[row[0]])
+
+    def similar(self, folder, filename=None, limit=10, latest=True):
+        """Products that look most like one catalogued image, best first
+
+        The image defaults to the product's first gallery image. Returns dicts with folder, filename, name, store and score; the
+        query's own product and exact copies of its image are left out.
+        A product is its URL (or SKU), so one crawled in several runs comes
+        back once, from its latest run unless latest is False.
+        """
+        if filename is None:
+            images = self.index.images(folder)
+            if not images:
+                return []
+            filename = images[0]["filename"]
+        vector = self.vector_for(folder, filename)
+        if vector is None:
+            return []
+        db = self.index.db
+        digest = db.execute(
+            "SELECT sha256 FROM images WHERE folder = ? AND filename = ?",
+            (folder, filename),
+        ).fetchone()[0]
+        where, params = self.index.where(latest=latest)
+        allowed = {
+            row[0] for row in db.execute(f"SELECT folder FROM products{where}", params)
+        }
+        own = db.execute(
+            f"SELECT {PRODUCT_KEY} FROM products AS p WHERE p.folder = ?", (folder,)
+        ).fetchone()
+        seen = {own[0] if own else folder}
+
+        # Over-fetch since several rows may belong to one product
+        rows, scores = self.top_k(vector, k=limit * 4 + 1)
+        results = []
+        for row, score in zip(rows[0], scores[0]):
+            if self.digests[row] == digest:
+                continue
+            # Newest run first, so each product is reported from it
+            matches = db.execute(
+                f"""SELECT i.folder, i.filename, p.name, p.store, {PRODUCT_KEY}
+                FROM images AS i JOIN products AS p ON p.folder = i.folder
+                WHERE i.sha256 = ? ORDER BY p.run DESC, i.folder""",
+                (self.digests[row],),
+            ).fetchall()
+            for match_folder, match_filename, name, store, key in matches:
+                if key in seen or match_folder not in allowed:
+                    continue
+                seen.add(key)
+                results.append(
+                    {
+                        "folder": match_folder,
+                        "filename": match_filename,
+                        "name": name,
+                        "store": store,
+                        "score": round(float(score), 4),
+                    }
+                )
+                if len(results) >= limit:
+                    return results
+        return results
+
+    def close(self):
+        self.matrix = None
+        self.index.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Index visual features of scraped images and find look-alikes"
+    )
+    parser.add_argument("--root", default="fashion_dataset")
+    parser.add_argument(
+        "--like",
+        metavar="FOLDER[/IMAGE]",
+        help="catalog image (or product folder, for its first image) to find "
+        "similar products for, relative to root",
+    )
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument(
+        "--all-runs", action="store_true", help="include products from older runs"
+    )
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    index = SimilarityIndex(args.root, args.workers)
+    start = time.monotonic()
+    appended = index.append_missing()
+    print(
+        f"Indexed {appended} new images in {time.monotonic() - start:.1f}s "
+        f"({index.rows()} vectors)"
+    )
+
+    if args.like:
+        folder, filename = os.path.normpath(args.like), None
+        if IMAGE_FILE.match(os.path.basename(folder)):
+            folder, filename = os.path.split(folder)
+        start = time.monotonic()
+        results = index.similar(folder, filename, args.limit, latest=not args.all_runs)
+        print(f"Search took {(time.monotonic() - start) * 1000:.1f}ms")
+        for result in results:
+            print(
+                f"  {result['score']:.3f}  {result['name']}  "
+                f"({result['folder']}/{result['filename']})"
+            )
+    index.close()
+
+
+if __name__ == "__main__":
+    main()